@@ -0,0 +1,71 @@
+"""
+Alembic 執行環境
+
+連線字串取自 src.config.settings.DATABASE_URL，target_metadata 為所有 model 的 Base.metadata
+（供 `alembic revision --autogenerate` 比對）。
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from src.config import settings
+from src.database import Base
+from src import models  # noqa: F401  確保所有 models 都被導入
+from src.models import recipe, user_recipe  # noqa: F401  未列在 src.models 的 model
+from src.migrate import include_object
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    """允許以 `alembic -x url=...` 覆寫（例如對 benchmark 資料庫執行）"""
+    return context.get_x_argument(as_dictionary=True).get("url") or settings.DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """產生 SQL 而不連線資料庫（`alembic upgrade head --sql`）"""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """連線資料庫並執行 migration"""
+    engine = create_engine(_database_url(), poolclass=NullPool)
+    with engine.connect() as connection:
+        _run(connection)
+    engine.dispose()
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=connection.dialect.name == "sqlite",  # SQLite 不支援大部分 ALTER TABLE
+        compare_type=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
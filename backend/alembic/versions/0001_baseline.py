@@ -0,0 +1,206 @@
+"""baseline：目前 Production 的 schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+
+與 create_all + 啟動時 run_migrations() 產生的結構一致。
+既有資料庫請以 `alembic stamp 0001_baseline` 標記，不要重新執行本 migration。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("line_user_id", sa.String(255), nullable=False),
+        sa.Column("display_name", sa.String(255), nullable=False),
+        sa.Column("picture_url", sa.String(512), nullable=True),
+        sa.Column("storage_mode", sa.String(20), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_line_user_id", "users", ["line_user_id"], unique=True)
+
+    op.create_table(
+        "wine_cellars",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("location", sa.String(255), nullable=True),
+        sa.Column("capacity", sa.Integer(), nullable=True),
+        sa.Column("temperature_min", sa.Numeric(4, 1), nullable=True),
+        sa.Column("temperature_max", sa.Numeric(4, 1), nullable=True),
+        sa.Column("humidity_min", sa.Numeric(5, 2), nullable=True),
+        sa.Column("humidity_max", sa.Numeric(5, 2), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_wine_cellars_id", "wine_cellars", ["id"])
+    op.create_index("ix_wine_cellars_owner_id", "wine_cellars", ["owner_id"])
+
+    op.create_table(
+        "wine_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("cellar_id", sa.Integer(), sa.ForeignKey("wine_cellars.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("wine_type", sa.String(50), nullable=True),
+        sa.Column("brand", sa.String(255), nullable=True),
+        sa.Column("vintage", sa.Integer(), nullable=True),
+        sa.Column("region", sa.String(255), nullable=True),
+        sa.Column("country", sa.String(255), nullable=True),
+        sa.Column("abv", sa.Float(), nullable=True),
+        sa.Column("quantity", sa.Integer(), nullable=True),
+        sa.Column("space_units", sa.Float(), nullable=True),
+        sa.Column("container_type", sa.String(50), nullable=True),
+        sa.Column("bottle_status", sa.String(20), nullable=True),
+        sa.Column("preservation_type", sa.String(20), nullable=True),
+        sa.Column("remaining_amount", sa.String(10), nullable=True),
+        sa.Column("opened_at", sa.DateTime(), nullable=True),
+        sa.Column("disposition", sa.String(20), nullable=True),
+        sa.Column("split_from_id", sa.Integer(), nullable=True),
+        sa.Column("recognized_by_ai", sa.Integer(), nullable=True),
+        sa.Column("purchase_price", sa.Float(), nullable=True),
+        sa.Column("retail_price", sa.Float(), nullable=True),
+        sa.Column("purchase_date", sa.Date(), nullable=True),
+        sa.Column("optimal_drinking_start", sa.Date(), nullable=True),
+        sa.Column("optimal_drinking_end", sa.Date(), nullable=True),
+        sa.Column("storage_location", sa.String(255), nullable=True),
+        sa.Column("storage_temp", sa.String(50), nullable=True),
+        sa.Column("image_url", sa.Text(), nullable=True),
+        sa.Column("cloudinary_public_id", sa.String(255), nullable=True),
+        sa.Column("status", sa.String(20), nullable=True),
+        sa.Column("status_changed_at", sa.DateTime(), nullable=True),
+        sa.Column("status_changed_by", sa.Integer(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("tasting_notes", sa.Text(), nullable=True),
+        sa.Column("rating", sa.Integer(), nullable=True),
+        sa.Column("review", sa.Text(), nullable=True),
+        sa.Column("flavor_tags", sa.Text(), nullable=True),
+        sa.Column("aroma", sa.Text(), nullable=True),
+        sa.Column("palate", sa.Text(), nullable=True),
+        sa.Column("finish", sa.Text(), nullable=True),
+        sa.Column("acidity", sa.Integer(), nullable=True),
+        sa.Column("tannin", sa.Integer(), nullable=True),
+        sa.Column("body", sa.Integer(), nullable=True),
+        sa.Column("sweetness", sa.Integer(), nullable=True),
+        sa.Column("alcohol_feel", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_wine_items_id", "wine_items", ["id"])
+    op.create_index("ix_wine_items_cellar_id", "wine_items", ["cellar_id"])
+    op.create_index("ix_wine_items_name", "wine_items", ["name"])
+
+    op.create_table(
+        "notification_settings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("expiry_warning_enabled", sa.Boolean(), nullable=False),
+        sa.Column("expiry_warning_days", sa.Integer(), nullable=False),
+        sa.Column("low_stock_enabled", sa.Boolean(), nullable=False),
+        sa.Column("low_stock_threshold", sa.Integer(), nullable=False),
+        sa.Column("space_warning_enabled", sa.Boolean(), nullable=False),
+        sa.Column("space_warning_threshold", sa.Integer(), nullable=False),
+        sa.Column("budget_warning_enabled", sa.Boolean(), nullable=False),
+        sa.Column("budget_warning_amount", sa.Integer(), nullable=False),
+        sa.Column("opened_reminder_enabled", sa.Boolean(), nullable=False),
+        sa.Column("notification_time", sa.Time(), nullable=False),
+        sa.Column("monthly_check_day", sa.Integer(), nullable=False),
+        sa.Column("weekly_notification_day", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_notification_settings_id", "notification_settings", ["id"])
+    op.create_index("ix_notification_settings_user_id", "notification_settings", ["user_id"], unique=True)
+
+    op.create_table(
+        "budget_settings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("monthly_budget", sa.Float(), nullable=False),
+        sa.Column("warning_threshold", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_budget_settings_id", "budget_settings", ["id"])
+    op.create_index("ix_budget_settings_user_id", "budget_settings", ["user_id"], unique=True)
+
+    op.create_table(
+        "recipes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("ingredients", sa.JSON(), nullable=False),
+        sa.Column("steps", sa.JSON(), nullable=False),
+        sa.Column("cooking_time", sa.Integer(), nullable=True),
+        sa.Column("difficulty", sa.String(50), nullable=True),
+        sa.Column("cuisine_type", sa.String(100), nullable=True),
+        sa.Column("image_url", sa.String(512), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_recipes_id", "recipes", ["id"])
+    op.create_index("ix_recipes_name", "recipes", ["name"])
+
+    op.create_table(
+        "user_recipes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("recipe_id", sa.Integer(), sa.ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("category", sa.String(50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("user_id", "recipe_id", name="uq_user_recipe"),
+    )
+    op.create_index("ix_user_recipes_id", "user_recipes", ["id"])
+    op.create_index("ix_user_recipes_user_id", "user_recipes", ["user_id"])
+    op.create_index("ix_user_recipes_recipe_id", "user_recipes", ["recipe_id"])
+    op.create_index("ix_user_recipes_category", "user_recipes", ["category"])
+
+    op.create_table(
+        "invitations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("host_id", sa.Integer(), nullable=True),
+        sa.Column("title", sa.String(100), nullable=False, comment="聚會標題"),
+        sa.Column("description", sa.Text(), nullable=True, comment="聚會描述"),
+        sa.Column("event_date", sa.DateTime(), nullable=False, comment="聚會時間"),
+        sa.Column("location", sa.String(200), nullable=True, comment="地點名稱"),
+        sa.Column("latitude", sa.String(50), nullable=True),
+        sa.Column("longitude", sa.String(50), nullable=True),
+        sa.Column("theme_image_url", sa.String(500), nullable=True, comment="主題圖片 URL"),
+        sa.Column("wine_ids", sa.JSON(), nullable=True, comment="酒款 ID 列表"),
+        sa.Column("attendees", sa.JSON(), nullable=True, comment="報名者列表"),
+        sa.Column("allow_forwarding", sa.Boolean(), nullable=True, comment="允許轉發"),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_invitations_id", "invitations", ["id"])
+
+
+def downgrade() -> None:
+    """還原 schema"""
+    for table in (
+        "invitations",
+        "user_recipes",
+        "recipes",
+        "budget_settings",
+        "notification_settings",
+        "wine_items",
+        "wine_cellars",
+        "users",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,57 @@
+"""wine_items 熱門查詢的複合索引與部分索引
+
+Revision ID: 0002_wine_items_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17
+
+- (cellar_id, status)：酒款列表 / 酒窖統計依狀態篩選
+- (cellar_id, purchase_date)：預算統計依購買日期區間查詢
+- (cellar_id, brand, name)：match_wine_history 歷史酒款比對
+- split_from_id（部分索引，僅非 NULL）：同批次品飲筆記同步
+- optimal_drinking_end（部分索引，僅非 NULL）：排程器適飲期掃描
+
+PostgreSQL 上以 CREATE INDEX CONCURRENTLY 建立，不鎖住寫入；
+CONCURRENTLY 不能在 transaction 內執行，因此放在 autocommit_block。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_wine_items_hot_path_indexes"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (索引名稱, 欄位, 部分索引條件)
+INDEXES = [
+    ("ix_wine_items_cellar_status", ["cellar_id", "status"], None),
+    ("ix_wine_items_cellar_purchase_date", ["cellar_id", "purchase_date"], None),
+    ("ix_wine_items_cellar_brand_name", ["cellar_id", "brand", "name"], None),
+    ("ix_wine_items_split_from_id", ["split_from_id"], "split_from_id IS NOT NULL"),
+    ("ix_wine_items_optimal_drinking_end", ["optimal_drinking_end"], "optimal_drinking_end IS NOT NULL"),
+]
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                "wine_items",
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    """還原 schema"""
+    with op.get_context().autocommit_block():
+        for name, _columns, _where in reversed(INDEXES):
+            op.drop_index(name, table_name="wine_items", if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""schema_state：啟動時快速比對的 schema 指紋
+
+Revision ID: 0003_schema_state
+Revises: 0002_wine_items_hot_path_indexes
+Create Date: 2026-10-17
+
+由 `python -m src.migrate` 在升級完成後寫入，應用程式啟動時以單一查詢比對。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_schema_state"
+down_revision: Union[str, Sequence[str], None] = "0002_wine_items_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    op.create_table(
+        "schema_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("alembic_revision", sa.String(64), nullable=True),
+        sa.Column("migrated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """還原 schema"""
+    op.drop_table("schema_state")
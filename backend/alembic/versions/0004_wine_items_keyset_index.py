@@ -0,0 +1,39 @@
+"""wine_items 列表 keyset 分頁索引
+
+Revision ID: 0004_wine_items_keyset_index
+Revises: 0003_schema_state
+Create Date: 2026-10-17
+
+(cellar_id, id)：GET /wine-items?limit= 依 id DESC 分頁，
+索引順序即排序順序，每頁只讀 limit 筆，不需排序整個酒窖。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_wine_items_keyset_index"
+down_revision: Union[str, Sequence[str], None] = "0003_schema_state"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_wine_items_cellar_id_id",
+            "wine_items",
+            ["cellar_id", "id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """還原 schema"""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_wine_items_cellar_id_id", table_name="wine_items", if_exists=True, postgresql_concurrently=True
+        )
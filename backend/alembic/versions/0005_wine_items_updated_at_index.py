@@ -0,0 +1,38 @@
+"""wine_items ETag 版本查詢索引
+
+Revision ID: 0005_wine_items_updated_at_index
+Revises: 0004_wine_items_keyset_index
+Create Date: 2026-10-17
+
+(cellar_id, updated_at)：條件式 GET 的 count(*) / max(updated_at) 可只讀索引完成。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_wine_items_updated_at_index"
+down_revision: Union[str, Sequence[str], None] = "0004_wine_items_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_wine_items_cellar_updated_at",
+            "wine_items",
+            ["cellar_id", "updated_at"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """還原 schema"""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_wine_items_cellar_updated_at", table_name="wine_items", if_exists=True, postgresql_concurrently=True
+        )
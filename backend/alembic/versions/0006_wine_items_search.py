@@ -0,0 +1,91 @@
+"""wine_items 全文搜尋索引
+
+Revision ID: 0006_wine_items_search
+Revises: 0005_wine_items_updated_at_index
+Create Date: 2026-10-17
+
+- PostgreSQL：tsvector 運算式 GIN 索引（name / brand 權重 A、region / country 權重 B、
+  notes / review / flavor_tags 權重 C）與 pg_trgm 的酒名 + 品牌 GIN 索引（子字串比對）。
+  運算式必須與 src/services/wine_search.py 的查詢完全一致，索引才會被使用。
+- SQLite：external content FTS5 表與同步 triggers，並以 'rebuild' 為既有資料建立索引。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_wine_items_search"
+down_revision: Union[str, Sequence[str], None] = "0005_wine_items_updated_at_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(brand, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(region, '') || ' ' || coalesce(country, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '') || ' ' || coalesce(review, '') || ' ' "
+    "|| coalesce(flavor_tags, '')), 'C')"
+)
+SEARCH_NAME_SQL = "coalesce(name, '') || ' ' || coalesce(brand, '')"
+
+SQLITE_COLUMNS = "name, brand, region, country, notes, review, flavor_tags"
+SQLITE_NEW = "new.name, new.brand, new.region, new.country, new.notes, new.review, new.flavor_tags"
+SQLITE_OLD = "old.name, old.brand, old.region, old.country, old.notes, old.review, old.flavor_tags"
+
+
+def _upgrade_postgresql() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS wine_items_search_tsv_idx "
+            f"ON wine_items USING gin (({SEARCH_VECTOR_SQL}))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS wine_items_search_trgm_idx "
+            f"ON wine_items USING gin (({SEARCH_NAME_SQL}) gin_trgm_ops)"
+        )
+
+
+def _upgrade_sqlite() -> None:
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS wine_items_search_fts USING fts5({SQLITE_COLUMNS}, "
+        "content='wine_items', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS wine_items_search_ai AFTER INSERT ON wine_items BEGIN "
+        f"INSERT INTO wine_items_search_fts(rowid, {SQLITE_COLUMNS}) VALUES (new.id, {SQLITE_NEW}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS wine_items_search_ad AFTER DELETE ON wine_items BEGIN "
+        f"INSERT INTO wine_items_search_fts(wine_items_search_fts, rowid, {SQLITE_COLUMNS}) "
+        f"VALUES ('delete', old.id, {SQLITE_OLD}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS wine_items_search_au AFTER UPDATE OF {SQLITE_COLUMNS} ON wine_items BEGIN "
+        f"INSERT INTO wine_items_search_fts(wine_items_search_fts, rowid, {SQLITE_COLUMNS}) "
+        f"VALUES ('delete', old.id, {SQLITE_OLD}); "
+        f"INSERT INTO wine_items_search_fts(rowid, {SQLITE_COLUMNS}) VALUES (new.id, {SQLITE_NEW}); END"
+    )
+    op.execute("INSERT INTO wine_items_search_fts(wine_items_search_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        _upgrade_postgresql()
+    elif dialect == "sqlite":
+        _upgrade_sqlite()
+
+
+def downgrade() -> None:
+    """還原 schema（pg_trgm extension 可能被其他物件使用，保留不移除）"""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS wine_items_search_trgm_idx")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS wine_items_search_tsv_idx")
+    elif dialect == "sqlite":
+        for trigger in ("wine_items_search_au", "wine_items_search_ad", "wine_items_search_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS wine_items_search_fts")
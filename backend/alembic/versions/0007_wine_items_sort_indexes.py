@@ -0,0 +1,41 @@
+"""wine_items 列表排序索引
+
+Revision ID: 0007_wine_items_sort_indexes
+Revises: 0006_wine_items_search
+Create Date: 2026-10-17
+
+GET /wine-items 的 sort 參數以 (cellar_id, 排序欄位, id) 索引掃描取得有序結果，
+keyset 分頁的下一頁條件同樣落在索引範圍內。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_wine_items_sort_indexes"
+down_revision: Union[str, Sequence[str], None] = "0006_wine_items_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_INDEXES = {
+    "ix_wine_items_cellar_vintage_id": ["cellar_id", "vintage", "id"],
+    "ix_wine_items_cellar_price_id": ["cellar_id", "purchase_price", "id"],
+    "ix_wine_items_cellar_drinking_end_id": ["cellar_id", "optimal_drinking_end", "id"],
+    "ix_wine_items_cellar_rating_id": ["cellar_id", "rating", "id"],
+    "ix_wine_items_cellar_created_at_id": ["cellar_id", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    with op.get_context().autocommit_block():
+        for name, columns in SORT_INDEXES.items():
+            op.create_index(name, "wine_items", columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """還原 schema"""
+    with op.get_context().autocommit_block():
+        for name in reversed(SORT_INDEXES):
+            op.drop_index(name, table_name="wine_items", if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""wine_item_tombstones：增量同步的刪除記錄
+
+Revision ID: 0008_wine_item_tombstones
+Revises: 0007_wine_items_sort_indexes
+Create Date: 2026-10-17
+
+GET /wine-items/changes 以 (owner_id, deleted_at) 查詢 token 之後刪除的酒款。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_wine_item_tombstones"
+down_revision: Union[str, Sequence[str], None] = "0007_wine_items_sort_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """升級 schema"""
+    op.create_table(
+        "wine_item_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("wine_item_id", sa.Integer(), nullable=False),
+        sa.Column("cellar_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_wine_item_tombstones_owner_deleted_at", "wine_item_tombstones", ["owner_id", "deleted_at"]
+    )
+    op.create_index("ix_wine_item_tombstones_deleted_at", "wine_item_tombstones", ["deleted_at"])
+
+
+def downgrade() -> None:
+    """還原 schema"""
+    op.drop_index("ix_wine_item_tombstones_deleted_at", table_name="wine_item_tombstones")
+    op.drop_index("ix_wine_item_tombstones_owner_deleted_at", table_name="wine_item_tombstones")
+    op.drop_table("wine_item_tombstones")
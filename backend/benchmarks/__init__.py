@@ -0,0 +1 @@
+"""效能 benchmark 腳本（不屬於測試套件，手動執行）"""
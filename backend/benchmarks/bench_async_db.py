@@ -0,0 +1,116 @@
+"""
+Benchmark：async 路由使用同步 Session vs AsyncSession 的並行吞吐量
+
+兩個 handler 執行相同的「列出酒窖酒款」查詢（同 GET /wine-items），差別只在 session：
+- sync-session：async def 內呼叫同步 Session（遷移前的寫法），查詢期間整個 event loop 被阻塞
+- async-session：AsyncSession + aiosqlite（遷移後的寫法），等待資料庫時 event loop 可處理其他請求
+
+每個查詢透過 sleep_ms() 模擬資料庫往返延遲（預設 5ms），以反映實際部署到 PostgreSQL 的情況。
+
+執行方式（於 backend/ 目錄）:
+    python -m benchmarks.bench_async_db
+    python -m benchmarks.bench_async_db --requests 2000 --concurrency 100 --latency-ms 10
+"""
+
+import argparse
+import asyncio
+
+from benchmarks._common import install_latency_function, print_table, run_load, temp_sqlite_path
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database import Base
+from src.models.user import User
+from src.models.wine_cellar import WineCellar
+from src.models.wine_item import WineItem
+
+
+def build_app(path: str, latency_ms: int, pool_size: int):
+    """建立只含兩個 handler 的 app，回傳 (app, async_engine)"""
+    # 同步版本的 get_db 是 sync generator，由 FastAPI 在 threadpool 建立/關閉 session，
+    # 但查詢在 event loop 上執行；連線池用盡時 event loop 會卡在 checkout，
+    # 而歸還連線的 teardown 又需要 event loop 排程 → 直到 pool_timeout 才解開。
+    # max_overflow=-1 避開這個死結，只量測「查詢阻塞 event loop」本身的成本。
+    sync_engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=-1,
+    )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=pool_size)
+    install_latency_function(sync_engine)
+    install_latency_function(async_engine.sync_engine)
+
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSessionFactory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    def list_query():
+        return (
+            select(WineItem)
+            .join(WineCellar, WineItem.cellar_id == WineCellar.id)
+            .where(WineCellar.owner_id == 1, func.sleep_ms(latency_ms) == 0)
+        )
+
+    app = FastAPI()
+
+    @app.get("/sync-session")
+    async def sync_session(db: Session = Depends(get_sync_db)):
+        return len(db.execute(list_query()).scalars().all())
+
+    @app.get("/async-session")
+    async def async_session(db: AsyncSession = Depends(get_async_db)):
+        return len((await db.execute(list_query())).scalars().all())
+
+    Base.metadata.create_all(bind=sync_engine)
+    with SyncSession() as db:
+        db.add(User(id=1, line_user_id="U_bench", display_name="Bench"))
+        db.add(WineCellar(id=1, owner_id=1, name="Bench Cellar"))
+        db.add_all(WineItem(cellar_id=1, name=f"Wine {i}", wine_type="紅酒") for i in range(20))
+        db.commit()
+
+    return app, async_engine
+
+
+async def main(args) -> None:
+    app, async_engine = build_app(temp_sqlite_path(), args.latency_ms, args.pool_size)
+
+    # 暖機：建立連線池內的連線
+    await run_load(app, "/sync-session", 20, 5)
+    await run_load(app, "/async-session", 20, 5)
+
+    rows = []
+    for path in ("/sync-session", "/async-session"):
+        result = await run_load(app, path, args.requests, args.concurrency)
+        rows.append((path.strip("/"), result))
+
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} "
+        f"latency={args.latency_ms}ms pool_size={args.pool_size}"
+    )
+    print_table(rows)
+
+    # aiosqlite 的連線執行緒不是 daemon，需 dispose 才能正常結束程式
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""
+Benchmark：回應壓縮（bytes on the wire 與每請求 CPU 成本）
+
+以 500 筆酒款的酒窖產生 GET /wine-items 的實際回應內容（full 與 view=summary），
+經 CompressionMiddleware 以不同壓縮設定送出，量測：
+- 傳輸大小（壓縮後 body bytes）
+- 每請求 CPU 時間（middleware + 壓縮，process_time 中位數）
+- 行動網路的估計傳輸時間（3G 1.6 Mbps / 4G 訊號弱 10 Mbps）
+
+未安裝 brotli 時略過 br 設定。
+
+執行方式（於 backend/ 目錄）:
+    python -m benchmarks.bench_response_compression
+    python -m benchmarks.bench_response_compression --items 2000 --runs 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks._common import temp_sqlite_path
+from benchmarks.bench_wine_item_serialization import seed
+
+from sqlalchemy import create_engine, select
+
+from src.middleware.compression import CompressionMiddleware, brotli
+from src.routes.wine_items import RESPONSE_FIELDS, SUMMARY_FIELDS, _columns_for_fields, _wine_item_dicts
+from src.utils.fast_json import dumps
+
+MOBILE_LINKS = {"3G": 1.6e6, "4G weak": 10e6}  # bits/s
+
+
+def payloads(items: int) -> dict[str, bytes]:
+    engine = create_engine(f"sqlite:///{temp_sqlite_path()}")
+    seed(engine, items)
+    result = {}
+    with engine.connect() as conn:
+        for name, fields in (("full", RESPONSE_FIELDS), ("summary", SUMMARY_FIELDS)):
+            rows = conn.execute(select(*_columns_for_fields(fields))).all()
+            result[name] = dumps(_wine_item_dicts(rows, fields))
+    engine.dispose()
+    return result
+
+
+def payload_app(body: bytes):
+    """直接回傳 JSON body 的最小 ASGI app（排除路由與資料庫成本）"""
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+async def measure(middleware, accept_encoding: str, runs: int) -> tuple[int, float]:
+    """回傳 (傳輸 bytes, 每請求 CPU 微秒中位數)"""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/wine-items",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    timings, size = [], 0
+    for _ in range(runs):
+        chunks = []
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        started = time.process_time_ns()
+        await middleware(scope, receive, send)
+        timings.append(time.process_time_ns() - started)
+        size = sum(len(chunk) for chunk in chunks)
+    return size, statistics.median(timings) / 1000
+
+
+async def main(args) -> None:
+    configs = [("identity", "identity", {})]
+    configs += [(f"gzip-{level}", "gzip", {"gzip_level": level}) for level in (1, 6, 9)]
+    if brotli is not None:
+        configs += [(f"br-{quality}", "br", {"brotli_quality": quality}) for quality in (4, 6, 11)]
+
+    for view, body in payloads(args.items).items():
+        print(f"\n{args.items} items, view={view}, median of {args.runs} runs"
+              f"{'' if brotli else ' (brotli not installed)'}\n")
+        print(f"{'encoding':<12}{'bytes':>10}{'ratio':>8}{'CPU µs/req':>12}"
+              + "".join(f"{name + ' ms':>13}" for name in MOBILE_LINKS))
+        for name, accept, options in configs:
+            middleware = CompressionMiddleware(payload_app(body), minimum_size=1024, **options)
+            size, cpu_us = await measure(middleware, accept, args.runs)
+            transfer = "".join(f"{size * 8 / bps * 1000:>13.0f}" for bps in MOBILE_LINKS.values())
+            print(f"{name:<12}{size:>10,}{len(body) / size:>7.1f}x{cpu_us:>12.0f}{transfer}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
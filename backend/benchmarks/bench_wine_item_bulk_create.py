@@ -0,0 +1,107 @@
+"""
+Benchmark：新增酒款時依 quantity 自動拆分的寫入成本
+
+比較 POST /wine-items 的兩種寫入方式（同一個 AsyncSession + aiosqlite，各自一個交易）：
+- orm-per-row：主記錄 flush 後逐一 db.add() N-1 個 WineItem（舊寫法），
+  N 個 ORM 物件的 unit of work 與逐筆 INSERT
+- bulk：insert_wine_items()，主記錄 INSERT ... RETURNING、其餘一次 executemany（現行寫法）
+
+量測 quantity = 1 / 12 / 120 / 1200 的耗時中位數與送到資料庫的 SQL 數。
+可用 --latency-ms 模擬每次資料庫往返延遲（預設 0）。
+
+執行方式（於 backend/ 目錄）:
+    python -m benchmarks.bench_wine_item_bulk_create
+    python -m benchmarks.bench_wine_item_bulk_create --runs 20 --latency-ms 2
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks._common import temp_sqlite_path
+from benchmarks.bench_wine_item_serialization import seed
+
+from sqlalchemy import create_engine, delete, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models.wine_item import WineItem
+from src.routes.wine_items import _prepare_new_item_data
+from src.services.wine_import import insert_wine_items
+
+QUANTITIES = (1, 12, 120, 1200)
+
+
+def new_item(quantity: int) -> tuple[dict, int]:
+    return _prepare_new_item_data({
+        "cellar_id": 1,
+        "name": "Château Bench",
+        "wine_type": "紅酒",
+        "vintage": 2015,
+        "quantity": quantity,
+        "purchase_price": 1800.0,
+        "purchase_date": "2024-03-01",
+        "notes": "整箱購入",
+    })
+
+
+async def orm_per_row(db, quantity: int) -> None:
+    item_data, requested_quantity = new_item(quantity)
+    primary_item = WineItem(**item_data)
+    db.add(primary_item)
+    await db.flush()
+    for _ in range(requested_quantity - 1):
+        db.add(WineItem(**item_data, split_from_id=primary_item.id))
+    await db.commit()
+
+
+async def bulk(db, quantity: int) -> None:
+    item_data, requested_quantity = new_item(quantity)
+    await insert_wine_items(db, 1, [(item_data, requested_quantity)])
+    await db.commit()
+
+
+async def main(args) -> None:
+    path = temp_sqlite_path()
+    seed(create_engine(f"sqlite:///{path}"), 1)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        statements += 1
+        # 單一循序流程，直接 sleep 即等同每次往返的延遲
+        time.sleep(args.latency_ms / 1000)
+
+    print(f"median of {args.runs} runs, simulated latency {args.latency_ms} ms/statement\n")
+    print(f"{'quantity':>8}{'orm-per-row ms':>16}{'stmts':>7}{'bulk ms':>10}{'stmts':>7}{'speedup':>9}")
+    for quantity in QUANTITIES:
+        results = {}
+        for name, create in (("orm", orm_per_row), ("bulk", bulk)):
+            timings = []
+            for _ in range(args.runs):
+                async with session_factory() as db:
+                    statements = 0
+                    started = time.perf_counter()
+                    await create(db, quantity)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    count = statements
+                    await db.execute(delete(WineItem))
+                    await db.commit()
+            results[name] = (statistics.median(timings), count)
+        (orm_ms, orm_stmts), (bulk_ms, bulk_stmts) = results["orm"], results["bulk"]
+        print(f"{quantity:>8}{orm_ms:>16.2f}{orm_stmts:>7}{bulk_ms:>10.2f}{bulk_stmts:>7}{orm_ms / bulk_ms:>8.1f}x")
+
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("SELECT count(*) FROM wine_items"))).scalar() == 0
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,165 @@
+"""
+Benchmark：wine_items 熱門查詢在 0002 索引前後的查詢計畫與延遲
+
+流程：
+1. alembic upgrade 0001_baseline（只有 id / cellar_id / name 索引）
+2. 灌入 N 筆酒款（預設 1,000,000 筆，分散在多個酒窖，其中一個為大酒窖）
+3. 對每個熱門查詢輸出 EXPLAIN 並量測延遲中位數
+4. alembic upgrade head（0002 索引）+ ANALYZE，再量一次
+
+執行方式（於 backend/ 目錄）:
+    python -m benchmarks.bench_wine_item_indexes                       # 暫存 SQLite
+    python -m benchmarks.bench_wine_item_indexes --url postgresql://... # 建議：空的 PostgreSQL 資料庫
+    python -m benchmarks.bench_wine_item_indexes --rows 200000 --runs 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+from argparse import Namespace
+from datetime import date, timedelta
+
+from benchmarks._common import temp_sqlite_path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.pool import NullPool
+
+from src.models.user import User
+from src.models.wine_cellar import WineCellar
+from src.models.wine_item import WineItem
+
+HEAVY_CELLAR_ID = 1
+BRANDS = [f"Domaine {i}" for i in range(200)]
+STATUSES = ["active"] * 7 + ["consumed", "sold", "gifted"]
+
+QUERIES = {
+    "list by status": (
+        "SELECT id, name FROM wine_items WHERE cellar_id = :cellar_id AND status = 'sold'",
+        {"cellar_id": HEAVY_CELLAR_ID},
+    ),
+    "budget date range": (
+        "SELECT sum(purchase_price) FROM wine_items "
+        "WHERE cellar_id = :cellar_id AND purchase_date BETWEEN :start AND :end",
+        {"cellar_id": HEAVY_CELLAR_ID, "start": date(2024, 3, 1), "end": date(2024, 3, 31)},
+    ),
+    "match history": (
+        "SELECT id, purchase_price FROM wine_items "
+        "WHERE cellar_id = :cellar_id AND brand = :brand AND name = :name "
+        "ORDER BY purchase_date DESC LIMIT 5",
+        {"cellar_id": HEAVY_CELLAR_ID, "brand": "Domaine 7", "name": "Cuvée 7"},
+    ),
+    "split siblings": (
+        "SELECT id FROM wine_items WHERE split_from_id = :root_id",
+        {"root_id": 1000},
+    ),
+    "scheduler expiring": (
+        "SELECT id, cellar_id FROM wine_items "
+        "WHERE optimal_drinking_end IS NOT NULL AND optimal_drinking_end <= :until",
+        {"until": date(2024, 1, 10)},
+    ),
+}
+
+
+def alembic_upgrade(url: str, revision: str) -> None:
+    config = Config("alembic.ini")
+    config.cmd_opts = Namespace(x=[f"url={url}"])
+    command.upgrade(config, revision)
+
+
+def seed(engine, rows: int, cellars: int) -> None:
+    """大酒窖佔 10%，其餘平均分散；10% 為拆分記錄，20% 有適飲期結束日"""
+    rng = random.Random(42)
+    now = date(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "line_user_id": "U_bench", "display_name": "Bench",
+                                     "storage_mode": "simple", "created_at": now, "updated_at": now}])
+        conn.execute(insert(WineCellar), [{"id": c, "owner_id": 1, "name": f"Cellar {c}"}
+                                          for c in range(1, cellars + 1)])
+
+    batch = []
+    started = time.perf_counter()
+    for i in range(1, rows + 1):
+        n = rng.randrange(200)
+        batch.append({
+            "id": i,
+            "cellar_id": HEAVY_CELLAR_ID if rng.random() < 0.1 else rng.randint(2, cellars),
+            "name": f"Cuvée {n}",
+            "brand": BRANDS[n],
+            "wine_type": "紅酒",
+            "quantity": 1,
+            "status": rng.choice(STATUSES),
+            "purchase_price": rng.randint(300, 5000),
+            "purchase_date": now + timedelta(days=rng.randrange(730)),
+            "split_from_id": rng.randint(1, max(1, i - 1)) if rng.random() < 0.1 else None,
+            "optimal_drinking_end": now + timedelta(days=rng.randrange(3650)) if rng.random() < 0.2 else None,
+        })
+        if len(batch) == 10000:
+            with engine.begin() as conn:
+                conn.execute(insert(WineItem), batch)
+            batch.clear()
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(WineItem), batch)
+    print(f"seeded {rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+def explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).all()
+        return "\n".join(r[0] for r in rows)
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+    return "\n".join(str(r[-1]) for r in rows)
+
+
+def measure(engine, runs: int) -> dict[str, float]:
+    results = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            conn.execute(text(sql), params).all()  # 暖機
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                conn.execute(text(sql), params).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+            print(f"\n--- {name} ({results[name]:.2f} ms)\n{explain(conn, sql, params)}")
+    return results
+
+
+def main(args) -> None:
+    url = args.url or f"sqlite:///{temp_sqlite_path()}"
+    engine = create_engine(url, poolclass=NullPool)
+
+    alembic_upgrade(url, "0001_baseline")
+    seed(engine, args.rows, args.cellars)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    print("\n========== before (0001_baseline) ==========")
+    before = measure(engine, args.runs)
+
+    started = time.perf_counter()
+    alembic_upgrade(url, "head")
+    print(f"\ncreated indexes in {time.perf_counter() - started:.1f}s")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    print("\n========== after (0002 indexes) ==========")
+    after = measure(engine, args.runs)
+
+    print(f"\n{'query':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<22}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="空的資料庫 URL（預設為暫存 SQLite）")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cellars", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=9)
+    main(parser.parse_args())
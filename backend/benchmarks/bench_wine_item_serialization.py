@@ -0,0 +1,135 @@
+"""
+Benchmark：GET /wine-items 序列化路徑（每筆 ns）
+
+比較同一批酒款（預設 10,000 筆）的兩種輸出方式：
+- before：載入 ORM 物件 → _build_wine_item_response() 建立 WineItemResponse
+          → FastAPI 以 response_model 再驗證並序列化一次（以 TypeAdapter 模擬 serialize_response）
+- after ：只查詢欄位取得 Row → _wine_item_dicts() 轉 dict → orjson 直接編碼為 bytes
+- after (summary)：同上，但只輸出 view=summary 的欄位
+
+分別量測「查詢並建立資料列」與「序列化為 JSON bytes」兩段，取多次執行的中位數。
+
+執行方式（於 backend/ 目錄）:
+    python -m benchmarks.bench_wine_item_serialization
+    python -m benchmarks.bench_wine_item_serialization --items 50000 --runs 9
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from benchmarks._common import temp_sqlite_path
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from src.database import Base
+from src.models.user import User
+from src.models.wine_cellar import WineCellar
+from src.models.wine_item import WineItem
+from src.routes.wine_items import (
+    RESPONSE_FIELDS,
+    SUMMARY_FIELDS,
+    _build_wine_item_response,
+    _columns_for_fields,
+    _wine_item_dicts,
+)
+from src.schemas.wine_item import WineItemResponse
+from src.utils.fast_json import dumps, orjson
+
+
+def seed(engine, items: int) -> None:
+    """一個酒窖、items 筆酒款，長文字欄位填入真實長度的內容"""
+    Base.metadata.create_all(bind=engine)
+    today = date(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "line_user_id": "U_bench", "display_name": "Bench",
+                                     "storage_mode": "simple", "created_at": today, "updated_at": today}])
+        conn.execute(insert(WineCellar), [{"id": 1, "owner_id": 1, "name": "Bench Cellar"}])
+        conn.execute(insert(WineItem), [
+            {
+                "cellar_id": 1,
+                "name": f"Cuvée {i}",
+                "wine_type": "紅酒",
+                "brand": f"Domaine {i % 200}",
+                "vintage": 1990 + i % 30,
+                "region": "Bourgogne",
+                "quantity": 1,
+                "purchase_price": 1000 + i % 500,
+                "purchase_date": today + timedelta(days=i % 365),
+                "optimal_drinking_start": today,
+                "optimal_drinking_end": today + timedelta(days=i % 3650),
+                "notes": "櫻桃、皮革與森林地表氣息，單寧細緻。" * 4,
+                "rating": i % 5 + 1,
+                "created_at": today,
+                "updated_at": today,
+            }
+            for i in range(items)
+        ])
+
+
+def time_ns(fn, runs: int) -> tuple[float, object]:
+    """回傳 (中位數 ns, 最後一次結果)"""
+    timings, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter_ns()
+        result = fn()
+        timings.append(time.perf_counter_ns() - started)
+    return statistics.median(timings), result
+
+
+def main(args) -> None:
+    engine = create_engine(f"sqlite:///{temp_sqlite_path()}")
+    seed(engine, args.items)
+    adapter = TypeAdapter(list[WineItemResponse])
+
+    def fetch_entities():
+        with Session(engine) as session:
+            return session.scalars(select(WineItem)).all()
+
+    def fetch_rows(fields):
+        with engine.connect() as conn:
+            return conn.execute(select(*_columns_for_fields(fields))).all()
+
+    entities = fetch_entities()
+    rows = fetch_rows(RESPONSE_FIELDS)
+    summary_rows = fetch_rows(SUMMARY_FIELDS)
+
+    cases = {
+        "before (pydantic x2)": (
+            fetch_entities,
+            lambda: adapter.dump_json(adapter.validate_python([_build_wine_item_response(i) for i in entities])),
+        ),
+        "after (rows + orjson)": (
+            lambda: fetch_rows(RESPONSE_FIELDS),
+            lambda: dumps(_wine_item_dicts(rows, RESPONSE_FIELDS)),
+        ),
+        "after summary view": (
+            lambda: fetch_rows(SUMMARY_FIELDS),
+            lambda: dumps(_wine_item_dicts(summary_rows, SUMMARY_FIELDS)),
+        ),
+    }
+
+    print(f"{args.items:,} items, median of {args.runs} runs, encoder: {'orjson' if orjson else 'json'}\n")
+    print(f"{'case':<24}{'fetch ns/item':>15}{'serialize ns/item':>19}{'total ns/item':>15}{'KB':>9}")
+    baseline = None
+    for name, (fetch, serialize) in cases.items():
+        fetch_ns, _ = time_ns(fetch, args.runs)
+        serialize_ns, body = time_ns(serialize, args.runs)
+        total = (fetch_ns + serialize_ns) / args.items
+        baseline = baseline or total
+        print(
+            f"{name:<24}{fetch_ns / args.items:>15.0f}{serialize_ns / args.items:>19.0f}"
+            f"{total:>15.0f}{len(body) / 1024:>9.0f}   {baseline / total:.1f}x"
+        )
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
@@ -21,9 +21,28 @@ class Settings(BaseSettings):
     # 資料庫設定
     DATABASE_URL: str
 
+    # 資料庫連線池設定（同步與非同步 engine 各自擁有一個連線池）
+    DB_POOL_SIZE: int = 5  # 常駐連線數
+    DB_MAX_OVERFLOW: int = 10  # 尖峰時可額外建立的連線數
+    DB_POOL_TIMEOUT: float = 30.0  # 等待可用連線的秒數，逾時拋出 TimeoutError
+    DB_POOL_RECYCLE: int = 1800  # 連線存活秒數，超過後重建（-1 停用）
+
+    # Schema 遷移設定（正式環境於部署時執行 `python -m src.migrate`）
+    AUTO_MIGRATE_ON_STARTUP: bool = False  # 啟動時 schema 指紋不符即自動遷移（僅建議本機開發使用）
+
+    # 唯讀副本設定（未設定 DATABASE_REPLICA_URL 時所有讀取都走主庫）
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_STICKINESS_SECONDS: float = 10.0  # 使用者寫入後，這段時間內的讀取仍走主庫（read-your-writes）
+    REPLICA_RETRY_SECONDS: float = 30.0  # 副本連線失敗後，這段時間內直接改用主庫
+
     # 安全設定
     SECRET_KEY: str
 
+    # 身份快取設定（已驗證的 LIFF token → 使用者）
+    AUTH_CACHE_TTL_SECONDS: int = 300  # 快取有效秒數（預設 5 分鐘）
+    AUTH_CACHE_MAX_ENTRIES: int = 10000  # 快取最大項目數（超過時淘汰最久未使用者）
+    SESSION_TOKEN_TTL_SECONDS: int = 3600  # 後端 session token 有效秒數（預設 1 小時）
+
     # LINE Bot 設定
     LINE_CHANNEL_SECRET: str
     LINE_CHANNEL_ACCESS_TOKEN: str
@@ -37,6 +56,16 @@ class Settings(BaseSettings):
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
 
+    # 內部監控端點設定
+    METRICS_TOKEN: str | None = None  # 存取 /internal/metrics 需帶 X-Metrics-Token；未設定時僅 DEBUG 模式開放
+    QUERY_REPEAT_WARNING_THRESHOLD: int = 5  # 單一請求內相同 SQL（去除參數）執行達此次數即視為疑似 N+1
+    QUERY_COUNT_WARNING_THRESHOLD: int = 30  # 單一請求 SQL 數量達此值即寫入警告 log
+
+    # 回應壓縮（Accept-Encoding: br / gzip）
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # body 達此大小（bytes）才壓縮；串流回應一律壓縮
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11；動態回應建議 4-5，更高的品質 CPU 成本大增
+
     # 應用設定
     APP_NAME: str = "AI Wine Cellar"
     APP_VERSION: str = "2.0.0"
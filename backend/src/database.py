@@ -2,23 +2,86 @@
 資料庫連線管理
 
 使用 SQLAlchemy 2.0 的 declarative base 和 session 管理。
-提供 get_db() dependency function 供 FastAPI 路由使用。
+- 同步 engine / get_db()：供排程器、腳本與尚未遷移的路由使用
+- 非同步 engine / get_async_db()：供 async 路由使用（PostgreSQL 用 asyncpg、SQLite 用 aiosqlite），
+  查詢時不會阻塞 event loop
+- 唯讀副本（DATABASE_REPLICA_URL）：open_async_read_session() / open_read_session() 供統計、
+  儀表板與排程掃描使用；副本無法連線或使用者剛寫入時自動改用主庫
 """
 
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
 from src.config import settings
+from src.utils.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from src.utils.query_stats import install_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_kwargs(url: str, poolclass) -> dict:
+    """
+    連線池參數（由 Settings 的 DB_POOL_* 設定）
+
+    SQLite 使用 SQLAlchemy 預設的連線池，不接受這些參數。
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": poolclass,  # 可量測等待時間與逾時的 QueuePool
+        "pool_pre_ping": True,  # 連線前檢查有效性
+        "pool_size": settings.DB_POOL_SIZE,  # 連線池大小
+        "max_overflow": settings.DB_MAX_OVERFLOW,  # 最大溢出連線數
+        "pool_timeout": settings.DB_POOL_TIMEOUT,  # 等待可用連線的秒數
+        "pool_recycle": settings.DB_POOL_RECYCLE,  # 連線存活秒數
+    }
+
+
+def async_database_url(url: str) -> str:
+    """
+    將 DATABASE_URL 轉換為 async driver 的 URL
+
+    - postgres:// / postgresql:// / postgresql+psycopg2:// → postgresql+asyncpg://
+      （asyncpg 不認得 libpq 的 sslmode 參數，改為 ssl）
+    - sqlite:// → sqlite+aiosqlite://
+    """
+    parsed = make_url(url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url)
+    backend = parsed.get_backend_name()
+
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+        sslmode = parsed.query.get("sslmode")
+        if sslmode:
+            parsed = parsed.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+
+    return parsed.render_as_string(hide_password=False)
+
 
 # 建立資料庫引擎
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,  # 開發模式下印出 SQL 語句
-    pool_pre_ping=True,  # 連線前檢查有效性
-    pool_size=5,  # 連線池大小
-    max_overflow=10,  # 最大溢出連線數
+    **_pool_kwargs(settings.DATABASE_URL, InstrumentedQueuePool),
 )
+instrument_engine(engine, "primary")
+
+# 每個請求的 SQL 數量 / 耗時統計（註冊在 Engine 類別上，所有 engine 共用）
+install_query_stats()
 
 # 建立 Session 工廠
 SessionLocal = sessionmaker(
@@ -27,10 +90,156 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# 建立非同步資料庫引擎
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    echo=settings.DEBUG,
+    **_pool_kwargs(settings.DATABASE_URL, InstrumentedAsyncAdaptedQueuePool),
+)
+instrument_engine(async_engine, "primary_async")
+
+# 建立 AsyncSession 工廠
+# expire_on_commit=False：commit 後仍可讀取物件屬性，避免在 async context 觸發隱式 lazy load
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# 唯讀副本（選用）
+replica_engine = None
+ReplicaSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        echo=settings.DEBUG,
+        **_pool_kwargs(settings.DATABASE_REPLICA_URL, InstrumentedQueuePool),
+    )
+    instrument_engine(replica_engine, "replica")
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+    async_replica_engine = create_async_engine(
+        async_database_url(settings.DATABASE_REPLICA_URL),
+        echo=settings.DEBUG,
+        **_pool_kwargs(settings.DATABASE_REPLICA_URL, InstrumentedAsyncAdaptedQueuePool),
+    )
+    instrument_engine(async_replica_engine, "replica_async")
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine, autoflush=False, expire_on_commit=False
+    )
+
 # 建立 Base 類別（所有 model 繼承此類別）
 Base = declarative_base()
 
 
+# ============ Read-your-writes 追蹤 ============
+
+# 目前請求的使用者（由 get_current_user_id 設定），commit 有寫入時用來記錄「剛寫入」
+current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+
+_recent_writes: dict[int, float] = {}
+_recent_writes_lock = threading.Lock()
+_replica_down_until = 0.0
+
+
+def mark_user_write(user_id: int) -> None:
+    """記錄使用者剛寫入主庫；REPLICA_STICKINESS_SECONDS 內該使用者的讀取走主庫"""
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now
+        # 順便清掉過期項目，避免字典無限成長
+        if len(_recent_writes) > 10000:
+            cutoff = now - settings.REPLICA_STICKINESS_SECONDS
+            for uid in [u for u, t in _recent_writes.items() if t < cutoff]:
+                del _recent_writes[uid]
+
+
+def has_recent_write(user_id: Optional[int]) -> bool:
+    """使用者是否在 stickiness 視窗內寫入過"""
+    if user_id is None:
+        return False
+    written_at = _recent_writes.get(user_id)
+    return written_at is not None and time.monotonic() - written_at < settings.REPLICA_STICKINESS_SECONDS
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush_write(session, flush_context):
+    """ORM flush（新增/修改/刪除物件）視為寫入"""
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_write(orm_execute_state):
+    """session.execute(insert/update/delete) 視為寫入"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_commit_write(session):
+    """commit 成功且有寫入時，記錄目前請求的使用者"""
+    if session.info.pop("has_writes", False):
+        user_id = current_user_id.get()
+        if user_id is not None:
+            mark_user_write(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_write_flag(session):
+    session.info.pop("has_writes", None)
+
+
+# ============ 副本路由 ============
+
+def _replica_available() -> bool:
+    return time.monotonic() >= _replica_down_until
+
+
+def _mark_replica_down(error: Exception) -> None:
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+    logger.warning(
+        f"唯讀副本無法連線，{settings.REPLICA_RETRY_SECONDS:.0f} 秒內改用主庫: {error}"
+    )
+
+
+def _use_replica(user_id: Optional[int], factory) -> bool:
+    return factory is not None and _replica_available() and not has_recent_write(user_id)
+
+
+def open_read_session(user_id: Optional[int] = None) -> Session:
+    """
+    開啟唯讀用途的同步 session（排程器、管理後台）
+
+    副本可用且使用者近期沒有寫入時連到副本（先取得連線確認可用），否則使用主庫。
+    """
+    if _use_replica(user_id, ReplicaSessionLocal):
+        db = ReplicaSessionLocal()
+        try:
+            db.connection()
+            return db
+        except Exception as e:
+            db.close()
+            _mark_replica_down(e)
+    return SessionLocal()
+
+
+async def open_async_read_session(user_id: Optional[int] = None) -> AsyncSession:
+    """open_read_session 的非同步版本（async 路由）"""
+    if _use_replica(user_id, AsyncReplicaSessionLocal):
+        db = AsyncReplicaSessionLocal()
+        try:
+            await db.connection()
+            return db
+        except Exception as e:
+            await db.close()
+            _mark_replica_down(e)
+    return AsyncSessionLocal()
+
+
 def get_db() -> Session:
     """
     FastAPI dependency function
@@ -47,3 +256,32 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency function（非同步版本）
+
+    提供 AsyncSession，使用完畢後自動關閉。
+
+    使用方式:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db() -> Session:
+    """
+    FastAPI dependency function（唯讀，不需登入的端點）
+
+    提供可能連到唯讀副本的 session，資料可能有數秒延遲。
+    """
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -6,6 +6,7 @@ FastAPI 主應用程式
 
 from contextlib import asynccontextmanager
 import logging
+import time
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,113 +15,16 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 import os
 
-from sqlalchemy import text, inspect
-
 from src.config import settings
-from src.database import Base, engine
+from src.database import engine
 from src import models  # 確保所有 models 都被導入
-
-
-def run_migrations():
-    """
-    執行資料庫遷移 - 新增缺少的欄位
-
-    這是一個簡易的遷移方案，在啟動時檢查並新增缺少的欄位。
-    """
-    print("🔄 開始執行資料庫遷移檢查...")
-    try:
-        inspector = inspect(engine)
-        table_names = inspector.get_table_names()
-        print(f"📋 資料庫現有表格: {table_names}")
-
-        # 檢查 wine_items 表格是否存在
-        if 'wine_items' not in table_names:
-            print("⚠️ wine_items 表格尚未建立，跳過遷移")
-            return
-
-        # 取得 wine_items 表格現有欄位
-        existing_columns = {col['name'] for col in inspector.get_columns('wine_items')}
-        print(f"📋 wine_items 現有欄位: {sorted(existing_columns)}")
-
-        # 需要新增的欄位 (欄位名, 類型)
-        new_columns = [
-            ('rating', 'INTEGER'),
-            ('review', 'TEXT'),
-            ('flavor_tags', 'TEXT'),
-            ('aroma', 'TEXT'),
-            ('palate', 'TEXT'),
-            ('finish', 'TEXT'),
-            ('acidity', 'INTEGER'),
-            ('tannin', 'INTEGER'),
-            ('body', 'INTEGER'),
-            ('sweetness', 'INTEGER'),
-            ('alcohol_feel', 'INTEGER'),
-        ]
-
-        missing_columns = [col for col, _ in new_columns if col not in existing_columns]
-        print(f"📋 需要新增的欄位: {missing_columns}")
-
-        # 檢查 invitations 表格的欄位
-        invitation_columns = {}
-        if 'invitations' in table_names:
-            invitation_columns = {col['name'] for col in inspector.get_columns('invitations')}
-            print(f"📋 invitations 現有欄位: {sorted(invitation_columns)}")
-
-        with engine.connect() as conn:
-            # 處理 wine_items 表格遷移
-            if missing_columns:
-                for col_name, col_type in new_columns:
-                    if col_name not in existing_columns:
-                        try:
-                            conn.execute(text(f'ALTER TABLE wine_items ADD COLUMN {col_name} {col_type}'))
-                            conn.commit()
-                            print(f"✅ 已新增欄位: wine_items.{col_name}")
-                        except Exception as e:
-                            print(f"⚠️ 新增欄位 {col_name} 失敗: {e}")
-            
-            # 處理 invitations 表格的缺失欄位
-            if 'invitations' in table_names:
-                # 檢查並新增 host_id 欄位
-                if 'host_id' not in invitation_columns:
-                    try:
-                        conn.execute(text('ALTER TABLE invitations ADD COLUMN host_id INTEGER'))
-                        conn.commit()
-                        print("✅ 已新增欄位: invitations.host_id")
-                    except Exception as e:
-                        print(f"⚠️ 新增 host_id 欄位失敗: {e}")
-                
-                # 檢查並新增 allow_forwarding 欄位
-                if 'allow_forwarding' not in invitation_columns:
-                    try:
-                        conn.execute(text('ALTER TABLE invitations ADD COLUMN allow_forwarding BOOLEAN DEFAULT TRUE'))
-                        conn.commit()
-                        print("✅ 已新增欄位: invitations.allow_forwarding")
-                    except Exception as e:
-                        print(f"⚠️ 新增 allow_forwarding 欄位失敗: {e}")
-                
-                # 修復 NULL 值
-                try:
-                    result = conn.execute(text('UPDATE invitations SET allow_forwarding = TRUE WHERE allow_forwarding IS NULL'))
-                    conn.commit()
-                    print(f"✅ 修復了 {result.rowcount} 筆 allow_forwarding NULL 值")
-                except Exception as e:
-                    print(f"⚠️ 修復 allow_forwarding NULL 值失敗: {e}")
-
-        if not missing_columns and 'allow_forwarding' in invitation_columns:
-            print("✅ 所有欄位已存在，無需遷移")
-            
-        print("🔄 資料庫遷移完成")
-    except Exception as e:
-        print(f"❌ 資料庫遷移檢查失敗: {e}")
-        import traceback
-        traceback.print_exc()
-
-
+from src.migrate import migrate, schema_is_current
+from src.middleware import CompressionMiddleware, QueryStatsMiddleware
 from src.services import scheduler
 # 酒窖與酒款路由
 from src.routes import wine_items, wine_cellars
 # 功能路由
-from src.routes import line_webhook, notifications, budget, recipes, invitations, admin
+from src.routes import line_webhook, notifications, budget, recipes, invitations, admin, auth, metrics
 
 
 logger = logging.getLogger(__name__)
@@ -131,77 +35,27 @@ async def lifespan(app: FastAPI):
     """
     應用程式生命週期管理
 
-    啟動時: 建立資料庫表格、啟動排程器
+    啟動時: 以單一查詢比對 schema 指紋、啟動排程器
     關閉時: 關閉排程器
+
+    Schema 遷移與修復由 `python -m src.migrate` 於部署時執行；
+    僅在 AUTO_MIGRATE_ON_STARTUP 開啟（本機開發）時才於啟動流程中遷移。
     """
     # Startup
-    # 修復可能缺少主鍵的表格（生產環境已知問題）
-    try:
-        inspector = inspect(engine)
-        table_names = inspector.get_table_names()
-        
-        # 如果 recipes 表存在但缺少主鍵，先修復
-        if 'recipes' in table_names:
-            pk = inspector.get_pk_constraint('recipes')
-            if not pk or not pk.get('constrained_columns'):
-                print("⚠️ recipes 表缺少主鍵，嘗試修復...")
-                with engine.connect() as conn:
-                    try:
-                        conn.execute(text('ALTER TABLE recipes ADD PRIMARY KEY (id)'))
-                        conn.commit()
-                        print("✅ 已修復 recipes 表主鍵")
-                    except Exception as e:
-                        print(f"⚠️ 修復 recipes 主鍵失敗: {e}")
-                        conn.rollback()
-        
-        # 如果 user_recipes 表有問題，先刪除讓 create_all 重建
-        if 'user_recipes' in table_names:
-            try:
-                pk = inspector.get_pk_constraint('user_recipes')
-                fks = inspector.get_foreign_keys('user_recipes')
-                if not fks:  # 外鍵不存在，表可能損壞
-                    print("⚠️ user_recipes 表外鍵異常，刪除後重建...")
-                    with engine.connect() as conn:
-                        conn.execute(text('DROP TABLE IF EXISTS user_recipes CASCADE'))
-                        conn.commit()
-            except Exception as e:
-                print(f"⚠️ 檢查 user_recipes 表失敗: {e}")
-                
-    except Exception as e:
-        print(f"⚠️ 表格預檢查失敗: {e}")
-
-    # 建立所有資料庫表格（如果不存在）
-    try:
-        print("🔧 開始建立資料庫表格...")
-        Base.metadata.create_all(bind=engine)
-        print("✅ 資料庫表格初始化完成")
-        
-        # 列出已建立的表格
-        from sqlalchemy import text
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public' ORDER BY table_name"))
-            tables = [row[0] for row in result]
-            print(f"📊 已建立 {len(tables)} 個表格: {tables}")
-            
-    except Exception as e:
-        print(f"⚠️ 資料庫建表失敗，嘗試跳過問題表格繼續啟動: {e}")
-        # 嘗試逐表建立，跳過有問題的表
-        for table in Base.metadata.sorted_tables:
-            try:
-                table.create(bind=engine, checkfirst=True)
-            except Exception as te:
-                print(f"  ⚠️ 建立表 {table.name} 失敗: {te}")
-
-    # 執行資料庫遷移（新增缺少的欄位）
-    try:
-        run_migrations()
-        print("資料庫遷移檢查完成")
-    except Exception as e:
-        print(f"⚠️ 資料庫遷移失敗，但繼續啟動: {e}")
+    started = time.perf_counter()
+    if schema_is_current(engine):
+        logger.info("資料庫 schema 指紋相符，略過 schema 檢查")
+    elif settings.AUTO_MIGRATE_ON_STARTUP:
+        try:
+            migrate(engine)
+        except Exception as e:
+            logger.error(f"資料庫遷移失敗，但繼續啟動: {e}")
+    else:
+        logger.warning("資料庫 schema 不是最新版本或無法確認，請執行 `python -m src.migrate`")
 
     # 啟動排程器
     scheduler.start_scheduler()
-    print(f"{settings.APP_NAME} v{settings.APP_VERSION} started")
+    print(f"{settings.APP_NAME} v{settings.APP_VERSION} started in {(time.perf_counter() - started) * 1000:.0f} ms")
     yield
     # Shutdown
     scheduler.stop_scheduler()
@@ -247,6 +101,13 @@ app.add_middleware(
 )
 
 
+# 每個請求的 SQL 查詢統計（N+1 偵測）
+app.add_middleware(QueryStatsMiddleware)
+
+# 回應壓縮（最外層，壓縮最終的 body；門檻見 settings.COMPRESSION_*）
+app.add_middleware(CompressionMiddleware)
+
+
 # 全局異常處理器：記錄詳細的 422 驗證錯誤
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -282,6 +143,9 @@ async def health_check():
     }
 
 
+# 註冊認證路由
+app.include_router(auth.router, prefix="/api/v1", tags=["Auth"])
+
 # 註冊酒窖路由
 app.include_router(wine_cellars.router, prefix="/api/v1", tags=["Wine Cellars"])
 app.include_router(wine_items.router, prefix="/api/v1", tags=["Wine Items"])
@@ -294,3 +158,6 @@ app.include_router(recipes.router, prefix="/api/v1", tags=["Recipes"])
 
 app.include_router(invitations.router, prefix="/api/v1", tags=["Invitations"])
 app.include_router(admin.router, prefix="/api/v1", tags=["Admin"])
+
+# 註冊內部監控路由
+app.include_router(metrics.router, tags=["Internal"])
@@ -0,0 +1,11 @@
+"""
+ASGI middleware 模組
+"""
+
+from src.middleware.compression import CompressionMiddleware
+from src.middleware.query_stats import QueryStatsMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "QueryStatsMiddleware",
+]
@@ -0,0 +1,197 @@
+"""
+回應壓縮 middleware（Brotli / gzip）
+
+依 Accept-Encoding（含 q 值）選擇 br 或 gzip，只壓縮 JSON / 文字類型的回應：
+- 一般回應：body 達 minimum_size 才壓縮（小回應壓縮後節省有限，反而多花 CPU）
+- 串流回應（more_body）：逐塊壓縮並 flush，用戶端可邊收邊解析
+- 已有 Content-Encoding、HEAD 請求、無 body 的回應（304 等）原樣傳送
+
+可壓縮類型的回應一律附 Vary: Accept-Encoding（包含因太小或用戶端不接受而未壓縮的回應），
+共用快取才不會把 identity 內容回給要求 br / gzip 的用戶端，或反之。
+壓縮後的回應 strong ETag 改為 weak（表示內容位元組已不同）。
+未安裝 brotli 時只提供 gzip。
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli 為選用
+    brotli = None
+
+# 值得壓縮的 Content-Type（前綴比對）
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+def select_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """
+    依 Accept-Encoding 選擇壓縮方式
+
+    q 值相同時 br 優先於 gzip；q=0 表示不接受。
+
+    Returns:
+        "br" / "gzip"，或 None 表示不壓縮
+    """
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[token] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in (("br",) if brotli_available else ()) + ("gzip",):
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31：gzip 格式
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """純 ASGI middleware，可壓縮一般與串流回應"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+
+    def new_compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 不壓縮時（HEAD、不接受壓縮）仍須經過 _CompressingSend 以加上 Vary
+        encoding = None
+        if scope.get("method") != "HEAD":
+            encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+class _CompressingSend:
+    """包裝 send：延後送出 response.start，直到第一塊 body 決定是否壓縮"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            await self._first_body(body, more_body)
+            return
+
+        chunk = self.compressor.compress(body)
+        chunk += self.compressor.flush() if more_body else self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _first_body(self, body: bytes, more_body: bool) -> None:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        content_type = headers.get("content-type", "")
+        declared_size = int(headers.get("content-length") or 0)
+        size = len(body) if not more_body else max(declared_size, len(body))
+        streaming_unknown_size = more_body and not declared_size
+
+        negotiable = "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+        if negotiable:
+            headers.add_vary_header("Accept-Encoding")
+
+        if (
+            not negotiable
+            or self.encoding is None
+            or (not streaming_unknown_size and size < self.middleware.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send({**self.start, "headers": headers.raw})
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self.compressor = self.middleware.new_compressor(self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+        if more_body:
+            # 串流：長度未知，逐塊 flush
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            chunk = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+            headers["Content-Length"] = str(len(chunk))
+
+        await self.send({**self.start, "headers": headers.raw})
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,65 @@
+"""
+每個請求的 SQL 查詢統計 middleware
+
+- DEBUG 模式：於回應標頭附上 X-DB-Query-Count / X-DB-Time-Ms / X-DB-Repeated-Queries
+- 所有環境：疑似 N+1 或查詢過多時寫入警告 log，並累計到各路由的查詢數據
+  （GET /internal/metrics/queries）
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.utils.query_stats import report_query_stats, route_query_metrics, track_queries
+
+
+def _route_label(scope: Scope) -> str:
+    """以路由樣板（例如 /api/v1/wine-items/{id}）分組，避免每個 ID 各自一筆"""
+    path = scope.get("path", "")
+    template = getattr(scope.get("route"), "path", None)
+    if template:
+        # include_router 的 prefix 不一定在 route.path 內，由實際路徑的前段補回
+        segments = path.strip("/").split("/")
+        template_segments = template.strip("/").split("/")
+        prefix = segments[: max(len(segments) - len(template_segments), 0)]
+        if not template.startswith("/" + "/".join(prefix)):
+            template = "/" + "/".join(prefix + template_segments)
+        path = template
+    return f"{scope.get('method', '')} {path}"
+
+
+class QueryStatsMiddleware:
+    """純 ASGI middleware（不包裝 response body，串流回應也適用）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope.get('method', '')} {scope.get('path', '')}") as stats:
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    repeated = stats.repeated(settings.QUERY_REPEAT_WARNING_THRESHOLD)
+                    headers = list(message.get("headers", []))
+                    headers += [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()),
+                        (b"x-db-repeated-queries", str(len(repeated)).encode()),
+                    ]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                stats.label = _route_label(scope)
+                repeated = report_query_stats(
+                    stats,
+                    repeat_threshold=settings.QUERY_REPEAT_WARNING_THRESHOLD,
+                    count_threshold=settings.QUERY_COUNT_WARNING_THRESHOLD,
+                )
+                if stats.count:
+                    route_query_metrics.record(stats.label, stats, n_plus_one=bool(repeated))
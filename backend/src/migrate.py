@@ -0,0 +1,297 @@
+"""
+資料庫 schema 遷移入口
+
+將原本每次啟動都在 lifespan 內執行的表格檢查、主鍵修復、create_all、
+information_schema 查詢與 ALTER/UPDATE 移到獨立的指令，於部署時執行一次：
+
+    python -m src.migrate            # 升級到最新 schema 並寫入指紋
+    python -m src.migrate --check    # 只檢查，schema 非最新時 exit code 1
+    python -m src.migrate --force    # 忽略指紋，強制重新執行
+
+完成後會把 schema 指紋（models 結構 + alembic head 的 SHA-256）寫入 schema_state 表；
+應用程式啟動時以 schema_is_current() 單一查詢比對，相符即跳過所有 schema 工作。
+"""
+
+import argparse
+import hashlib
+import logging
+import sys
+import time
+from argparse import Namespace
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import Engine, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.database import Base, engine as default_engine
+from src import models  # noqa: F401  確保所有 models 都被導入
+from src.models import recipe, user_recipe  # noqa: F401  未列在 src.models 的 model
+from src.models.wine_item import SEARCH_OBJECT_PREFIX
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+
+# 0001_baseline 涵蓋的表格（舊資料庫由 create_all 建立，需先補齊再 stamp）
+BASELINE_TABLES = (
+    "users",
+    "wine_cellars",
+    "wine_items",
+    "notification_settings",
+    "budget_settings",
+    "recipes",
+    "user_recipes",
+    "invitations",
+)
+BASELINE_REVISION = "0001_baseline"
+
+# PostgreSQL advisory lock 鍵值，避免多個執行個體同時遷移
+MIGRATION_LOCK_KEY = 0x57494E45  # "WINE"
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """
+    alembic 比對 schema 時略過不在 models 內的搜尋物件
+    （PostgreSQL 運算式索引、SQLite FTS5 表與其 shadow tables）
+    """
+    return not (name or "").startswith(SEARCH_OBJECT_PREFIX)
+
+
+def _alembic_config(engine: Engine):
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.cmd_opts = Namespace(x=[f"url={engine.url.render_as_string(hide_password=False)}"])
+    return config
+
+
+@lru_cache(maxsize=1)
+def alembic_heads() -> tuple[str, ...]:
+    """目前程式碼中的 alembic head revision"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return tuple(sorted(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads()))
+
+
+@lru_cache(maxsize=1)
+def schema_fingerprint() -> str:
+    """
+    計算目前程式碼預期的 schema 指紋
+
+    涵蓋所有 model 的表格、欄位（型別 / nullable / 主鍵）、索引與 alembic head；
+    任何 model 或 migration 變更都會產生不同的指紋。
+    """
+    digest = hashlib.sha256()
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(f"table:{table.name}\n".encode())
+        for column in table.columns:
+            digest.update(
+                f"  column:{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}\n".encode()
+            )
+        for index in sorted(table.indexes, key=lambda ix: ix.name or ""):
+            columns = ",".join(c.name for c in index.columns)
+            digest.update(f"  index:{index.name}:{columns}:{index.unique}\n".encode())
+    digest.update(f"heads:{','.join(alembic_heads())}\n".encode())
+    return digest.hexdigest()
+
+
+def stored_fingerprint(engine: Engine) -> str | None:
+    """讀取資料庫中的 schema 指紋；表格不存在或無法連線時回傳 None"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT fingerprint FROM schema_state WHERE id = 1")).scalar()
+    except SQLAlchemyError:
+        return None
+
+
+def schema_is_current(engine: Engine = default_engine) -> bool:
+    """啟動快速路徑：一次查詢確認資料庫 schema 與程式碼一致"""
+    return stored_fingerprint(engine) == schema_fingerprint()
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    """PostgreSQL 以 session 層級 advisory lock 序列化遷移；其他資料庫不需鎖定"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+
+
+def repair_legacy_tables(engine: Engine) -> None:
+    """
+    修復舊版資料庫的已知問題（生產環境已知問題）
+
+    - recipes 表缺少主鍵
+    - user_recipes 表外鍵遺失（刪除後由 create_all 重建）
+    """
+    inspector = inspect(engine)
+    table_names = inspector.get_table_names()
+
+    if "recipes" in table_names:
+        pk = inspector.get_pk_constraint("recipes")
+        if not pk or not pk.get("constrained_columns"):
+            logger.warning("recipes 表缺少主鍵，嘗試修復...")
+            with engine.connect() as conn:
+                try:
+                    conn.execute(text("ALTER TABLE recipes ADD PRIMARY KEY (id)"))
+                    conn.commit()
+                    logger.info("已修復 recipes 表主鍵")
+                except SQLAlchemyError as e:
+                    logger.warning(f"修復 recipes 主鍵失敗: {e}")
+                    conn.rollback()
+
+    if "user_recipes" in table_names and not inspector.get_foreign_keys("user_recipes"):
+        logger.warning("user_recipes 表外鍵異常，刪除後重建...")
+        with engine.connect() as conn:
+            drop_sql = "DROP TABLE IF EXISTS user_recipes"
+            if engine.dialect.name == "postgresql":
+                drop_sql += " CASCADE"
+            conn.execute(text(drop_sql))
+            conn.commit()
+
+
+def run_legacy_migrations(engine: Engine) -> None:
+    """
+    補齊舊版資料庫缺少的欄位
+
+    原本在每次啟動時執行的簡易遷移，現在只在尚未納入 alembic 管理的資料庫上執行一次。
+    """
+    inspector = inspect(engine)
+    table_names = inspector.get_table_names()
+
+    new_columns = [
+        ("rating", "INTEGER"),
+        ("review", "TEXT"),
+        ("flavor_tags", "TEXT"),
+        ("aroma", "TEXT"),
+        ("palate", "TEXT"),
+        ("finish", "TEXT"),
+        ("acidity", "INTEGER"),
+        ("tannin", "INTEGER"),
+        ("body", "INTEGER"),
+        ("sweetness", "INTEGER"),
+        ("alcohol_feel", "INTEGER"),
+    ]
+
+    with engine.connect() as conn:
+        if "wine_items" in table_names:
+            existing_columns = {col["name"] for col in inspector.get_columns("wine_items")}
+            for col_name, col_type in new_columns:
+                if col_name not in existing_columns:
+                    conn.execute(text(f"ALTER TABLE wine_items ADD COLUMN {col_name} {col_type}"))
+                    conn.commit()
+                    logger.info(f"已新增欄位: wine_items.{col_name}")
+
+        if "invitations" in table_names:
+            invitation_columns = {col["name"] for col in inspector.get_columns("invitations")}
+            if "host_id" not in invitation_columns:
+                conn.execute(text("ALTER TABLE invitations ADD COLUMN host_id INTEGER"))
+                conn.commit()
+                logger.info("已新增欄位: invitations.host_id")
+            if "allow_forwarding" not in invitation_columns:
+                conn.execute(text("ALTER TABLE invitations ADD COLUMN allow_forwarding BOOLEAN DEFAULT TRUE"))
+                conn.commit()
+                logger.info("已新增欄位: invitations.allow_forwarding")
+
+            result = conn.execute(text("UPDATE invitations SET allow_forwarding = TRUE WHERE allow_forwarding IS NULL"))
+            conn.commit()
+            if result.rowcount:
+                logger.info(f"修復了 {result.rowcount} 筆 allow_forwarding NULL 值")
+
+
+def _adopt_legacy_database(engine: Engine) -> None:
+    """
+    將 create_all 時代建立的資料庫納入 alembic 管理
+
+    修復已知問題、補齊 baseline 表格與欄位，再標記為 0001_baseline，
+    之後的 migration 由 alembic upgrade 正常套用。
+    """
+    from alembic import command
+
+    logger.info("偵測到未納入 alembic 管理的既有資料庫，補齊 baseline schema...")
+    repair_legacy_tables(engine)
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[Base.metadata.tables[name] for name in BASELINE_TABLES],
+    )
+    run_legacy_migrations(engine)
+    command.stamp(_alembic_config(engine), BASELINE_REVISION)
+
+
+def _write_fingerprint(engine: Engine) -> None:
+    from src.models.schema_state import SchemaState
+
+    with engine.begin() as conn:
+        conn.execute(SchemaState.__table__.delete())
+        conn.execute(
+            SchemaState.__table__.insert().values(
+                id=1,
+                fingerprint=schema_fingerprint(),
+                alembic_revision=",".join(alembic_heads()),
+            )
+        )
+
+
+def migrate(engine: Engine = default_engine, force: bool = False) -> bool:
+    """
+    將資料庫升級到最新 schema
+
+    Returns:
+        bool: 是否實際執行了遷移（schema 已是最新時回傳 False）
+    """
+    from alembic import command
+
+    if not force and schema_is_current(engine):
+        logger.info("資料庫 schema 已是最新，略過遷移")
+        return False
+
+    with _migration_lock(engine):
+        # 取得鎖之後再檢查一次：其他執行個體可能剛完成遷移
+        if not force and schema_is_current(engine):
+            logger.info("資料庫 schema 已由其他執行個體更新，略過遷移")
+            return False
+
+        table_names = set(inspect(engine).get_table_names())
+        if "alembic_version" not in table_names and table_names & set(BASELINE_TABLES):
+            _adopt_legacy_database(engine)
+
+        command.upgrade(_alembic_config(engine), "head")
+        _write_fingerprint(engine)
+
+    logger.info(f"資料庫 schema 已升級至 {','.join(alembic_heads())}")
+    return True
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="資料庫 schema 遷移")
+    parser.add_argument("--check", action="store_true", help="只檢查 schema 是否為最新（非最新時 exit code 1）")
+    parser.add_argument("--force", action="store_true", help="忽略已儲存的指紋，強制執行遷移")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.check:
+        current = schema_is_current()
+        print("schema is current" if current else "schema is out of date; run `python -m src.migrate`")
+        return 0 if current else 1
+
+    started = time.perf_counter()
+    migrate(force=args.force)
+    logger.info(f"遷移完成，耗時 {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,3 +4,5 @@ from .invitation import Invitation
 from .user import User
 from .notification_settings import NotificationSettings
 from .budget_settings import BudgetSettings
+from .schema_state import SchemaState
+from .wine_item_tombstone import WineItemTombstone
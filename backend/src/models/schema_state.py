@@ -0,0 +1,25 @@
+"""
+SchemaState 模型
+
+記錄資料庫 schema 的指紋（由 `python -m src.migrate` 寫入）。
+應用程式啟動時只需查詢這一列，指紋相符即可跳過所有 schema 檢查與修復。
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from src.database import Base
+
+
+class SchemaState(Base):
+    """Schema 版本指紋（單列表，id 固定為 1）"""
+
+    __tablename__ = "schema_state"
+
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String(64), nullable=False)         # models + alembic head 的 SHA-256
+    alembic_revision = Column(String(64), nullable=True)     # 寫入時的 alembic head
+    migrated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SchemaState(revision={self.alembic_revision}, fingerprint={self.fingerprint[:12]})>"
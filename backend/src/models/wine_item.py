@@ -6,7 +6,8 @@ WineItem 模型
 """
 
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text
+from sqlalchemy import DDL, Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, Text, and_, event, or_, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
 from src.database import Base
@@ -16,6 +17,30 @@ class WineItem(Base):
     """酒款模型 — 與 Production DB 完全同步"""
 
     __tablename__ = "wine_items"
+    # 熱門查詢索引（對應 alembic/versions/0002_wine_items_hot_path_indexes.py）
+    __table_args__ = (
+        Index("ix_wine_items_cellar_status", "cellar_id", "status"),
+        Index("ix_wine_items_cellar_id_id", "cellar_id", "id"),  # 酒款列表 keyset 分頁
+        Index("ix_wine_items_cellar_updated_at", "cellar_id", "updated_at"),  # ETag 版本查詢
+        Index("ix_wine_items_cellar_purchase_date", "cellar_id", "purchase_date"),
+        Index("ix_wine_items_cellar_brand_name", "cellar_id", "brand", "name"),
+        # 列表排序（keyset 分頁，以 id 為次要排序鍵）
+        Index("ix_wine_items_cellar_vintage_id", "cellar_id", "vintage", "id"),
+        Index("ix_wine_items_cellar_price_id", "cellar_id", "purchase_price", "id"),
+        Index("ix_wine_items_cellar_drinking_end_id", "cellar_id", "optimal_drinking_end", "id"),
+        Index("ix_wine_items_cellar_rating_id", "cellar_id", "rating", "id"),
+        Index("ix_wine_items_cellar_created_at_id", "cellar_id", "created_at", "id"),
+        Index(
+            "ix_wine_items_split_from_id", "split_from_id",
+            postgresql_where=text("split_from_id IS NOT NULL"),
+            sqlite_where=text("split_from_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_wine_items_optimal_drinking_end", "optimal_drinking_end",
+            postgresql_where=text("optimal_drinking_end IS NOT NULL"),
+            sqlite_where=text("optimal_drinking_end IS NOT NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     cellar_id = Column(Integer, ForeignKey("wine_cellars.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -92,22 +117,77 @@ class WineItem(Base):
     cellar = relationship("WineCellar", back_populates="wine_items")
 
     # ── 計算屬性 ──
-    @property
-    def is_optimal_now(self) -> bool:
-        """是否在最佳飲用期內"""
-        today = date.today()
-        start = self.optimal_drinking_start
-        end = self.optimal_drinking_end
+    @staticmethod
+    def compute_is_optimal_now(start: date | None, end: date | None, today: date | None = None) -> bool:
+        """依適飲期起訖判斷是否在最佳飲用期內（供只查詢欄位、不載入 ORM 物件的路徑共用）"""
+        today = today or date.today()
         if start and end:
             return start <= today <= end
         if end:
             return today <= end
         return False
 
+    @staticmethod
+    def compute_total_value(purchase_price: float | None, quantity: int | None) -> float:
+        """單價 × 數量"""
+        return float(purchase_price or 0) * (quantity or 1)
+
+    @hybrid_property
+    def is_optimal_now(self) -> bool:
+        """是否在最佳飲用期內"""
+        return self.compute_is_optimal_now(self.optimal_drinking_start, self.optimal_drinking_end)
+
+    @is_optimal_now.inplace.expression
+    @classmethod
+    def _is_optimal_now_expression(cls):
+        """SQL 條件（與 compute_is_optimal_now 相同判斷，今天日期於建立查詢時帶入）"""
+        today = date.today()
+        return and_(
+            cls.optimal_drinking_end.isnot(None),
+            cls.optimal_drinking_end >= today,
+            or_(cls.optimal_drinking_start.is_(None), cls.optimal_drinking_start <= today),
+        )
+
     @property
     def total_value(self) -> float:
         """該酒款的總價值（單價 × 數量）"""
-        return float(self.purchase_price or 0) * (self.quantity or 1)
+        return self.compute_total_value(self.purchase_price, self.quantity)
 
     def __repr__(self):
-        return f"<WineItem(id={self.id}, name='{self.name}', vintage={self.vintage})>"
\ No newline at end of file
+        return f"<WineItem(id={self.id}, name='{self.name}', vintage={self.vintage})>"
+
+
+# ── 全文搜尋（SQLite FTS5，本機開發 / 測試用）──
+# PostgreSQL 的 tsvector / pg_trgm 索引由 alembic/versions/0006_wine_items_search.py 建立；
+# SQLite 以 external content FTS5 表 + triggers 同步，create_all 時一併建立。
+# 名稱皆以 SEARCH_OBJECT_PREFIX 開頭，alembic 比對 schema 時略過（src.migrate.include_object）。
+SEARCH_OBJECT_PREFIX = "wine_items_search"
+SEARCH_FTS_TABLE = "wine_items_search_fts"
+SEARCH_COLUMNS = ("name", "brand", "region", "country", "notes", "review", "flavor_tags")
+
+_fts_columns = ", ".join(SEARCH_COLUMNS)
+_fts_new = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+_fts_old = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+SQLITE_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_FTS_TABLE} USING fts5("
+    f"{_fts_columns}, content='wine_items', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS wine_items_search_ai AFTER INSERT ON wine_items BEGIN "
+    f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, {_fts_columns}) VALUES (new.id, {_fts_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS wine_items_search_ad AFTER DELETE ON wine_items BEGIN "
+    f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, {_fts_columns}) "
+    f"VALUES ('delete', old.id, {_fts_old}); END",
+    # 只有搜尋欄位變更時才重建索引（數量、狀態等更新不觸發）
+    f"CREATE TRIGGER IF NOT EXISTS wine_items_search_au AFTER UPDATE OF {_fts_columns} ON wine_items BEGIN "
+    f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, {_fts_columns}) "
+    f"VALUES ('delete', old.id, {_fts_old}); "
+    f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, {_fts_columns}) VALUES (new.id, {_fts_new}); END",
+)
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(WineItem.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    WineItem.__table__, "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {SEARCH_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
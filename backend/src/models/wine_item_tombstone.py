@@ -0,0 +1,29 @@
+"""
+WineItemTombstone 模型
+
+記錄已刪除的酒款，供 GET /wine-items/changes 回報刪除；
+酒窖刪除時其所有酒款一併寫入，因此保留 owner_id 而不以外鍵指向酒窖。
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from src.database import Base
+
+
+class WineItemTombstone(Base):
+    """已刪除酒款的 tombstone（超過保留期限由排程清除）"""
+
+    __tablename__ = "wine_item_tombstones"
+    __table_args__ = (
+        Index("ix_wine_item_tombstones_owner_deleted_at", "owner_id", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    wine_item_id = Column(Integer, nullable=False)   # 被刪除的酒款 ID
+    cellar_id = Column(Integer, nullable=False)      # 刪除時所在的酒窖
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<WineItemTombstone(wine_item_id={self.wine_item_id}, deleted_at={self.deleted_at})>"
@@ -6,7 +6,7 @@ AI Wine Cellar - 個人數位酒窖
 """
 
 # 酒窖路由
-from src.routes import wine_items, wine_cellars, line_webhook, notifications, budget, recipes, invitations, admin
+from src.routes import wine_items, wine_cellars, line_webhook, notifications, budget, recipes, invitations, admin, auth, metrics
 
 __all__ = [
     "wine_items", 
@@ -17,4 +17,6 @@ __all__ = [
     "recipes",
     "invitations",
     "admin",
+    "auth",
+    "metrics",
 ]
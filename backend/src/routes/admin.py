@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Dict, Any
 from datetime import datetime
-from src.database import get_db
+from src.database import get_read_db
 from src.models.user import User
 from src.models.wine_cellar import WineCellar
 from src.models.wine_item import WineItem
@@ -16,8 +16,12 @@ from src.models.invitation import Invitation
 router = APIRouter()
 
 @router.get("/dashboard/stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
-    """獲取管理後台統計資料"""
+def get_dashboard_stats(db: Session = Depends(get_read_db)) -> Dict[str, Any]:
+    """
+    獲取管理後台統計資料（讀取唯讀副本，數據可能有數秒延遲）
+
+    使用同步 Session，定義為一般函式由 threadpool 執行，查詢副本時不阻塞 event loop。
+    """
     try:
         # 基本統計
         total_users = db.query(func.count(User.id)).scalar()
@@ -0,0 +1,50 @@
+"""
+認證 API 路由
+
+提供 LIFF access token 換發後端 session token 的端點。
+"""
+
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.config import settings
+from src.routes.dependencies import AsyncDBSession, resolve_liff_user_id, security
+from src.schemas.auth import SessionTokenResponse
+from src.services.session_token import create_session_token, looks_like_session_token
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Auth"])
+
+
+@router.post("/auth/session", response_model=SessionTokenResponse)
+async def exchange_session_token(
+    db: AsyncDBSession,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    """
+    以 LIFF access token 換發後端 session token
+
+    LIFF token 透過 LINE API 驗證一次，之後的請求改帶回傳的 session token，
+    後端只需本地驗證簽章，不再呼叫 LINE API。Token 過期（401）時重新換發即可。
+    """
+    access_token = credentials.credentials
+
+    if not access_token or len(access_token) < 10 or looks_like_session_token(access_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="LIFF access token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user_id = await resolve_liff_user_id(access_token, db)
+    token, expires_at = create_session_token(user_id)
+
+    logger.info(f"使用者 {user_id} 換發 session token")
+    return SessionTokenResponse(
+        access_token=token,
+        expires_in=settings.SESSION_TOKEN_TTL_SECONDS,
+        expires_at=expires_at,
+    )
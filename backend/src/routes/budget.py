@@ -7,6 +7,7 @@
 import logging
 from typing import List
 from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy import select
 
 from src.models.user import User
 from src.models.budget_settings import BudgetSettings
@@ -17,7 +18,7 @@ from src.schemas.budget import (
     ShoppingSuggestion,
 )
 from src.services.budget_service import BudgetService
-from src.routes.dependencies import DBSession, CurrentUserId
+from src.routes.dependencies import AsyncDBSession, AsyncReadDBSession, CurrentUserId
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ router = APIRouter(tags=["Budget"])
 
 @router.get("/budget/stats", response_model=SpendingStatsResponse)
 async def get_spending_stats(
-    db: DBSession,
+    db: AsyncReadDBSession,
     user_id: CurrentUserId,
     period: str = Query('month', pattern='^(month|year)$', description="統計期間（month 或 year）")
 ):
@@ -54,7 +55,7 @@ async def get_spending_stats(
     """
     try:
         # 獲取消費統計
-        stats = BudgetService.get_spending_stats(db, user_id, period=period)
+        stats = await BudgetService.get_spending_stats(db, user_id, period=period)
 
         logger.info(f"使用者 {user_id} 獲取 {period} 消費統計: 總消費 {stats.total_spending}")
         return stats
@@ -69,7 +70,7 @@ async def get_spending_stats(
         )
     except Exception as e:
         logger.error(f"獲取消費統計失敗: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="獲取消費統計失敗"
@@ -78,7 +79,7 @@ async def get_spending_stats(
 
 @router.get("/budget/settings", response_model=BudgetSettingsResponse)
 async def get_budget_settings(
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -98,9 +99,9 @@ async def get_budget_settings(
     """
     try:
         # 查詢預算設定
-        settings = db.query(BudgetSettings).filter(
-            BudgetSettings.user_id == user_id
-        ).first()
+        settings = (await db.execute(
+            select(BudgetSettings).where(BudgetSettings.user_id == user_id)
+        )).scalars().first()
 
         # 如果不存在，建立預設設定
         if not settings:
@@ -111,8 +112,8 @@ async def get_budget_settings(
                 warning_threshold=80
             )
             db.add(settings)
-            db.commit()
-            db.refresh(settings)
+            await db.commit()
+            await db.refresh(settings)
 
         return settings
 
@@ -120,7 +121,7 @@ async def get_budget_settings(
         raise
     except Exception as e:
         logger.error(f"獲取預算設定失敗: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="獲取預算設定失敗"
@@ -130,7 +131,7 @@ async def get_budget_settings(
 @router.put("/budget/settings", response_model=BudgetSettingsResponse)
 async def update_budget_settings(
     settings_update: BudgetSettingsUpdate,
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -152,9 +153,9 @@ async def update_budget_settings(
     """
     try:
         # 查詢預算設定
-        settings = db.query(BudgetSettings).filter(
-            BudgetSettings.user_id == user_id
-        ).first()
+        settings = (await db.execute(
+            select(BudgetSettings).where(BudgetSettings.user_id == user_id)
+        )).scalars().first()
 
         # 如果不存在，建立預設設定
         if not settings:
@@ -172,8 +173,8 @@ async def update_budget_settings(
         for field, value in update_data.items():
             setattr(settings, field, value)
 
-        db.commit()
-        db.refresh(settings)
+        await db.commit()
+        await db.refresh(settings)
 
         logger.info(f"使用者 {user_id} 的預算設定已更新: 預算={settings.monthly_budget}, 門檻={settings.warning_threshold}%")
         return settings
@@ -182,14 +183,14 @@ async def update_budget_settings(
         raise
     except ValueError as e:
         logger.error(f"更新預算設定失敗（驗證錯誤）: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
         logger.error(f"更新預算設定失敗: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="更新預算設定失敗"
@@ -198,7 +199,7 @@ async def update_budget_settings(
 
 @router.get("/budget/shopping-suggestions", response_model=List[ShoppingSuggestion])
 async def get_shopping_suggestions(
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -221,7 +222,7 @@ async def get_shopping_suggestions(
     """
     try:
         # 獲取採買建議
-        suggestions = BudgetService.get_shopping_suggestions(db, user_id)
+        suggestions = await BudgetService.get_shopping_suggestions(db, user_id)
 
         logger.info(f"為使用者 {user_id} 生成 {len(suggestions)} 個採買建議")
         return suggestions
@@ -230,7 +231,7 @@ async def get_shopping_suggestions(
         raise
     except Exception as e:
         logger.error(f"獲取採買建議失敗: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="獲取採買建議失敗"
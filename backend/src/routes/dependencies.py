@@ -5,21 +5,31 @@ FastAPI 依賴注入模組
 """
 
 import logging
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
 import httpx
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.config import settings
-from src.database import get_db
+from src.database import current_user_id, get_async_db, get_db, open_async_read_session
+from src.services.identity_cache import identity_cache
+from src.services.session_token import looks_like_session_token, verify_session_token
+from src.services.single_flight import SingleFlight
+from src.services.user_provisioning import get_or_create_user_id
 
 logger = logging.getLogger(__name__)
 
 # HTTP Bearer token 認證
 security = HTTPBearer()
 
+# 並行請求合併：以 token 雜湊合併 LINE 驗證，以 line_user_id 合併使用者建立
+_token_flight = SingleFlight()
+_user_flight = SingleFlight()
+
 
 async def verify_liff_token(access_token: str) -> dict:
     """
@@ -89,18 +99,59 @@ async def verify_liff_token(access_token: str) -> dict:
 
 async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> int:
     """
-    從 Authorization header 取得 LIFF access token，驗證後返回資料庫 User.id
+    從 Authorization header 取得 token，驗證後返回資料庫 User.id
+
+    流程：
+    1. 從 header 取得 token
+    2. 後端簽發的 session token：本地驗證簽章後直接返回（不呼叫 LINE API、不查詢資料庫）
+    3. LIFF access token：見 resolve_liff_user_id
+
+    解析出的 User.id 會記錄在 current_user_id context，供唯讀副本路由判斷 read-your-writes。
+    """
+    user_id = await _resolve_user_id(credentials.credentials, db)
+    current_user_id.set(user_id)
+    return user_id
+
+
+async def _resolve_user_id(access_token: str, db: AsyncSession) -> int:
+    """依 token 種類解析 User.id"""
+    if not access_token or len(access_token) < 10:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # 快速路徑：後端簽發的 session token
+    if looks_like_session_token(access_token):
+        try:
+            return verify_session_token(access_token)
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session token expired",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        except jwt.InvalidTokenError:
+            pass  # 非本服務簽發的 JWT，改走 LIFF 驗證
+
+    return await resolve_liff_user_id(access_token, db)
+
+
+async def resolve_liff_user_id(access_token: str, db: AsyncSession) -> int:
+    """
+    驗證 LIFF access token 並返回資料庫 User.id
 
     流程：
-    1. 從 header 取得 LIFF access token
-    2. 調用 LINE API 驗證 token 並獲取用戶 profile
-    3. 用真正的 LINE User ID 查找或創建用戶
+    1. 命中身份快取時直接返回（不呼叫 LINE API、不查詢資料庫）
+    2. 調用 LINE API 驗證 token 並獲取用戶 profile（同 token 並行請求只呼叫一次）
+    3. 用真正的 LINE User ID 查找或創建用戶，並寫入身份快取
 
     Args:
-        credentials: HTTPBearer 自動解析的認證憑證
+        access_token: LIFF access token
         db: 資料庫 session
 
     Returns:
@@ -109,17 +160,19 @@ async def get_current_user_id(
     Raises:
         HTTPException: token 無效或創建失敗時拋出錯誤
     """
-    from src.models.user import User
+    # 快取命中：token 近期已驗證過
+    cached = identity_cache.get(access_token)
+    if cached is not None:
+        return cached.user_id
 
-    access_token = credentials.credentials
+    # 同一 token 的並行請求只驗證/建立一次
+    return await _token_flight.do(
+        identity_cache.hash_token(access_token), _authenticate, access_token, db
+    )
 
-    if not access_token or len(access_token) < 10:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
 
+async def _authenticate(access_token: str, db: AsyncSession) -> int:
+    """驗證 LIFF token 並解析出 User.id，成功後寫入身份快取"""
     # 驗證 token 並獲取用戶資料
     profile = await verify_liff_token(access_token)
     line_user_id = profile.get("userId")
@@ -132,55 +185,46 @@ async def get_current_user_id(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # 查找用戶（用真正的 LINE User ID）
-    try:
-        user = db.query(User).filter(User.line_user_id == line_user_id).first()
-
-        if not user:
-            # 檢查是否有舊的用戶資料（用 access token 當 ID 的）
-            old_user = db.query(User).filter(User.line_user_id == access_token).first()
-            if old_user:
-                logger.info(f"更新舊用戶的 line_user_id: {old_user.id}")
-                old_user.line_user_id = line_user_id
-                old_user.display_name = display_name
-                db.commit()
-                db.refresh(old_user)
-                return old_user.id
-
-            # 創建新用戶
-            logger.info(f"創建新用戶: line_user_id={line_user_id}")
-            user = User(
-                line_user_id=line_user_id,
-                display_name=display_name,
-                storage_mode="simple"
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-            # 為新用戶建立預設酒窖
-            from src.models.wine_cellar import WineCellar
-            default_cellar = WineCellar(
-                owner_id=user.id,
-                name="我的酒窖",
-                description="自動建立的預設酒窖",
-                capacity=50
-            )
-            db.add(default_cellar)
-            db.commit()
-            logger.info(f"為新用戶 {user.id} 建立預設酒窖 (ID: {default_cellar.id})")
+    # 同一 LINE 使用者（可能帶著不同 token）的並行建立只執行一次
+    user_id = await _user_flight.do(
+        line_user_id, _get_or_create_user, db, line_user_id, display_name, access_token
+    )
+    identity_cache.set(access_token, line_user_id, user_id)
+    return user_id
+
 
-        return user.id
+async def _get_or_create_user(db: AsyncSession, line_user_id: str, display_name: str, access_token: str) -> int:
+    """用真正的 LINE User ID 查找用戶，不存在時建立用戶與預設酒窖（單一 transaction）"""
+    try:
+        return await get_or_create_user_id(db, line_user_id, display_name, legacy_line_user_id=access_token)
 
     except Exception as e:
         logger.error(f"獲取/創建用戶失敗: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error during auth: {str(e)}"
         )
 
 
+async def get_async_read_db(
+    user_id: int = Depends(get_current_user_id),
+) -> AsyncIterator[AsyncSession]:
+    """
+    唯讀端點的 AsyncSession
+
+    設定 DATABASE_REPLICA_URL 時連到唯讀副本；副本無法連線、或使用者在
+    REPLICA_STICKINESS_SECONDS 內寫入過時改用主庫。只能用於不寫入的端點。
+    """
+    db = await open_async_read_session(user_id)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 # 類型別名（方便在路由中使用）
 DBSession = Annotated[Session, Depends(get_db)]
+AsyncDBSession = Annotated[AsyncSession, Depends(get_async_db)]
+AsyncReadDBSession = Annotated[AsyncSession, Depends(get_async_read_db)]
 CurrentUserId = Annotated[int, Depends(get_current_user_id)]
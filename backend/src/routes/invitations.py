@@ -1,8 +1,10 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from src.database import get_db
+from src.database import get_async_db
 from src.models.invitation import Invitation
 from src.schemas.invitation import InvitationCreate, InvitationResponse, InvitationUpdate, AttendeeJoinRequest, AttendeeInfo
 from src.services import storage
@@ -16,7 +18,7 @@ router = APIRouter(
 @router.post("/upload-image", status_code=status.HTTP_201_CREATED)
 async def upload_invitation_image(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     上傳邀請函主題圖片
@@ -28,7 +30,7 @@ async def upload_invitation_image(
     
     try:
         content = await file.read()
-        upload_result = storage.upload_image(content, folder="invitations")
+        upload_result = await asyncio.to_thread(storage.upload_image, content, folder="invitations")
         return {"url": upload_result["url"]}
     except Exception as e:
         raise HTTPException(
@@ -37,10 +39,10 @@ async def upload_invitation_image(
         )
 
 @router.get("", response_model=List[InvitationResponse])
-def get_invitations(db: Session = Depends(get_db)):
+async def get_invitations(db: AsyncSession = Depends(get_async_db)):
     """獲取所有邀請函"""
     try:
-        invitations = db.query(Invitation).all()
+        invitations = (await db.execute(select(Invitation))).scalars().all()
         
         # 處理每個邀請的 JSON 字段，確保正確序列化
         for invitation in invitations:
@@ -72,12 +74,12 @@ def get_invitations(db: Session = Depends(get_db)):
         )
 
 @router.post("", response_model=InvitationResponse, status_code=status.HTTP_201_CREATED)
-def create_invitation(invitation: InvitationCreate, db: Session = Depends(get_db)):
+async def create_invitation(invitation: InvitationCreate, db: AsyncSession = Depends(get_async_db)):
     """建立新的邀請函"""
     db_invitation = Invitation(**invitation.model_dump())
     db.add(db_invitation)
-    db.commit()
-    db.refresh(db_invitation)
+    await db.commit()
+    await db.refresh(db_invitation)
     
     # 確保 attendees 是 list 格式，避免序列化錯誤
     if isinstance(db_invitation.attendees, str):
@@ -95,21 +97,21 @@ def create_invitation(invitation: InvitationCreate, db: Session = Depends(get_db
     return db_invitation
 
 @router.get("/create-via-get", response_model=InvitationResponse, status_code=status.HTTP_201_CREATED)
-def create_invitation_via_get(
+async def create_invitation_via_get(
     title: str,
     event_time: str,
     location: str = "",
     description: str = "",
     wine_ids: str = "[]",  # JSON 字符串
     theme_image_url: str = "",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     透過 GET 請求建立邀請函 (解決 LINE App POST 請求限制)
     wine_ids 格式: "[1,2,3]" (JSON 字符串)
     """
     import json
-    from datetime import datetime
+    from datetime import datetime, timezone
     
     try:
         # 解析 wine_ids JSON 字符串
@@ -117,6 +119,9 @@ def create_invitation_via_get(
         
         # 解析 event_time
         event_datetime = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+        # 欄位為 naive DateTime（UTC）；asyncpg 不接受將 aware datetime 寫入 naive 欄位
+        if event_datetime.tzinfo is not None:
+            event_datetime = event_datetime.astimezone(timezone.utc).replace(tzinfo=None)
         
         db_invitation = Invitation(
             title=title,
@@ -128,8 +133,8 @@ def create_invitation_via_get(
             host_id=None  # 明確設為 None，因為沒有用戶認證
         )
         db.add(db_invitation)
-        db.commit()
-        db.refresh(db_invitation)
+        await db.commit()
+        await db.refresh(db_invitation)
         
         # 確保 attendees 是 list 格式，避免序列化錯誤
         if isinstance(db_invitation.attendees, str):
@@ -173,10 +178,10 @@ from src.models.wine_item import WineItem
 # ... (Previous imports)
 
 @router.get("/{invitation_id}", response_model=InvitationResponse)
-def get_invitation(invitation_id: int, db: Session = Depends(get_db)):
+async def get_invitation(invitation_id: int, db: AsyncSession = Depends(get_async_db)):
     """取得邀請函詳情"""
     try:
-        db_invitation = db.query(Invitation).filter(Invitation.id == invitation_id).first()
+        db_invitation = await db.get(Invitation, invitation_id)
         if not db_invitation:
             raise HTTPException(status_code=404, detail="Invitation not found")
         
@@ -184,7 +189,9 @@ def get_invitation(invitation_id: int, db: Session = Depends(get_db)):
         wine_details = []
         if db_invitation.wine_ids:
             try:
-                wines = db.query(WineItem).filter(WineItem.id.in_(db_invitation.wine_ids)).all()
+                wines = (await db.execute(
+                    select(WineItem).where(WineItem.id.in_(db_invitation.wine_ids))
+                )).scalars().all()
                 wine_details = [
                     {
                         "id": wine.id,
@@ -239,31 +246,33 @@ def get_invitation(invitation_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"取得邀請詳情失敗: {str(e)}")
 
 @router.get("/{invitation_id}/flex")
-def get_invitation_flex(invitation_id: int, db: Session = Depends(get_db)):
+async def get_invitation_flex(invitation_id: int, db: AsyncSession = Depends(get_async_db)):
     """取得邀請函的 Flex Message JSON (供前端 LIFF 發送)"""
     from src.services.flex_message import create_invitation_flex_message
 
-    db_invitation = db.query(Invitation).filter(Invitation.id == invitation_id).first()
+    db_invitation = await db.get(Invitation, invitation_id)
     if not db_invitation:
         raise HTTPException(status_code=404, detail="Invitation not found")
 
     # 取得關聯的酒款
     wines = []
     if db_invitation.wine_ids:
-        wines = db.query(WineItem).filter(WineItem.id.in_(db_invitation.wine_ids)).all()
+        wines = (await db.execute(
+            select(WineItem).where(WineItem.id.in_(db_invitation.wine_ids))
+        )).scalars().all()
 
     # 使用完整版 Flex Message（包含地點和酒名）
     return create_invitation_flex_message(db_invitation, wines)
 
 
 @router.post("/{invitation_id}/join", response_model=AttendeeInfo)
-def join_invitation(
+async def join_invitation(
     invitation_id: int,
     attendee: AttendeeJoinRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """報名參加邀請函"""
-    db_invitation = db.query(Invitation).filter(Invitation.id == invitation_id).first()
+    db_invitation = await db.get(Invitation, invitation_id)
     if not db_invitation:
         raise HTTPException(status_code=404, detail="Invitation not found")
     
@@ -283,16 +292,16 @@ def join_invitation(
     
     # 更新資料庫 (SQLAlchemy JSON 需要重新賦值才能偵測變更)
     db_invitation.attendees = current_attendees
-    db.commit()
-    db.refresh(db_invitation)
+    await db.commit()
+    await db.refresh(db_invitation)
     
     return AttendeeInfo(**new_attendee)
 
 
 @router.get("/{invitation_id}/attendees", response_model=List[AttendeeInfo])
-def get_invitation_attendees(invitation_id: int, db: Session = Depends(get_db)):
+async def get_invitation_attendees(invitation_id: int, db: AsyncSession = Depends(get_async_db)):
     """取得邀請函的報名者列表"""
-    db_invitation = db.query(Invitation).filter(Invitation.id == invitation_id).first()
+    db_invitation = await db.get(Invitation, invitation_id)
     if not db_invitation:
         raise HTTPException(status_code=404, detail="Invitation not found")
     
@@ -0,0 +1,68 @@
+"""
+內部監控 API 路由
+
+提供資料庫連線池的使用數據，用於依實際流量調整 DB_POOL_SIZE / DB_MAX_OVERFLOW；
+以及各路由的 SQL 查詢數據，用於找出 N+1 查詢。
+"""
+
+import hmac
+import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+
+from src.config import settings
+from src.utils.pool_metrics import pool_metrics_snapshot
+from src.utils.query_stats import route_query_metrics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/internal/metrics", tags=["Internal"])
+
+
+def _verify_metrics_token(token: Optional[str]) -> None:
+    """
+    驗證 X-Metrics-Token
+
+    未設定 METRICS_TOKEN 時只在 DEBUG 模式開放，避免正式環境意外公開。
+    """
+    if not settings.METRICS_TOKEN:
+        if settings.DEBUG:
+            return
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if not token or not hmac.compare_digest(token, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token"
+        )
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(x_metrics_token: Optional[str] = Header(default=None)):
+    """
+    取得資料庫連線池數據
+
+    每個 engine 一組：設定值、即時使用量（含高峰）、計數（checkout / checkin / 新建連線 / 逾時）
+    以及取得連線的等待時間直方圖（毫秒，累積計數）。
+    """
+    _verify_metrics_token(x_metrics_token)
+    return {
+        "pools": pool_metrics_snapshot(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+@router.get("/queries")
+async def get_query_metrics(x_metrics_token: Optional[str] = Header(default=None)):
+    """
+    取得各路由的 SQL 查詢數據
+
+    每個路由樣板一組：請求數、SQL 總數 / 平均 / 最大值、DB 耗時總和（毫秒）
+    以及疑似 N+1 的請求數（相同 SQL 重複達 QUERY_REPEAT_WARNING_THRESHOLD 次）。
+    """
+    _verify_metrics_token(x_metrics_token)
+    return {
+        "routes": route_query_metrics.snapshot(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
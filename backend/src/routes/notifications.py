@@ -4,13 +4,15 @@
 提供通知設定的查詢和更新功能。
 """
 
+import asyncio
 import logging
 from datetime import time
 from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
 
 from src.models.notification_settings import NotificationSettings
 from src.schemas.notification import NotificationSettingsResponse, NotificationSettingsUpdate
-from src.routes.dependencies import DBSession, CurrentUserId
+from src.routes.dependencies import AsyncDBSession, CurrentUserId
 from src.services.scheduler import check_drinking_period
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,7 @@ router = APIRouter(tags=["Notifications"])
 
 @router.get("/notifications/settings", response_model=NotificationSettingsResponse)
 async def get_notification_settings(
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -41,9 +43,9 @@ async def get_notification_settings(
     """
     try:
         # 查詢通知設定
-        settings = db.query(NotificationSettings).filter(
-            NotificationSettings.user_id == user_id
-        ).first()
+        settings = (await db.execute(
+            select(NotificationSettings).where(NotificationSettings.user_id == user_id)
+        )).scalars().first()
 
         # 如果不存在，建立預設設定
         if not settings:
@@ -61,8 +63,8 @@ async def get_notification_settings(
                 notification_time=time(9, 0)
             )
             db.add(settings)
-            db.commit()
-            db.refresh(settings)
+            await db.commit()
+            await db.refresh(settings)
 
         return settings
 
@@ -70,7 +72,7 @@ async def get_notification_settings(
         raise
     except Exception as e:
         logger.error(f"取得通知設定失敗: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="取得通知設定失敗"
@@ -80,7 +82,7 @@ async def get_notification_settings(
 @router.put("/notifications/settings", response_model=NotificationSettingsResponse)
 async def update_notification_settings(
     settings_update: NotificationSettingsUpdate,
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -102,9 +104,9 @@ async def update_notification_settings(
     """
     try:
         # 查詢通知設定
-        settings = db.query(NotificationSettings).filter(
-            NotificationSettings.user_id == user_id
-        ).first()
+        settings = (await db.execute(
+            select(NotificationSettings).where(NotificationSettings.user_id == user_id)
+        )).scalars().first()
 
         # 如果不存在，建立預設設定
         if not settings:
@@ -133,8 +135,8 @@ async def update_notification_settings(
         for field, value in update_data.items():
             setattr(settings, field, value)
 
-        db.commit()
-        db.refresh(settings)
+        await db.commit()
+        await db.refresh(settings)
 
         logger.info(f"使用者 {user_id} 的通知設定已更新")
         return settings
@@ -143,14 +145,14 @@ async def update_notification_settings(
         raise
     except ValueError as e:
         logger.error(f"更新通知設定失敗（驗證錯誤）: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
         logger.error(f"更新通知設定失敗: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="更新通知設定失敗"
@@ -159,7 +161,7 @@ async def update_notification_settings(
 
 @router.post("/notifications/test-expiry-check")
 async def test_expiry_check(
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -172,7 +174,7 @@ async def test_expiry_check(
 
     try:
         # 取得用戶的 LINE User ID
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user or not user.line_user_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -181,8 +183,9 @@ async def test_expiry_check(
 
         logger.info(f"發送測試通知給用戶 {user_id} (LINE: {user.line_user_id})")
 
-        # 發送測試訊息
-        success = send_text_message(
+        # 發送測試訊息（LINE SDK 為同步 HTTP 呼叫，移到 thread 執行）
+        success = await asyncio.to_thread(
+            send_text_message,
             user.line_user_id,
             "🍷 測試通知\n\n恭喜！您的通知功能運作正常。\n\n當有酒款即將到達最佳飲用期限時，我們會透過 LINE 通知您。"
         )
@@ -4,21 +4,38 @@
 提供酒窖的 CRUD 操作和統計功能。
 """
 
+import csv
+import io
 import logging
-from typing import Optional
+from typing import AsyncIterator, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.wine_cellar import WineCellar
 from src.models.wine_item import WineItem
-from src.routes.dependencies import DBSession, CurrentUserId
+from src.routes.dependencies import AsyncDBSession, AsyncReadDBSession, CurrentUserId
+from src.routes.wine_items import RESPONSE_FIELDS, _columns_for_fields, _wine_item_dicts
+from src.services.change_feed import record_tombstones
+from src.services.conditional_get import evaluate_conditional_get, get_collection_version
+from src.services.wine_stats import compute_cellar_stats
+from src.utils.fast_json import dumps
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Wine Cellars"])
 
+# 匯出時每批從資料庫讀取的筆數（server-side cursor，記憶體用量與酒窖大小無關）
+EXPORT_BATCH_SIZE = 500
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
 
 # ============ Schemas ============
 
@@ -65,30 +82,42 @@ class WineCellarDetailResponse(WineCellarResponse):
 # ============ Routes ============
 
 @router.get("/wine-cellars", response_model=list[WineCellarResponse])
-async def list_wine_cellars(db: DBSession, user_id: CurrentUserId):
+async def list_wine_cellars(db: AsyncDBSession, user_id: CurrentUserId):
     """取得使用者的所有酒窖（預設酒窖已在新用戶建立時自動建立）"""
-    cellars = db.query(WineCellar).filter(WineCellar.owner_id == user_id).all()
+    cellars = (await db.execute(
+        select(WineCellar).where(WineCellar.owner_id == user_id)
+    )).scalars().all()
 
     return cellars
 
 
 @router.post("/wine-cellars", response_model=WineCellarResponse, status_code=status.HTTP_201_CREATED)
-async def create_wine_cellar(data: WineCellarCreate, db: DBSession, user_id: CurrentUserId):
+async def create_wine_cellar(data: WineCellarCreate, db: AsyncDBSession, user_id: CurrentUserId):
     """新增酒窖"""
     cellar = WineCellar(owner_id=user_id, **data.model_dump())
     db.add(cellar)
-    db.commit()
-    db.refresh(cellar)
+    await db.commit()
+    await db.refresh(cellar)
 
     logger.info(f"使用者 {user_id} 新增酒窖: {cellar.name} (ID: {cellar.id})")
     return cellar
 
 
 @router.get("/wine-cellars/{id}", response_model=WineCellarDetailResponse)
-async def get_wine_cellar(id: int, db: DBSession, user_id: CurrentUserId):
-    """取得單一酒窖（含統計資訊）"""
-    cellar = _get_cellar_or_404(id, user_id, db)
-    stats = _compute_cellar_stats(cellar)
+async def get_wine_cellar(
+    id: int, request: Request, response: Response, db: AsyncDBSession, user_id: CurrentUserId
+):
+    """
+    取得單一酒窖（含統計資訊）
+
+    回應附 ETag / Last-Modified；If-None-Match 相符時回 304，不載入酒款。
+    """
+    not_modified = await _check_cellar_not_modified(id, user_id, db, request, response)
+    if not_modified is not None:
+        return not_modified
+
+    cellar = await _get_cellar_or_404(id, user_id, db)
+    stats = await compute_cellar_stats(db, cellar)
 
     return {
         "id": cellar.id,
@@ -103,37 +132,51 @@ async def get_wine_cellar(id: int, db: DBSession, user_id: CurrentUserId):
 
 
 @router.put("/wine-cellars/{id}", response_model=WineCellarResponse)
-async def update_wine_cellar(id: int, data: WineCellarUpdate, db: DBSession, user_id: CurrentUserId):
+async def update_wine_cellar(id: int, data: WineCellarUpdate, db: AsyncDBSession, user_id: CurrentUserId):
     """更新酒窖"""
-    cellar = _get_cellar_or_404(id, user_id, db)
+    cellar = await _get_cellar_or_404(id, user_id, db)
 
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(cellar, field, value)
 
-    db.commit()
-    db.refresh(cellar)
+    await db.commit()
+    await db.refresh(cellar)
 
     logger.info(f"使用者 {user_id} 更新酒窖: {cellar.name} (ID: {cellar.id})")
     return cellar
 
 
 @router.delete("/wine-cellars/{id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_wine_cellar(id: int, db: DBSession, user_id: CurrentUserId):
+async def delete_wine_cellar(id: int, db: AsyncDBSession, user_id: CurrentUserId):
     """刪除酒窖（會一併刪除所有酒款）"""
-    cellar = _get_cellar_or_404(id, user_id, db)
+    cellar = await _get_cellar_or_404(id, user_id, db)
 
-    db.delete(cellar)
-    db.commit()
+    # 以單一 DELETE 刪除酒款，避免 AsyncSession 為 cascade 隱式載入 wine_items；
+    # 刪除前以 INSERT ... SELECT 寫入 tombstone 供增量同步
+    await record_tombstones(db, user_id, WineItem.cellar_id == cellar.id)
+    await db.execute(delete(WineItem).where(WineItem.cellar_id == cellar.id))
+    await db.delete(cellar)
+    await db.commit()
 
     logger.info(f"使用者 {user_id} 刪除酒窖 (ID: {id})")
 
 
 @router.get("/wine-cellars/{id}/stats")
-async def get_wine_cellar_stats(id: int, db: DBSession, user_id: CurrentUserId):
-    """取得酒窖統計摘要"""
-    cellar = _get_cellar_or_404(id, user_id, db)
-    stats = _compute_cellar_stats(cellar)
+async def get_wine_cellar_stats(
+    id: int, request: Request, response: Response, db: AsyncReadDBSession, user_id: CurrentUserId
+):
+    """
+    取得酒窖統計摘要
+
+    回應附 ETag / Last-Modified；If-None-Match 相符時回 304，不載入酒款。
+    """
+    not_modified = await _check_cellar_not_modified(id, user_id, db, request, response)
+    if not_modified is not None:
+        return not_modified
+
+    cellar = await _get_cellar_or_404(id, user_id, db)
+    stats = await compute_cellar_stats(db, cellar)
 
     return {
         "cellar_id": id,
@@ -143,13 +186,57 @@ async def get_wine_cellar_stats(id: int, db: DBSession, user_id: CurrentUserId):
     }
 
 
+@router.get("/wine-cellars/{id}/export")
+async def export_wine_cellar(
+    id: int,
+    db: AsyncReadDBSession,
+    user_id: CurrentUserId,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+):
+    """
+    匯出酒窖內所有酒款（含所有狀態）
+
+    Query 參數:
+    - format: ndjson（預設，每行一筆 JSON）/ csv（UTF-8 BOM，Excel 可直接開啟中文）
+
+    以 server-side cursor 每次讀取 EXPORT_BATCH_SIZE 筆，邊讀邊以 StreamingResponse 送出，
+    不建立 ORM 物件，記憶體用量不隨酒窖大小增加。欄位與 GET /wine-items 完整回應相同。
+    """
+    await _get_cellar_or_404(id, user_id, db)
+
+    query = (
+        select(*_columns_for_fields(RESPONSE_FIELDS))
+        .where(WineItem.cellar_id == id)
+        .order_by(WineItem.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    chunks = _export_ndjson(db, query) if format == 'ndjson' else _export_csv(db, query)
+
+    logger.info(f"使用者 {user_id} 匯出酒窖 (ID: {id}, 格式: {format})")
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="cellar-{id}.{format}"'},
+    )
+
+
 # ============ Helpers ============
 
-def _get_cellar_or_404(cellar_id: int, user_id: int, db) -> WineCellar:
+async def _check_cellar_not_modified(
+    cellar_id: int, user_id: int, db: AsyncSession, request: Request, response: Response
+) -> Optional[Response]:
+    """酒窖版本未變時回傳 304；酒窖不存在時交由後續查詢回 404"""
+    version = await get_collection_version(db, user_id, cellar_id=cellar_id)
+    if not version.cellar_count:
+        return None
+    return evaluate_conditional_get(request, response, version)
+
+
+async def _get_cellar_or_404(cellar_id: int, user_id: int, db: AsyncSession) -> WineCellar:
     """查詢酒窖，不存在或無權限則拋 404"""
-    cellar = db.query(WineCellar).filter(
-        WineCellar.id == cellar_id, WineCellar.owner_id == user_id
-    ).first()
+    cellar = (await db.execute(
+        select(WineCellar).where(WineCellar.id == cellar_id, WineCellar.owner_id == user_id)
+    )).scalars().first()
     if not cellar:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="酒窖不存在或無權限存取"
@@ -157,54 +244,31 @@ def _get_cellar_or_404(cellar_id: int, user_id: int, db) -> WineCellar:
     return cellar
 
 
-def _compute_cellar_stats(cellar: WineCellar) -> dict:
-    """計算酒窖統計數據（共用邏輯）"""
-    all_wines = cellar.wine_items or []
-    active_wines = [w for w in all_wines if w.status == 'active']
 
-    # 容量與價值
-    used_capacity = sum(w.space_units * w.quantity for w in active_wines)
-    total_value = sum(w.total_value for w in active_wines)
+async def _export_batches(db: AsyncSession, query) -> AsyncIterator[list[dict]]:
+    """以 server-side cursor 逐批讀取並轉為回應 dict"""
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield _wine_item_dicts(rows, RESPONSE_FIELDS)
 
-    # 開瓶狀態
-    bottle_stats = {
-        'unopened': sum(1 for w in active_wines if w.bottle_status == 'unopened'),
-        'opened': sum(1 for w in active_wines if w.bottle_status == 'opened'),
-    }
 
-    # 按酒款狀態
-    status_stats = {}
-    for w in all_wines:
-        s = w.status or 'active'
-        status_stats[s] = status_stats.get(s, 0) + 1
-
-    # 按酒類
-    wine_type_stats = {}
-    for w in active_wines:
-        wt = w.wine_type or "其他"
-        if wt not in wine_type_stats:
-            wine_type_stats[wt] = {"count": 0, "value": 0}
-        wine_type_stats[wt]["count"] += w.quantity
-        wine_type_stats[wt]["value"] += w.total_value
-
-    # 按國家
-    country_stats = {}
-    for w in active_wines:
-        c = w.country or "未知"
-        country_stats[c] = country_stats.get(c, 0) + w.quantity
+async def _export_ndjson(db: AsyncSession, query) -> AsyncIterator[bytes]:
+    async for items in _export_batches(db, query):
+        yield b"".join(dumps(item) + b"\n" for item in items)
 
-    return {
-        "wine_count": len(active_wines),
-        "total_bottles": sum(w.quantity for w in active_wines),
-        "total_value": total_value,
-        "used_capacity": used_capacity,
-        "available_capacity": (cellar.capacity or 0) - used_capacity,
-        "capacity_used": used_capacity,
-        "unopened_count": bottle_stats['unopened'],
-        "opened_count": bottle_stats['opened'],
-        "bottle_stats": bottle_stats,
-        "status_stats": status_stats,
-        "wine_type_stats": wine_type_stats,
-        "country_stats": country_stats,
-    }
 
+async def _export_csv(db: AsyncSession, query) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(RESPONSE_FIELDS)
+    yield buffer.getvalue().encode()
+
+    async for items in _export_batches(db, query):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            ['' if (value := item[field]) is None else value for field in RESPONSE_FIELDS]
+            for item in items
+        )
+        yield buffer.getvalue().encode()
@@ -6,21 +6,45 @@
 
 import logging
 import traceback
+from operator import attrgetter
 from datetime import datetime, date, timedelta
-from typing import Optional
+from typing import Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+import asyncio
+from collections import defaultdict
+from types import SimpleNamespace
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status, UploadFile, File, Form
+from sqlalchemy import DateTime, case, delete, func, insert, literal, or_, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from src.models.wine_item import WineItem
 from src.models.wine_cellar import WineCellar
-from src.routes.dependencies import DBSession, CurrentUserId
+from src.routes.dependencies import AsyncDBSession, AsyncReadDBSession, CurrentUserId
 from src.services import wine_vision, storage
+from src.services.change_feed import decode_sync_token, get_changes, record_tombstones
+from src.services.conditional_get import evaluate_conditional_get, get_collection_version
+from src.services.wine_import import (
+    ImportFormatError, ImportLimitError, detect_import_format, import_wine_items, insert_wine_items,
+)
+from src.services.wine_search import apply_search, search_terms
+from src.services.wine_stats import FacetFilters, get_facet_counts
+from src.utils.fast_json import FastJSONResponse
+from src.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_after, keyset_order
+from src.utils.sql import id_list_agg, parse_id_list
 from src.schemas.wine_item import (
     WineItemCreate,
     WineItemUpdate,
     WineItemResponse,
+    WineItemSummary,
+    WineItemPage,
+    WineItemGroup,
+    WineItemFacets,
+    WineItemChanges,
+    WineItemImportResult,
+    WineItemBatchRequest,
+    WineItemBatchResult,
     AIWineRecognitionResponse,
     HistoryMatch,
     HistoryMatchResponse,
@@ -31,6 +55,16 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Wine Items"])
 
+# 讀取酒款的欄位組合：full 為完整欄位，summary 為列表頁精簡欄位
+WineItemView = Literal['full', 'summary']
+# 評分 facet 的分組（對應 src.services.wine_stats.RATING_BUCKETS）
+RatingBucket = Literal['1-2', '3-4', '5-6', '7-8', '9-10']
+
+# 狀態類欄位的有效值（單筆與批次操作共用）
+VALID_STATUSES = ['active', 'sold', 'gifted', 'consumed']
+VALID_DISPOSITIONS = ['personal', 'gift', 'sale', 'collection']
+VALID_REMAINING_AMOUNTS = ['full', '3/4', '1/2', '1/4', 'empty']
+
 
 # ============ Helper Functions ============
 
@@ -101,108 +135,369 @@ def _safe_int(value):
         return None
 
 
+# 欄位為 NULL 時回應使用的預設值
+_RESPONSE_DEFAULTS = {
+    'wine_type': '未分類',
+    'quantity': 1,
+    'space_units': 1.0,
+    'container_type': '瓶',
+    'bottle_status': 'unopened',
+    'preservation_type': 'immediate',
+    'remaining_amount': 'full',
+    'disposition': 'personal',
+    'recognized_by_ai': 0,
+    'status': 'active',
+}
+_DATE_STRING_FIELDS = {'purchase_date', 'optimal_drinking_start', 'optimal_drinking_end'}
+_INT_FIELDS = {'rating', 'acidity', 'tannin', 'body', 'sweetness', 'alcohol_feel'}
+_TIMESTAMP_FIELDS = {'created_at', 'updated_at'}
+
+# 計算屬性依賴的欄位（以 load_only 載入時需一併載入）
+_COMPUTED_FIELD_COLUMNS = {
+    'is_optimal_now': ('optimal_drinking_start', 'optimal_drinking_end'),
+    'total_value': ('purchase_price', 'quantity'),
+}
+
+RESPONSE_FIELDS = tuple(WineItemResponse.model_fields)
+SUMMARY_FIELDS = tuple(WineItemSummary.model_fields)
+
+
+def _field_converter(field: str):
+    """
+    產生單一回應欄位的轉換函式 (item, today) -> value
+
+    轉換函式在模組載入時預先建立，建構單筆回應時不需逐欄判斷型別。
+    """
+    if field == 'is_optimal_now':
+        return lambda row, today: WineItem.compute_is_optimal_now(
+            row.optimal_drinking_start, row.optimal_drinking_end, today
+        )
+    if field == 'total_value':
+        return lambda row, today: WineItem.compute_total_value(row.purchase_price, row.quantity)
+
+    getter = attrgetter(field)
+    if field in _DATE_STRING_FIELDS:
+        return lambda row, today: str(value) if (value := getter(row)) else None
+    if field in _INT_FIELDS:
+        return lambda row, today: _safe_int(getter(row))
+    if field in _TIMESTAMP_FIELDS:
+        return lambda row, today: getter(row) or datetime.utcnow()
+    if field in _RESPONSE_DEFAULTS:
+        default = _RESPONSE_DEFAULTS[field]
+        return lambda row, today: getter(row) or default
+    return lambda row, today: getter(row)
+
+
+# ORM 物件路徑（單筆讀取、寫入後回傳）使用的欄位轉換函式
+_FIELD_CONVERTERS = {field: _field_converter(field) for field in RESPONSE_FIELDS}
+
+
+def _wine_item_values(item, fields: tuple[str, ...], today: Optional[date] = None) -> dict:
+    """只讀取指定欄位（配合 load_only / 欄位查詢，不會觸發未載入欄位的查詢）"""
+    today = today or date.today()
+    return {field: _FIELD_CONVERTERS[field](item, today) for field in fields}
+
+
+def _wine_item_dicts(rows, fields: tuple[str, ...]) -> list[dict]:
+    """
+    將欄位查詢的 Row 批次轉換為回應 dict（高速路徑）
+
+    以 dict(zip()) 一次建立整列，只修補需要預設值 / 計算的欄位；date / datetime 保留原值
+    交給 FastJSONResponse 編碼（輸出與 Pydantic 相同的 ISO 格式）。
+    不建立 ORM 物件，也不經過 Pydantic 建構與 response_model 二次驗證。
+    """
+    if not rows:
+        return []
+
+    names = rows[0]._fields
+    wanted = set(fields)
+    drop = [name for name in names if name not in wanted]  # 只為計算屬性載入的欄位
+    defaults = [(field, _RESPONSE_DEFAULTS[field]) for field in fields if field in _RESPONSE_DEFAULTS]
+    ints = [field for field in fields if field in _INT_FIELDS]
+    timestamps = [field for field in fields if field in _TIMESTAMP_FIELDS]
+    with_optimal = 'is_optimal_now' in wanted
+    with_value = 'total_value' in wanted
+    today = date.today()
+    now = datetime.utcnow()
+
+    results = []
+    for row in rows:
+        values = dict(zip(names, row))
+        if with_optimal:
+            values['is_optimal_now'] = WineItem.compute_is_optimal_now(
+                values['optimal_drinking_start'], values['optimal_drinking_end'], today
+            )
+        if with_value:
+            values['total_value'] = WineItem.compute_total_value(values['purchase_price'], values['quantity'])
+        for field, default in defaults:
+            if not values[field]:
+                values[field] = default
+        for field in ints:
+            value = values[field]
+            if value is not None and type(value) is not int:
+                values[field] = _safe_int(value)
+        for field in timestamps:
+            if values[field] is None:
+                values[field] = now
+        for name in drop:
+            del values[name]
+        results.append(values)
+    return results
+
+
 def _build_wine_item_response(item: WineItem) -> WineItemResponse:
     """將 WineItem ORM 物件轉換為 WineItemResponse"""
-    return WineItemResponse(
-        id=item.id,
-        cellar_id=item.cellar_id,
-        name=item.name,
-        wine_type=item.wine_type or '未分類',
-        brand=item.brand,
-        vintage=item.vintage,
-        region=item.region,
-        country=item.country,
-        abv=item.abv,
-        quantity=item.quantity or 1,
-        space_units=item.space_units or 1.0,
-        container_type=item.container_type or '瓶',
-        bottle_status=item.bottle_status or 'unopened',
-        preservation_type=item.preservation_type or 'immediate',
-        remaining_amount=item.remaining_amount or 'full',
-        disposition=item.disposition or 'personal',
-        split_from_id=item.split_from_id,
-        purchase_price=item.purchase_price,
-        retail_price=item.retail_price,
-        purchase_date=str(item.purchase_date) if item.purchase_date else None,
-        optimal_drinking_start=str(item.optimal_drinking_start) if item.optimal_drinking_start else None,
-        optimal_drinking_end=str(item.optimal_drinking_end) if item.optimal_drinking_end else None,
-        storage_location=item.storage_location,
-        storage_temp=item.storage_temp,
-        image_url=item.image_url,
-        cloudinary_public_id=item.cloudinary_public_id,
-        notes=item.notes,
-        tasting_notes=item.tasting_notes,
-        rating=_safe_int(item.rating),
-        review=item.review,
-        flavor_tags=item.flavor_tags,
-        aroma=item.aroma,
-        palate=item.palate,
-        finish=item.finish,
-        acidity=_safe_int(item.acidity),
-        tannin=_safe_int(item.tannin),
-        body=_safe_int(item.body),
-        sweetness=_safe_int(item.sweetness),
-        alcohol_feel=_safe_int(item.alcohol_feel),
-        recognized_by_ai=item.recognized_by_ai or 0,
-        status=item.status or 'active',
-        created_at=item.created_at or datetime.utcnow(),
-        updated_at=item.updated_at or datetime.utcnow(),
-        is_optimal_now=item.is_optimal_now,
-        total_value=item.total_value,
+    return WineItemResponse(**_wine_item_values(item, RESPONSE_FIELDS))
+
+
+def _columns_for_fields(fields: tuple[str, ...]) -> list:
+    """將回應欄位轉換為需要載入的 WineItem 欄位（load_only 用）"""
+    names = {'id'}
+    for field in fields:
+        names.update(_COMPUTED_FIELD_COLUMNS.get(field, (field,)))
+    return [getattr(WineItem, name) for name in sorted(names)]
+
+
+def _resolve_fields(view: str, fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    解析 view / fields 參數，回傳要輸出的欄位（None 表示完整回應）
+
+    fields 優先於 view；未知欄位回傳 400。
+    """
+    if fields:
+        requested = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+        unknown = [f for f in requested if f not in WineItemResponse.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"未知的欄位: {', '.join(unknown)}")
+        return ('id', *[f for f in requested if f != 'id'])
+    if view == 'summary':
+        return SUMMARY_FIELDS
+    return None
+
+
+def _serialize_wine_item(item: WineItem, fields: Optional[tuple[str, ...]], custom: bool):
+    """依 view / fields 產生回應物件"""
+    if fields is None:
+        return _build_wine_item_response(item)
+    values = _wine_item_values(item, fields)
+    return values if custom else WineItemSummary(**values)
+
+
+def _parse_date_fields(item_data: dict) -> None:
+    """將日期欄位的字串（YYYY-MM-DD）轉換為 date 物件，格式錯誤時設為 None（就地修改）"""
+    for field in ('purchase_date', 'optimal_drinking_start', 'optimal_drinking_end'):
+        value = item_data.get(field)
+        if isinstance(value, str):
+            try:
+                item_data[field] = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                logger.error(f"日期格式錯誤 ({field}): {value}")
+                item_data[field] = None
+
+
+def _prepare_new_item_data(item_data: dict) -> tuple[dict, int]:
+    """
+    整理新增酒款的欄位資料（新增與批次匯入共用，就地修改）
+
+    Returns:
+        (欄位資料, 瓶數)：自動拆分時每筆記錄 quantity = 1（一筆記錄 = 一瓶酒）
+    """
+    # 處理日期欄位：將字串轉換為 date 物件，空值設為 None
+    _parse_date_fields(item_data)
+    for field in ('purchase_date', 'optimal_drinking_start', 'optimal_drinking_end'):
+        if not item_data.get(field):
+            item_data[field] = None
+
+    requested_quantity = item_data.get('quantity') or 1
+    item_data['quantity'] = 1
+    return item_data, requested_quantity
+
+
+async def _get_owned_wine_item_or_404(
+    db: AsyncSession, id: int, user_id: int, columns: Optional[list] = None
+) -> WineItem:
+    """
+    查詢使用者擁有的酒款，不存在或無權限則拋 404
+
+    columns 指定時只載入這些欄位（load_only，存取其他欄位會直接拋錯而非額外查詢）
+    """
+    query = (
+        select(WineItem)
+        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
+        .where(WineItem.id == id, WineCellar.owner_id == user_id)
     )
+    if columns:
+        query = query.options(load_only(*columns, raiseload=True))
+    wine_item = (await db.execute(query)).scalars().first()
+
+    if not wine_item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="酒款不存在或無權限存取"
+        )
+    return wine_item
 
 
 
 # ============ Routes ============
 
-@router.get("/wine-items", response_model=list[WineItemResponse])
+# 列表排序：名稱 → (排序欄位, 是否遞減)，皆以 id 為次要排序鍵並有 (cellar_id, 欄位, id) 索引
+# id_desc（預設）對應 ix_wine_items_cellar_id_id，cursor 只記錄 id
+DEFAULT_LIST_SORT = "id_desc"
+LIST_SORTS = {
+    'id_desc': (None, True),
+    'vintage_asc': ('vintage', False),
+    'vintage_desc': ('vintage', True),
+    'purchase_price_asc': ('purchase_price', False),
+    'purchase_price_desc': ('purchase_price', True),
+    'optimal_drinking_end_asc': ('optimal_drinking_end', False),
+    'optimal_drinking_end_desc': ('optimal_drinking_end', True),
+    'rating_asc': ('rating', False),
+    'rating_desc': ('rating', True),
+    'created_at_asc': ('created_at', False),
+    'created_at_desc': ('created_at', True),
+}
+WineItemSort = Literal[
+    'id_desc',
+    'vintage_asc', 'vintage_desc',
+    'purchase_price_asc', 'purchase_price_desc',
+    'optimal_drinking_end_asc', 'optimal_drinking_end_desc',
+    'rating_asc', 'rating_desc',
+    'created_at_asc', 'created_at_desc',
+]
+# 搜尋結果依相關度排序，cursor 記錄位移（相關度為即時計算的分數，無法做 keyset）
+SEARCH_SORT = "search_rank"
+
+
+@router.get(
+    "/wine-items",
+    response_model=Union[list[WineItemResponse], list[WineItemSummary], WineItemPage],
+)
 async def list_wine_items(
-    db: DBSession,
+    request: Request,
+    response: Response,
+    db: AsyncReadDBSession,
     user_id: CurrentUserId,
+    cellar_id: Optional[int] = None,
     wine_type: Optional[str] = None,
     bottle_status: Optional[str] = None,  # unopened / opened
     status: Optional[str] = 'active',  # active / sold / gifted / consumed / all
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_vintage: Optional[int] = None,
+    max_vintage: Optional[int] = None,
+    min_abv: Optional[float] = Query(None, ge=0),
+    max_abv: Optional[float] = Query(None, ge=0),
+    is_optimal_now: Optional[bool] = None,
+    sort: Optional[WineItemSort] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    view: WineItemView = 'full',
+    fields: Optional[str] = None,
 ):
     """
-    列出使用者的所有酒款
+    列出使用者的酒款
 
     Query 參數:
+    - cellar_id: 只列出指定酒窖
     - wine_type: 篩選酒類（紅酒、白酒、威士忌等）
     - bottle_status: 篩選開瓶狀態（unopened / opened）
     - status: 篩選狀態（active / sold / gifted / consumed / all）
+    - min_price / max_price: 進貨價範圍（含）
+    - min_vintage / max_vintage: 年份範圍（含）
+    - min_abv / max_abv: 酒精濃度範圍（含）
+    - is_optimal_now: true 只列出適飲期內、false 只列出不在適飲期內的酒款
+    - sort: 排序方式（vintage / purchase_price / optimal_drinking_end / rating / created_at 加上 _asc / _desc），
+      預設 id_desc（新到舊）；空值在遞增時排最後、遞減時排最前
+    - limit: 每頁筆數（1-200）；提供 limit 或 cursor 時改回傳 {items, next_cursor}
+    - cursor: 上一頁回傳的 next_cursor（需搭配相同的 sort）
+    - view: full（預設，完整欄位）/ summary（列表頁精簡欄位，WineItemSummary）
+    - fields: 以逗號分隔的欄位名稱（例如 fields=id,name,vintage），優先於 view
+
+    排序與分頁皆在資料庫完成（keyset 分頁），每頁只讀取 limit 筆；
+    未提供 limit / cursor 時維持舊行為，回傳所有符合條件的酒款陣列（有 sort 時依其排序）。
+    只查詢回應需要的欄位（view=summary / fields 時更少），資料列直接轉為 dict 後以 orjson 編碼，
+    不建立 ORM 物件與 Pydantic model。
+
+    回應附 ETag / Last-Modified；If-None-Match 相符時回 304，不載入酒款。
     """
+    selected = _resolve_fields(view, fields)
+
+    paginated = limit is not None or cursor is not None
+    sort = sort or (DEFAULT_LIST_SORT if paginated else None)
+    sort_field, descending = LIST_SORTS[sort] if sort else (None, True)
+    last_key = None
+    if cursor:
+        try:
+            key_columns = (getattr(WineItem, sort_field), WineItem.id) if sort_field else (WineItem.id,)
+            last_key = decode_cursor(cursor, sort, key_columns)
+        except (InvalidCursorError, ValueError):
+            raise HTTPException(status_code=400, detail="無效的分頁 cursor")
+
+    version = await get_collection_version(db, user_id, cellar_id=cellar_id)
+    not_modified = evaluate_conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+
+    output_fields = selected or RESPONSE_FIELDS
+    # 排序欄位不在輸出欄位時仍需查詢（產生 cursor 用），_wine_item_dicts 會移除
+    query_fields = output_fields + ((sort_field,) if sort_field else ())
     query = (
-        db.query(WineItem)
+        select(*_columns_for_fields(query_fields))
         .join(WineCellar, WineItem.cellar_id == WineCellar.id)
-        .filter(WineCellar.owner_id == user_id)
+        .where(WineCellar.owner_id == user_id)
     )
 
-    # 篩選狀態 (暫時忽略，因為資料庫沒有status欄位)
-    # if status and status != 'all':
-    #     query = query.filter(WineItem.status == status)
-
-    # 篩選酒類
+    if cellar_id is not None:
+        query = query.where(WineItem.cellar_id == cellar_id)
+    if status and status != 'all':
+        query = query.where(WineItem.status == status)
     if wine_type:
-        query = query.filter(WineItem.wine_type == wine_type)
-
-    # 篩選開瓶狀態（如果欄位存在）
-    if bottle_status and hasattr(WineItem, 'bottle_status'):
-        query = query.filter(WineItem.bottle_status == bottle_status)
+        query = query.where(WineItem.wine_type == wine_type)
+    if bottle_status:
+        query = query.where(WineItem.bottle_status == bottle_status)
+
+    # 範圍篩選
+    for column, lower, upper in (
+        (WineItem.purchase_price, min_price, max_price),
+        (WineItem.vintage, min_vintage, max_vintage),
+        (WineItem.abv, min_abv, max_abv),
+    ):
+        if lower is not None:
+            query = query.where(column >= lower)
+        if upper is not None:
+            query = query.where(column <= upper)
+
+    if is_optimal_now is not None:
+        query = query.where(WineItem.is_optimal_now if is_optimal_now else ~WineItem.is_optimal_now)
+
+    if sort:
+        if sort_field:
+            column = getattr(WineItem, sort_field)
+            if last_key:
+                query = query.where(keyset_after(column, WineItem.id, descending, *last_key))
+            query = query.order_by(*keyset_order(column, WineItem.id, descending))
+        else:
+            if last_key:
+                query = query.where(WineItem.id < last_key[0])
+            query = query.order_by(WineItem.id.desc())
+    if paginated:
+        limit = limit or 50
+        # 多取一筆判斷是否還有下一頁
+        query = query.limit(limit + 1)
 
     try:
-        wine_items = query.all()
-        results = []
-        for item in wine_items:
-            try:
-                results.append(_build_wine_item_response(item))
-            except Exception as item_error:
-                logger.error(f"Error building response for wine item {item.id}: {item_error}")
-                logger.error(traceback.format_exc())
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error processing wine item {item.id}: {str(item_error)}"
-                )
-        return results
+        rows = (await db.execute(query)).all()
+        next_cursor = None
+        if paginated and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]._mapping
+            key = [last[sort_field], last['id']] if sort_field else [last['id']]
+            next_cursor = encode_cursor(sort, key)
+
+        results = _wine_item_dicts(rows, output_fields)
+        content = {"items": results, "next_cursor": next_cursor} if paginated else results
+        # 已是最終輸出格式，直接編碼（response_model 僅供 OpenAPI 文件）
+        return FastJSONResponse(content=content, headers=dict(response.headers))
     except HTTPException:
         raise
     except Exception as e:
@@ -212,10 +507,10 @@ async def list_wine_items(
 
 
 @router.get("/wine-items/match-history", response_model=HistoryMatchResponse)
-def match_wine_history(
+async def match_wine_history(
     brand: str,
     name: str,
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -223,20 +518,22 @@ def match_wine_history(
 
     用於 AI 辨識後，提示使用者是否套用歷史價格和品飲筆記。
     """
-    from src.models.wine_cellar import WineCellar
-
     # 取得使用者的所有酒窖 IDs
-    cellar_ids = [c.id for c in db.query(WineCellar).filter(WineCellar.owner_id == user_id).all()]
+    cellar_ids = (await db.execute(
+        select(WineCellar.id).where(WineCellar.owner_id == user_id)
+    )).scalars().all()
 
     if not cellar_ids:
         return HistoryMatchResponse(matched=False, history=[])
 
     # 查詢相符的歷史酒款（包含已售出、送禮、喝完）
-    matches = db.query(WineItem).filter(
-        WineItem.cellar_id.in_(cellar_ids),
-        WineItem.brand == brand,
-        WineItem.name == name
-    ).order_by(WineItem.purchase_date.desc()).limit(5).all()
+    matches = (await db.execute(
+        select(WineItem).where(
+            WineItem.cellar_id.in_(cellar_ids),
+            WineItem.brand == brand,
+            WineItem.name == name
+        ).order_by(WineItem.purchase_date.desc()).limit(5)
+    )).scalars().all()
 
     if not matches:
         return HistoryMatchResponse(matched=False, history=[])
@@ -269,32 +566,255 @@ def match_wine_history(
     return HistoryMatchResponse(matched=True, history=history)
 
 
-@router.get("/wine-items/{id}", response_model=WineItemResponse)
-async def get_wine_item(id: int, db: DBSession, user_id: CurrentUserId):
-    """取得單一酒款"""
-    wine_item = (
-        db.query(WineItem)
+@router.get("/wine-items/groups", response_model=list[WineItemGroup])
+async def list_wine_item_groups(
+    request: Request,
+    response: Response,
+    db: AsyncReadDBSession,
+    user_id: CurrentUserId,
+    cellar_id: Optional[int] = None,
+    wine_type: Optional[str] = None,
+    status: Optional[str] = 'active',  # active / sold / gifted / consumed / all
+):
+    """
+    依批次列出酒款（一筆 = 一個 lot）
+
+    create_wine_item 依數量拆成多筆、split_wine_item 拆出的記錄都以 split_from_id 指向主記錄，
+    以單一 GROUP BY COALESCE(split_from_id, id) 彙總瓶數、開瓶 / 未開瓶數、總價值與成員 ID。
+
+    Query 參數:
+    - cellar_id: 只列出指定酒窖
+    - wine_type: 篩選酒類
+    - status: 篩選狀態（active / sold / gifted / consumed / all），預設只彙總仍在酒窖中的酒款，與 GET /wine-items 相同
+    """
+    version = await get_collection_version(db, user_id, cellar_id=cellar_id)
+    not_modified = evaluate_conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+
+    lot_id = func.coalesce(WineItem.split_from_id, WineItem.id)
+    bottles = func.coalesce(WineItem.quantity, 1)
+    is_opened = WineItem.bottle_status == 'opened'
+    query = (
+        select(
+            lot_id.label('lot_id'),
+            func.min(WineItem.cellar_id).label('cellar_id'),
+            func.min(WineItem.name).label('name'),
+            func.min(WineItem.wine_type).label('wine_type'),
+            func.min(WineItem.brand).label('brand'),
+            func.min(WineItem.vintage).label('vintage'),
+            func.max(WineItem.image_url).label('image_url'),
+            func.sum(bottles).label('count'),
+            func.sum(case((is_opened, bottles), else_=0)).label('opened_count'),
+            func.sum(func.coalesce(WineItem.purchase_price, 0) * bottles).label('total_value'),
+            id_list_agg(WineItem.id).label('member_ids'),
+        )
         .join(WineCellar, WineItem.cellar_id == WineCellar.id)
-        .filter(WineItem.id == id, WineCellar.owner_id == user_id)
-        .first()
+        .where(WineCellar.owner_id == user_id)
+        .group_by(lot_id)
+        .order_by(lot_id.desc())
     )
+    if cellar_id is not None:
+        query = query.where(WineItem.cellar_id == cellar_id)
+    if status and status != 'all':
+        query = query.where(WineItem.status == status)
+    if wine_type:
+        query = query.where(WineItem.wine_type == wine_type)
+
+    groups = [
+        {
+            'lot_id': row.lot_id,
+            'cellar_id': row.cellar_id,
+            'name': row.name,
+            'wine_type': row.wine_type or _RESPONSE_DEFAULTS['wine_type'],
+            'brand': row.brand,
+            'vintage': row.vintage,
+            'image_url': row.image_url,
+            'count': int(row.count),
+            'opened_count': int(row.opened_count),
+            'unopened_count': int(row.count) - int(row.opened_count),
+            'total_value': float(row.total_value or 0),
+            'member_ids': parse_id_list(row.member_ids),
+        }
+        for row in (await db.execute(query)).all()
+    ]
+    return FastJSONResponse(content=groups, headers=dict(response.headers))
 
-    if not wine_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="酒款不存在或無權限存取"
-        )
 
-    return _build_wine_item_response(wine_item)
+@router.get("/wine-items/search", response_model=WineItemPage)
+async def search_wine_items(
+    request: Request,
+    response: Response,
+    db: AsyncReadDBSession,
+    user_id: CurrentUserId,
+    q: str = Query(..., min_length=1, max_length=200),
+    cellar_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: WineItemView = 'summary',
+    fields: Optional[str] = None,
+):
+    """
+    全文搜尋酒款（酒名、品牌、產區、國家、備註、評論、風味標籤）
+
+    Query 參數:
+    - q: 搜尋字串，多個關鍵字以空白分隔（皆須符合，前綴比對）
+    - cellar_id: 只搜尋指定酒窖
+    - limit: 每頁筆數（1-100，預設 20）
+    - cursor: 上一頁回傳的 next_cursor
+    - view: summary（預設）/ full；fields 同 GET /wine-items
+
+    結果依相關度由高到低排序（酒名、品牌的權重最高），回傳 {items, next_cursor}。
+    """
+    selected = _resolve_fields(view, fields)
+
+    offset = 0
+    if cursor:
+        try:
+            (offset,) = decode_cursor(cursor, SEARCH_SORT)
+        except (InvalidCursorError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="無效的分頁 cursor")
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="無效的分頁 cursor")
+
+    version = await get_collection_version(db, user_id, cellar_id=cellar_id)
+    not_modified = evaluate_conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+
+    terms = search_terms(q)
+    if not terms:
+        return FastJSONResponse(content={"items": [], "next_cursor": None}, headers=dict(response.headers))
+
+    output_fields = selected or RESPONSE_FIELDS
+    query = (
+        select(*_columns_for_fields(output_fields))
+        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
+        .where(WineCellar.owner_id == user_id)
+    )
+    if cellar_id is not None:
+        query = query.where(WineItem.cellar_id == cellar_id)
+    query = apply_search(query, db.get_bind().dialect.name, q, terms).offset(offset).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(SEARCH_SORT, [offset + limit])
+
+    content = {"items": _wine_item_dicts(rows, output_fields), "next_cursor": next_cursor}
+    return FastJSONResponse(content=content, headers=dict(response.headers))
+
+
+@router.get("/wine-items/facets", response_model=WineItemFacets)
+async def get_wine_item_facets(
+    request: Request,
+    response: Response,
+    db: AsyncReadDBSession,
+    user_id: CurrentUserId,
+    cellar_id: Optional[int] = None,
+    wine_type: Optional[str] = None,
+    country: Optional[str] = None,
+    region: Optional[str] = None,
+    vintage_decade: Optional[int] = Query(None, description="年代，例如 1990 表示 1990-1999"),
+    bottle_status: Optional[str] = None,
+    disposition: Optional[str] = None,
+    rating_bucket: Optional[RatingBucket] = None,
+):
+    """
+    篩選面向統計：每個 facet 值的 active 瓶數
+
+    facet：wine_type / country / region / vintage_decade / bottle_status / disposition / rating_bucket。
+    Query 參數為目前套用的篩選條件；每個 facet 的數量套用其他條件、不套用自身條件，
+    前端可直接顯示各選項的瓶數，不需下載所有酒款自行計算。
+    """
+    version = await get_collection_version(db, user_id, cellar_id=cellar_id)
+    not_modified = evaluate_conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+
+    filters = FacetFilters(
+        wine_type=wine_type,
+        country=country,
+        region=region,
+        vintage_decade=vintage_decade,
+        bottle_status=bottle_status,
+        disposition=disposition,
+        rating_bucket=rating_bucket,
+    )
+    content = await get_facet_counts(db, user_id, filters, cellar_id=cellar_id)
+    return FastJSONResponse(content=content, headers=dict(response.headers))
+
+
+@router.get("/wine-items/changes", response_model=WineItemChanges)
+async def get_wine_item_changes(
+    db: AsyncDBSession,  # 走主庫：副本延遲會讓尚未同步的變更被 sync token 跳過
+    user_id: CurrentUserId,
+    since: Optional[str] = None,
+    view: WineItemView = 'full',
+    fields: Optional[str] = None,
+):
+    """
+    增量同步：回傳 since（上次的 sync_token）之後新增、修改、刪除的酒款
+
+    Query 參數:
+    - since: 上次回應的 sync_token；省略時回傳完整快照（full_sync=true）
+    - view / fields: 同 GET /wine-items
+
+    包含所有狀態（已售出、已喝完等狀態變更也是修改）。用戶端先刪除 deleted_ids，
+    再以 id upsert items，並保存新的 sync_token；full_sync=true 時以 items 取代整個快取。
+    """
+    selected = _resolve_fields(view, fields)
+    since_token = None
+    if since:
+        try:
+            since_token = decode_sync_token(since)
+        except (InvalidCursorError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="無效的 sync token")
+
+    output_fields = selected or RESPONSE_FIELDS
+    changes = await get_changes(db, user_id, since_token, _columns_for_fields(output_fields))
+    content = {
+        "items": _wine_item_dicts(changes["rows"], output_fields),
+        "deleted_ids": changes["deleted_ids"],
+        "sync_token": changes["sync_token"],
+        "full_sync": changes["full_sync"],
+    }
+    return FastJSONResponse(content=content)
+
+
+@router.get("/wine-items/{id}", response_model=Union[WineItemResponse, WineItemSummary])
+async def get_wine_item(
+    id: int,
+    db: AsyncDBSession,
+    user_id: CurrentUserId,
+    view: WineItemView = 'full',
+    fields: Optional[str] = None,
+):
+    """
+    取得單一酒款
+
+    Query 參數:
+    - view: full（預設）/ summary
+    - fields: 以逗號分隔的欄位名稱，優先於 view
+    """
+    selected = _resolve_fields(view, fields)
+    columns = _columns_for_fields(selected) if selected is not None else None
+    wine_item = await _get_owned_wine_item_or_404(db, id, user_id, columns=columns)
+    result = _serialize_wine_item(wine_item, selected, custom=bool(fields))
+    if fields:
+        return FastJSONResponse(content=result)
+    return result
 
 
 @router.post("/wine-items", response_model=WineItemResponse, status_code=status.HTTP_201_CREATED)
-async def create_wine_item(data: WineItemCreate, db: DBSession, user_id: CurrentUserId):
+async def create_wine_item(data: WineItemCreate, db: AsyncDBSession, user_id: CurrentUserId):
     """新增酒款"""
     try:
         # 驗證酒窖所有權
-        cellar = db.query(WineCellar).filter(
-            WineCellar.id == data.cellar_id, WineCellar.owner_id == user_id
-        ).first()
+        cellar = (await db.execute(
+            select(WineCellar).where(WineCellar.id == data.cellar_id, WineCellar.owner_id == user_id)
+        )).scalars().first()
 
         if not cellar:
             raise HTTPException(
@@ -304,43 +824,12 @@ async def create_wine_item(data: WineItemCreate, db: DBSession, user_id: Current
         # 處理資料
         item_data = data.model_dump()
         logger.info(f"建立酒款資料: {item_data}")
+        item_data, requested_quantity = _prepare_new_item_data(item_data)
 
-        # 處理日期欄位：將字串轉換為 date 物件
-        date_fields = ['purchase_date', 'optimal_drinking_start', 'optimal_drinking_end']
-        for field in date_fields:
-            value = item_data.get(field)
-            if value:
-                # 如果是字串，轉換為 date 物件
-                if isinstance(value, str):
-                    try:
-                        item_data[field] = datetime.strptime(value, '%Y-%m-%d').date()
-                    except ValueError:
-                        logger.error(f"日期格式錯誤 ({field}): {value}")
-                        item_data[field] = None
-            else:
-                # 空值處理：purchase_date 移除以使用預設值，其他設為 None
-                if field == 'purchase_date':
-                    item_data.pop(field, None)
-                else:
-                    item_data[field] = None
-
-        # 自動拆分：quantity > 1 時建立 N 筆獨立記錄（一筆記錄 = 一瓶酒）
-        requested_quantity = item_data.get('quantity', 1)
-        item_data['quantity'] = 1
-
-        # 建立主記錄
-        primary_item = WineItem(**item_data)
-        db.add(primary_item)
-        db.flush()  # 取得 primary_item.id，但不 commit
-
-        # 建立額外記錄
-        if requested_quantity > 1:
-            for _ in range(requested_quantity - 1):
-                clone_data = {**item_data, 'split_from_id': primary_item.id}
-                db.add(WineItem(**clone_data))
-
-        db.commit()
-        db.refresh(primary_item)
+        # 自動拆分：主記錄 INSERT ... RETURNING 取得 ID，其餘 N-1 瓶一次 executemany 寫入
+        primary_id, = await insert_wine_items(db, data.cellar_id, [(item_data, requested_quantity)])
+        await db.commit()
+        primary_item = await db.get(WineItem, primary_id)
 
         logger.info(
             f"使用者 {user_id} 新增酒款: {primary_item.name} (ID: {primary_item.id})"
@@ -352,7 +841,7 @@ async def create_wine_item(data: WineItemCreate, db: DBSession, user_id: Current
         # 重新拋出 HTTPException
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_msg = f"建立酒款失敗: {e}"
         logger.error(error_msg)
         logger.error(traceback.format_exc())
@@ -362,29 +851,79 @@ async def create_wine_item(data: WineItemCreate, db: DBSession, user_id: Current
         )
 
 
+@router.post("/wine-items/import", response_model=WineItemImportResult)
+async def import_wine_items_file(
+    db: AsyncDBSession,
+    user_id: CurrentUserId,
+    cellar_id: int = Form(...),
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "json", "ndjson"]] = Form(None),
+):
+    """
+    批次匯入酒款（例如從其他酒窖 App 移轉）
+
+    接收 multipart/form-data:
+    - cellar_id: 匯入的酒窖 ID
+    - file: CSV（首列為欄位名稱）、JSON 陣列或 NDJSON 檔案，欄位同 POST /wine-items
+    - format: 檔案格式，未指定時依副檔名或 Content-Type 判斷
+
+    驗證失敗的資料列會略過並回報行號與原因，其餘資料在同一個交易內批次寫入；
+    檔案無法解析時整批不寫入（400），超過資料列數或總瓶數上限時整批不寫入（413）。
+    """
+    cellar = (await db.execute(
+        select(WineCellar.id).where(WineCellar.id == cellar_id, WineCellar.owner_id == user_id)
+    )).scalar_one_or_none()
+    if cellar is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="酒窖不存在或無權限存取"
+        )
+
+    fmt = format or detect_import_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="無法判斷檔案格式，請指定 format（csv / json / ndjson）"
+        )
+
+    try:
+        report = await import_wine_items(db, cellar_id, file.file, fmt, _prepare_new_item_data)
+        await db.commit()
+    except ImportFormatError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"匯入檔案錯誤: {e}")
+    except ImportLimitError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=f"{e}，請分批匯入")
+    except Exception as e:
+        await db.rollback()
+        error_msg = f"匯入酒款失敗: {e}"
+        logger.error(error_msg)
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error_msg
+        )
+
+    logger.info(
+        f"使用者 {user_id} 匯入酒款至酒窖 {cellar_id}: {report.imported} 筆（{report.bottles} 瓶），"
+        f"失敗 {report.failed} 筆"
+    )
+    return report
+
+
 @router.put("/wine-items/{id}", response_model=WineItemResponse)
 async def update_wine_item(
     id: int,
     data: WineItemUpdate,
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId,
     sync_tasting_notes: bool = False  # 是否同步品飲筆記到同批次酒款
 ):
     """更新酒款"""
-    wine_item = (
-        db.query(WineItem)
-        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
-        .filter(WineItem.id == id, WineCellar.owner_id == user_id)
-        .first()
-    )
+    wine_item = await _get_owned_wine_item_or_404(db, id, user_id)
 
-    if not wine_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="酒款不存在或無權限存取"
-        )
-
-    # 更新欄位
+    # 更新欄位（日期字串轉為 date 物件，asyncpg 不接受字串寫入 DATE 欄位）
     update_data = data.model_dump(exclude_unset=True)
+    _parse_date_fields(update_data)
     for field, value in update_data.items():
         setattr(wine_item, field, value)
 
@@ -397,37 +936,23 @@ async def update_wine_item(
         tasting_updates = {k: v for k, v in update_data.items() if k in tasting_note_fields}
 
         if tasting_updates:
-            # 找出同批次的其他酒款
-            # 如果此酒款是主記錄 (split_from_id=NULL)，找所有 split_from_id = 此酒款id 的記錄
-            # 如果此酒款是拆分記錄，找主記錄和其他同 split_from_id 的記錄
-            batch_items = []
-
-            if wine_item.split_from_id is None:
-                # 此酒款是主記錄，找所有從它拆分出來的
-                batch_items = db.query(WineItem).filter(
-                    WineItem.split_from_id == wine_item.id,
-                    WineItem.id != wine_item.id
-                ).all()
-            else:
-                # 此酒款是拆分記錄，找主記錄和同批次的其他記錄
-                batch_items = db.query(WineItem).filter(
-                    or_(
-                        WineItem.id == wine_item.split_from_id,  # 主記錄
-                        WineItem.split_from_id == wine_item.split_from_id  # 同批次
-                    ),
-                    WineItem.id != wine_item.id  # 排除自己
-                ).all()
-
-            # 同步品飲筆記到同批次酒款
-            for item in batch_items:
-                for field, value in tasting_updates.items():
-                    setattr(item, field, value)
-
-            if batch_items:
-                logger.info(f"同步品飲筆記到 {len(batch_items)} 瓶同批次酒款")
-
-    db.commit()
-    db.refresh(wine_item)
+            # 以單一 UPDATE 同步到同批次的其他酒款（主記錄與 split_from_id 指向它的拆分記錄）
+            lot_id = wine_item.split_from_id or wine_item.id
+            result = await db.execute(
+                update(WineItem)
+                .where(
+                    or_(WineItem.id == lot_id, WineItem.split_from_id == lot_id),
+                    WineItem.id != wine_item.id,
+                )
+                .values(**tasting_updates)
+                .execution_options(synchronize_session=False)
+            )
+
+            if result.rowcount:
+                logger.info(f"同步品飲筆記到 {result.rowcount} 瓶同批次酒款")
+
+    await db.commit()
+    await db.refresh(wine_item)
 
     logger.info(f"使用者 {user_id} 更新酒款: {wine_item.name} (ID: {wine_item.id})")
 
@@ -435,49 +960,30 @@ async def update_wine_item(
 
 
 @router.delete("/wine-items/{id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_wine_item(id: int, db: DBSession, user_id: CurrentUserId):
+async def delete_wine_item(id: int, db: AsyncDBSession, user_id: CurrentUserId):
     """刪除酒款"""
-    wine_item = (
-        db.query(WineItem)
-        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
-        .filter(WineItem.id == id, WineCellar.owner_id == user_id)
-        .first()
-    )
-
-    if not wine_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="酒款不存在或無權限存取"
-        )
+    wine_item = await _get_owned_wine_item_or_404(db, id, user_id)
 
     # 刪除 Cloudinary 圖片
     if wine_item.cloudinary_public_id:
         try:
-            storage.delete_image(wine_item.cloudinary_public_id)
+            await asyncio.to_thread(storage.delete_image, wine_item.cloudinary_public_id)
         except Exception as e:
             logger.warning(f"刪除 Cloudinary 圖片失敗: {e}")
 
-    db.delete(wine_item)
-    db.commit()
+    await record_tombstones(db, user_id, WineItem.id == wine_item.id)
+    await db.delete(wine_item)
+    await db.commit()
 
     logger.info(f"使用者 {user_id} 刪除酒款: {wine_item.name} (ID: {wine_item.id})")
 
 
 @router.post("/wine-items/{id}/open", response_model=WineItemResponse)
-async def open_wine_bottle(id: int, db: DBSession, user_id: CurrentUserId):
+async def open_wine_bottle(id: int, db: AsyncDBSession, user_id: CurrentUserId):
     """
     開瓶 - 將酒款標記為已開瓶
     """
-    wine_item = (
-        db.query(WineItem)
-        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
-        .filter(WineItem.id == id, WineCellar.owner_id == user_id)
-        .first()
-    )
-
-    if not wine_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="酒款不存在或無權限存取"
-        )
+    wine_item = await _get_owned_wine_item_or_404(db, id, user_id)
 
     wine_item.bottle_status = 'opened'
     wine_item.opened_at = datetime.utcnow()
@@ -490,13 +996,13 @@ async def open_wine_bottle(id: int, db: DBSession, user_id: CurrentUserId):
         today
     )
 
-    db.commit()
-    db.refresh(wine_item)
+    await db.commit()
+    await db.refresh(wine_item)
 
-    # 設置開瓶後提醒任務
+    # 設置開瓶後提醒任務（排程器使用同步 session，移到 thread 執行避免阻塞 event loop）
     from src.services.scheduler import schedule_bottle_opened_reminder
     try:
-        schedule_bottle_opened_reminder(wine_item, user_id)
+        await asyncio.to_thread(schedule_bottle_opened_reminder, wine_item, user_id)
         logger.info(f"已設置開瓶提醒: {wine_item.name}")
     except Exception as e:
         logger.warning(f"設置開瓶提醒失敗: {e}")
@@ -510,30 +1016,19 @@ async def open_wine_bottle(id: int, db: DBSession, user_id: CurrentUserId):
 async def update_remaining_amount(
     id: int,
     remaining: str,  # full / 3/4 / 1/2 / 1/4 / empty
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
     更新剩餘量
     """
-    valid_amounts = ['full', '3/4', '1/2', '1/4', 'empty']
-    if remaining not in valid_amounts:
+    if remaining not in VALID_REMAINING_AMOUNTS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"剩餘量必須是 {valid_amounts} 之一"
+            detail=f"剩餘量必須是 {VALID_REMAINING_AMOUNTS} 之一"
         )
 
-    wine_item = (
-        db.query(WineItem)
-        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
-        .filter(WineItem.id == id, WineCellar.owner_id == user_id)
-        .first()
-    )
-
-    if not wine_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="酒款不存在或無權限存取"
-        )
+    wine_item = await _get_owned_wine_item_or_404(db, id, user_id)
 
     wine_item.remaining_amount = remaining
     if remaining == 'empty':
@@ -541,8 +1036,8 @@ async def update_remaining_amount(
         wine_item.status_changed_at = datetime.utcnow()
         wine_item.status_changed_by = user_id
 
-    db.commit()
-    db.refresh(wine_item)
+    await db.commit()
+    await db.refresh(wine_item)
 
     return _build_wine_item_response(wine_item)
 
@@ -551,46 +1046,153 @@ async def update_remaining_amount(
 async def change_wine_status(
     id: int,
     new_status: str,  # sold / gifted / consumed
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
     變更酒款狀態（售出、送禮、已喝完）
     """
-    valid_statuses = ['active', 'sold', 'gifted', 'consumed']
-    if new_status not in valid_statuses:
+    if new_status not in VALID_STATUSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"狀態必須是 {valid_statuses} 之一"
+            detail=f"狀態必須是 {VALID_STATUSES} 之一"
         )
 
-    wine_item = (
-        db.query(WineItem)
-        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
-        .filter(WineItem.id == id, WineCellar.owner_id == user_id)
-        .first()
-    )
-
-    if not wine_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="酒款不存在或無權限存取"
-        )
+    wine_item = await _get_owned_wine_item_or_404(db, id, user_id)
 
     wine_item.status = new_status
     wine_item.status_changed_at = datetime.utcnow()
     wine_item.status_changed_by = user_id
 
-    db.commit()
-    db.refresh(wine_item)
+    await db.commit()
+    await db.refresh(wine_item)
 
     logger.info(f"使用者 {user_id} 變更酒款狀態: {wine_item.name} → {new_status}")
 
     return _build_wine_item_response(wine_item)
 
 
+# 批次操作需要 value 的操作及其有效值
+BATCH_OPERATION_VALUES = {
+    'change-status': VALID_STATUSES,
+    'disposition': VALID_DISPOSITIONS,
+    'update-remaining': VALID_REMAINING_AMOUNTS,
+}
+
+
+def _batch_update_values(operation: str, value: Optional[str], user_id: int, now: datetime) -> dict:
+    """批次操作（開瓶、刪除以外）對應的 UPDATE 欄位，與單筆端點的更新內容相同"""
+    if operation == 'disposition':
+        return {'disposition': value}
+    if operation == 'update-remaining':
+        values = {'remaining_amount': value}
+        if value != 'empty':
+            return values
+        return {**values, 'status': 'consumed', 'status_changed_at': now, 'status_changed_by': user_id}
+    return {'status': value, 'status_changed_at': now, 'status_changed_by': user_id}
+
+
+def _schedule_opened_reminders(items: list, user_id: int) -> None:
+    """為批次開瓶的酒款設置開瓶提醒（排程器使用同步 session，於 thread 執行）"""
+    from src.services.scheduler import schedule_bottle_opened_reminder
+    for item in items:
+        try:
+            schedule_bottle_opened_reminder(item, user_id)
+        except Exception as e:
+            logger.warning(f"設置開瓶提醒失敗 ({item.id}): {e}")
+
+
+def _delete_images(public_ids: list[str]) -> None:
+    """刪除 Cloudinary 圖片，失敗只記錄警告"""
+    for public_id in public_ids:
+        try:
+            storage.delete_image(public_id)
+        except Exception as e:
+            logger.warning(f"刪除 Cloudinary 圖片失敗: {e}")
+
+
+@router.post("/wine-items/batch", response_model=WineItemBatchResult)
+async def batch_wine_items(data: WineItemBatchRequest, db: AsyncDBSession, user_id: CurrentUserId):
+    """
+    批次操作酒款（變更狀態、用途、開瓶、更新剩餘量、刪除）
+
+    以一次查詢驗證所有酒款的所有權，再以 UPDATE / DELETE ... WHERE id IN (...) 套用，
+    整批在同一個交易內完成；任一酒款不存在或無權限時整批不套用。
+    """
+    valid_values = BATCH_OPERATION_VALUES.get(data.operation)
+    if valid_values is not None and data.value not in valid_values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{data.operation} 的 value 必須是 {valid_values} 之一"
+        )
+
+    item_ids = list(dict.fromkeys(data.item_ids))
+    rows = (await db.execute(
+        select(
+            WineItem.id, WineItem.name, WineItem.wine_type,
+            WineItem.preservation_type, WineItem.cloudinary_public_id,
+        )
+        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
+        .where(WineItem.id.in_(item_ids), WineCellar.owner_id == user_id)
+    )).all()
+    if len(rows) != len(item_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="部分酒款不存在或無權限存取"
+        )
+
+    now = datetime.utcnow()
+    opened_items = []
+    try:
+        if data.operation == 'delete':
+            await record_tombstones(db, user_id, WineItem.id.in_(item_ids))
+            await db.execute(delete(WineItem).where(WineItem.id.in_(item_ids)))
+        elif data.operation == 'open':
+            # 開瓶效期依酒類與保存類型而定：相同效期的酒款合併為一個 UPDATE
+            today = date.today()
+            ids_by_expiry = defaultdict(list)
+            for row in rows:
+                expiry = _calculate_open_bottle_expiry(row.wine_type, row.preservation_type, today)
+                ids_by_expiry[expiry].append(row.id)
+                opened_items.append(SimpleNamespace(
+                    id=row.id, name=row.name, opened_at=now, optimal_drinking_end=expiry
+                ))
+            for expiry, ids in ids_by_expiry.items():
+                await db.execute(
+                    update(WineItem)
+                    .where(WineItem.id.in_(ids))
+                    .values(bottle_status='opened', opened_at=now, optimal_drinking_end=expiry)
+                )
+        else:
+            await db.execute(
+                update(WineItem)
+                .where(WineItem.id.in_(item_ids))
+                .values(**_batch_update_values(data.operation, data.value, user_id, now))
+            )
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        error_msg = f"批次操作酒款失敗: {e}"
+        logger.error(error_msg)
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error_msg
+        )
+
+    if data.operation == 'delete':
+        public_ids = [row.cloudinary_public_id for row in rows if row.cloudinary_public_id]
+        if public_ids:
+            await asyncio.to_thread(_delete_images, public_ids)
+    elif opened_items:
+        await asyncio.to_thread(_schedule_opened_reminders, opened_items, user_id)
+
+    logger.info(f"使用者 {user_id} 批次{data.operation} {len(item_ids)} 筆酒款")
+    return {"operation": data.operation, "item_ids": item_ids}
+
+
 @router.post("/wine-items/recognize", response_model=AIWineRecognitionResponse)
 async def recognize_wine_label(
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId,
     cellar_id: int = Form(...),
     image: UploadFile = File(...),
@@ -603,9 +1205,9 @@ async def recognize_wine_label(
     - image: 圖片檔案
     """
     # 驗證酒窖所有權
-    cellar = db.query(WineCellar).filter(
-        WineCellar.id == cellar_id, WineCellar.owner_id == user_id
-    ).first()
+    cellar = (await db.execute(
+        select(WineCellar).where(WineCellar.id == cellar_id, WineCellar.owner_id == user_id)
+    )).scalars().first()
 
     if not cellar:
         raise HTTPException(
@@ -623,7 +1225,6 @@ async def recognize_wine_label(
         image_bytes = await image.read()
 
         # 並行執行：Cloudinary 上傳 + AI 辨識（節省 2-5 秒）
-        import asyncio
         upload_result, ai_result = await asyncio.gather(
             asyncio.to_thread(storage.upload_image, image_bytes, "wine_items"),
             asyncio.to_thread(wine_vision.recognize_wine_label, image_bytes),
@@ -657,11 +1258,21 @@ async def recognize_wine_label(
 
 # ============ Split & Disposition Routes ============
 
+# 拆分時從原酒款複製的欄位（品評與狀態欄位使用預設值）
+SPLIT_COPIED_FIELDS = (
+    'cellar_id', 'name', 'wine_type', 'brand', 'vintage', 'region', 'country', 'abv',
+    'container_type', 'bottle_status', 'preservation_type', 'remaining_amount', 'disposition',
+    'purchase_price', 'retail_price', 'purchase_date', 'optimal_drinking_start', 'optimal_drinking_end',
+    'storage_location', 'storage_temp', 'image_url', 'cloudinary_public_id', 'notes', 'tasting_notes',
+    'recognized_by_ai',
+)
+
+
 @router.post("/wine-items/{id}/split")
-def split_wine_item(
+async def split_wine_item(
     id: int,
     data: SplitRequest,
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
@@ -675,13 +1286,12 @@ def split_wine_item(
         raise HTTPException(status_code=400, detail="拆分數量必須大於 0")
     
     # 取得原酒款
-    item = db.query(WineItem).filter(WineItem.id == id).first()
+    item = await db.get(WineItem, id)
     if not item:
         raise HTTPException(status_code=404, detail="找不到酒款")
     
     # 驗證擁有權（透過酒窖）
-    from src.models.wine_cellar import WineCellar
-    cellar = db.query(WineCellar).filter(WineCellar.id == item.cellar_id).first()
+    cellar = await db.get(WineCellar, item.cellar_id)
     if not cellar or cellar.owner_id != user_id:
         raise HTTPException(status_code=403, detail="無權限操作此酒款")
     
@@ -693,50 +1303,38 @@ def split_wine_item(
         )
     
     # 減少原酒款數量
+    original_quantity = item.quantity
     item.quantity -= data.split_count
-    
-    # 建立新酒款記錄
-    new_items = []
-    for _ in range(data.split_count):
-        new_item = WineItem(
-            cellar_id=item.cellar_id,
-            name=item.name,
-            wine_type=item.wine_type,
-            brand=item.brand,
-            vintage=item.vintage,
-            region=item.region,
-            country=item.country,
-            abv=item.abv,
-            quantity=1,
-            space_units=item.space_units / (item.quantity + data.split_count),
-            container_type=item.container_type,
-            bottle_status=item.bottle_status,
-            preservation_type=item.preservation_type,
-            remaining_amount=item.remaining_amount,
-            disposition=item.disposition,
-            purchase_price=item.purchase_price,
-            retail_price=item.retail_price,
-            purchase_date=item.purchase_date,
-            optimal_drinking_start=item.optimal_drinking_start,
-            optimal_drinking_end=item.optimal_drinking_end,
-            storage_location=item.storage_location,
-            storage_temp=item.storage_temp,
-            image_url=item.image_url,
-            cloudinary_public_id=item.cloudinary_public_id,
-            notes=item.notes,
-            tasting_notes=item.tasting_notes,
-            recognized_by_ai=item.recognized_by_ai,
-            split_from_id=item.id,  # 記錄來源
+
+    # 以單一 INSERT ... SELECT ... RETURNING 建立新酒款記錄：
+    # 遞迴 CTE 產生 split_count 列，與原酒款 cross join 後複製欄位，往返次數與拆分數量無關
+    copies = select(literal(1).label('n')).cte('split_copies', recursive=True)
+    copies = copies.union_all(select(copies.c.n + 1).where(copies.c.n < data.split_count))
+    now = datetime.utcnow()
+    new_rows = (
+        select(
+            *[getattr(WineItem, field) for field in SPLIT_COPIED_FIELDS],
+            literal(1),
+            WineItem.space_units / original_quantity,
+            func.coalesce(WineItem.split_from_id, WineItem.id),  # 指向批次主記錄，批次維持單層
+            literal(now, DateTime),
+            literal(now, DateTime),
         )
-        db.add(new_item)
-        new_items.append(new_item)
-    
-    db.commit()
-    
-    # Refresh to get IDs
-    for new_item in new_items:
-        db.refresh(new_item)
-    
+        .select_from(WineItem)
+        .join(copies, true())
+        .where(WineItem.id == item.id)
+    )
+    new_items = (await db.execute(
+        insert(WineItem)
+        .from_select(
+            [*SPLIT_COPIED_FIELDS, 'quantity', 'space_units', 'split_from_id', 'created_at', 'updated_at'],
+            new_rows,
+        )
+        .returning(WineItem)
+    )).scalars().all()
+
+    await db.commit()
+
     logger.info(f"使用者 {user_id} 拆分酒款 {id}，拆出 {data.split_count} 瓶")
     
     return {
@@ -746,36 +1344,34 @@ def split_wine_item(
 
 
 @router.patch("/wine-items/{id}/disposition")
-def update_disposition(
+async def update_disposition(
     id: int,
     disposition: str,  # personal / gift / sale / collection
-    db: DBSession,
+    db: AsyncDBSession,
     user_id: CurrentUserId
 ):
     """
     更新酒款用途（自飲/送禮/待售/收藏）
     """
-    valid_dispositions = ['personal', 'gift', 'sale', 'collection']
-    if disposition not in valid_dispositions:
+    if disposition not in VALID_DISPOSITIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"無效的用途，必須是: {', '.join(valid_dispositions)}"
+            detail=f"無效的用途，必須是: {', '.join(VALID_DISPOSITIONS)}"
         )
     
     # 取得酒款
-    item = db.query(WineItem).filter(WineItem.id == id).first()
+    item = await db.get(WineItem, id)
     if not item:
         raise HTTPException(status_code=404, detail="找不到酒款")
     
     # 驗證擁有權
-    from src.models.wine_cellar import WineCellar
-    cellar = db.query(WineCellar).filter(WineCellar.id == item.cellar_id).first()
+    cellar = await db.get(WineCellar, item.cellar_id)
     if not cellar or cellar.owner_id != user_id:
         raise HTTPException(status_code=403, detail="無權限操作此酒款")
     
     item.disposition = disposition
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
     
     logger.info(f"使用者 {user_id} 更新酒款 {id} 用途為 {disposition}")
     
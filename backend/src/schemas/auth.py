@@ -0,0 +1,16 @@
+"""
+認證 Pydantic Schemas
+
+LIFF token 換發後端 session token 的回應格式。
+"""
+
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class SessionTokenResponse(BaseModel):
+    """Session token 換發回應"""
+    access_token: str = Field(..., description="後端簽發的 session token")
+    token_type: str = Field(default="bearer", description="Token 類型")
+    expires_in: int = Field(..., description="有效秒數")
+    expires_at: datetime = Field(..., description="到期時間（UTC）")
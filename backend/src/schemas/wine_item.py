@@ -6,7 +6,7 @@ WineItem Pydantic Schemas
 """
 
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List, Union
 from pydantic import BaseModel, Field
 
 
@@ -54,6 +54,30 @@ class WineItemCreate(BaseModel):
     recognized_by_ai: int = 0
 
 
+# ── 批次匯入 ──
+
+class WineItemImportRow(WineItemCreate):
+    """匯入檔案的單筆資料（酒窖由請求指定，檔案中的 cellar_id 與多餘欄位會被忽略）"""
+    cellar_id: Optional[int] = None
+    quantity: int = Field(1, ge=1, le=1000)
+
+
+class WineItemImportError(BaseModel):
+    """匯入失敗的資料列"""
+    row: int = Field(..., description="CSV / NDJSON 為檔案行號，JSON 陣列為第幾筆（從 1 起算）")
+    errors: List[str]
+
+
+class WineItemImportResult(BaseModel):
+    """批次匯入結果"""
+    imported: int = Field(..., description="成功匯入的資料列數")
+    bottles: int = Field(..., description="建立的酒款記錄數（quantity > 1 會拆分為多筆）")
+    failed: int = Field(..., description="驗證失敗而略過的資料列數")
+    errors: List[WineItemImportError] = Field(
+        default_factory=list, description="失敗原因（最多列出前 100 筆）"
+    )
+
+
 # ── 更新酒款 ──
 
 class WineItemUpdate(BaseModel):
@@ -150,6 +174,93 @@ class WineItemResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class WineItemSummary(BaseModel):
+    """酒款精簡回應（view=summary，LIFF 列表頁使用的欄位）"""
+    id: int
+    cellar_id: int
+    name: str
+    wine_type: str
+    brand: Optional[str]
+    vintage: Optional[int]
+    region: Optional[str]
+    quantity: int
+    bottle_status: str
+    remaining_amount: str
+    disposition: str = "personal"
+    status: str
+    split_from_id: Optional[int] = None
+    image_url: Optional[str]
+    optimal_drinking_end: Optional[str]
+    # 計算屬性
+    is_optimal_now: bool
+    total_value: float
+
+    model_config = {"from_attributes": True}
+
+
+class WineItemPage(BaseModel):
+    """酒款列表分頁回應（keyset 分頁）"""
+    items: List[Union[WineItemResponse, WineItemSummary]]
+    next_cursor: Optional[str] = Field(None, description="下一頁的 cursor；None 表示已是最後一頁")
+
+
+# ── 篩選面向（facet）統計 ──
+
+class FacetCount(BaseModel):
+    """單一 facet 值的瓶數"""
+    value: Union[str, int, None] = Field(..., description="facet 值；None 表示未填")
+    count: int = Field(..., description="符合其他篩選條件的 active 瓶數")
+
+
+class WineItemFacets(BaseModel):
+    """各篩選面向的瓶數（每個 facet 不套用自身的篩選條件，可直接顯示其他選項的數量）"""
+    total: int = Field(..., description="符合所有篩選條件的 active 瓶數")
+    facets: Dict[str, List[FacetCount]]
+
+
+class WineItemChanges(BaseModel):
+    """增量同步回應：先套用 deleted_ids，再以 id upsert items"""
+    items: List[Union[WineItemResponse, WineItemSummary]]
+    deleted_ids: List[int] = Field(default_factory=list, description="since 之後刪除的酒款 ID")
+    sync_token: str = Field(..., description="下次同步時帶入的 since")
+    full_sync: bool = Field(..., description="True 表示 items 為完整快照，用戶端應取代整個快取")
+
+
+# ── 批次操作 ──
+
+class WineItemBatchRequest(BaseModel):
+    """批次操作請求：對多筆酒款套用同一個操作"""
+    operation: Literal['change-status', 'disposition', 'open', 'update-remaining', 'delete']
+    item_ids: List[int] = Field(..., min_length=1, max_length=500)
+    value: Optional[str] = Field(
+        None, description="change-status 為新狀態、disposition 為用途、update-remaining 為剩餘量"
+    )
+
+
+class WineItemBatchResult(BaseModel):
+    """批次操作結果"""
+    operation: str
+    item_ids: List[int] = Field(..., description="已套用操作的酒款 ID")
+
+
+# ── 批次（lot）分組 ──
+
+class WineItemGroup(BaseModel):
+    """同一批次（主記錄 + split_from_id 指向它的拆分記錄）的彙總"""
+    lot_id: int = Field(..., description="批次主記錄 ID（COALESCE(split_from_id, id)）")
+    cellar_id: int
+    name: str
+    wine_type: str
+    brand: Optional[str] = None
+    vintage: Optional[int] = None
+    image_url: Optional[str] = None
+    count: int = Field(..., description="瓶數")
+    opened_count: int = Field(..., description="已開瓶瓶數")
+    unopened_count: int = Field(..., description="未開瓶瓶數")
+    total_value: float = Field(..., description="總價值（單價 × 數量）")
+    member_ids: List[int] = Field(..., description="批次內所有酒款 ID")
+
+
 # ── AI 辨識回應 ──
 
 class AIWineRecognitionResponse(BaseModel):
@@ -8,8 +8,8 @@ import logging
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from typing import List, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.wine_item import WineItem
 from src.models.wine_cellar import WineCellar
@@ -29,8 +29,8 @@ class BudgetService:
     """預算控管服務類別"""
 
     @staticmethod
-    def get_spending_stats(
-        db: Session,
+    async def get_spending_stats(
+        db: AsyncSession,
         user_id: int,
         period: str = 'month'
     ) -> SpendingStatsResponse:
@@ -46,9 +46,9 @@ class BudgetService:
             SpendingStatsResponse: 消費統計結果
         """
         # 獲取預算設定
-        budget_settings = db.query(BudgetSettings).filter(
-            BudgetSettings.user_id == user_id
-        ).first()
+        budget_settings = (await db.execute(
+            select(BudgetSettings).where(BudgetSettings.user_id == user_id)
+        )).scalars().first()
 
         if not budget_settings:
             # 如果沒有設定預算，返回空統計
@@ -74,14 +74,14 @@ class BudgetService:
             budget_for_period = budget_amount * 12
 
         # 查詢該期間的酒款消費
-        query = db.query(WineItem).join(WineCellar).filter(
+        query = select(WineItem).join(WineCellar).where(
             WineCellar.owner_id == user_id,
             WineItem.purchase_date >= start_date,
             WineItem.purchase_date <= today,
             WineItem.purchase_price.isnot(None)
         )
 
-        wine_items = query.all()
+        wine_items = (await db.execute(query)).scalars().all()
 
         # 計算總消費
         total_spending = sum(item.purchase_price for item in wine_items if item.purchase_price)
@@ -114,7 +114,7 @@ class BudgetService:
         category_breakdown.sort(key=lambda x: x.amount, reverse=True)
 
         # 月度趨勢（最近12個月）
-        monthly_trend = BudgetService._calculate_monthly_trend(db, user_id)
+        monthly_trend = await BudgetService._calculate_monthly_trend(db, user_id)
 
         return SpendingStatsResponse(
             total_spending=round(total_spending, 2),
@@ -126,8 +126,8 @@ class BudgetService:
         )
 
     @staticmethod
-    def _calculate_monthly_trend(
-        db: Session,
+    async def _calculate_monthly_trend(
+        db: AsyncSession,
         user_id: int
     ) -> List[MonthlyTrend]:
         """計算最近12個月的消費趨勢"""
@@ -146,12 +146,14 @@ class BudgetService:
                 end_date = date(target_month.year, target_month.month + 1, 1) - relativedelta(days=1)
 
             # 查詢該月的消費
-            monthly_spending = db.query(func.sum(WineItem.purchase_price)).join(WineCellar).filter(
-                WineCellar.owner_id == user_id,
-                WineItem.purchase_date >= start_date,
-                WineItem.purchase_date <= end_date,
-                WineItem.purchase_price.isnot(None)
-            ).scalar() or 0.0
+            monthly_spending = (await db.execute(
+                select(func.sum(WineItem.purchase_price)).join(WineCellar).where(
+                    WineCellar.owner_id == user_id,
+                    WineItem.purchase_date >= start_date,
+                    WineItem.purchase_date <= end_date,
+                    WineItem.purchase_price.isnot(None)
+                )
+            )).scalar() or 0.0
 
             trends.append(MonthlyTrend(
                 month=target_month.strftime('%Y-%m'),
@@ -161,8 +163,8 @@ class BudgetService:
         return trends
 
     @staticmethod
-    def get_shopping_suggestions(
-        db: Session,
+    async def get_shopping_suggestions(
+        db: AsyncSession,
         user_id: int
     ) -> List[ShoppingSuggestion]:
         """
@@ -179,8 +181,8 @@ class BudgetService:
         return []
 
     @staticmethod
-    def check_budget_warning(
-        db: Session,
+    async def check_budget_warning(
+        db: AsyncSession,
         user_id: int
     ) -> Dict[str, Any]:
         """
@@ -194,11 +196,11 @@ class BudgetService:
             Dict: 包含 is_warning, budget_used_percentage, threshold 的字典
         """
         try:
-            stats = BudgetService.get_spending_stats(db, user_id, 'month')
+            stats = await BudgetService.get_spending_stats(db, user_id, 'month')
             
-            budget_settings = db.query(BudgetSettings).filter(
-                BudgetSettings.user_id == user_id
-            ).first()
+            budget_settings = (await db.execute(
+                select(BudgetSettings).where(BudgetSettings.user_id == user_id)
+            )).scalars().first()
             
             threshold = budget_settings.warning_threshold if budget_settings else 80.0
             
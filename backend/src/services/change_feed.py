@@ -0,0 +1,122 @@
+"""
+酒款增量同步（change feed）服務模組
+
+sync token 記錄資料的高水位（已回傳的最大 updated_at / deleted_at）；GET /wine-items/changes?since=<token>
+只回傳 updated_at 晚於高水位減 SYNC_OVERLAP 的酒款（走 ix_wine_items_cellar_updated_at）與同期間刪除的
+酒款 ID（wine_item_tombstones）。LIFF 用戶端以 id upsert / 刪除本機快取，成本與變更數成正比。
+
+- 時間戳記在 flush 時寫入，交易可能在之後才提交（例如批次匯入、批次操作），因此查詢時往前重疊
+  SYNC_OVERLAP，須大於最長的寫入交易加上各應用程式實例間的時鐘誤差；重複的變更以 upsert 套用即可
+- 高水位取自資料本身而非應用程式時鐘；查詢必須走主庫，副本延遲會讓尚未同步的變更被跳過
+- tombstone 保留 TOMBSTONE_RETENTION，token 發出時間早於此期限時改回傳完整快照（full_sync）
+- 以 bulk UPDATE 修改酒款時必須一併更新 updated_at，否則不會出現在變更中
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models.wine_cellar import WineCellar
+from src.models.wine_item import WineItem
+from src.models.wine_item_tombstone import WineItemTombstone
+from src.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+SYNC_TOKEN_KIND = "sync"
+SYNC_OVERLAP = timedelta(minutes=5)
+TOMBSTONE_RETENTION = timedelta(days=90)
+# 尚未看過任何資料時的高水位：下次同步回傳所有酒款
+SYNC_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_sync_token(watermark: datetime, issued_at: Optional[datetime] = None) -> str:
+    return encode_cursor(SYNC_TOKEN_KIND, [watermark, issued_at or watermark])
+
+
+def decode_sync_token(token: str) -> tuple[datetime, datetime]:
+    """
+    解碼 sync token
+
+    Returns:
+        (高水位, 發出時間)；舊格式只有一個時間，兩者相同
+
+    Raises:
+        InvalidCursorError: 格式錯誤
+    """
+    values = decode_cursor(token, SYNC_TOKEN_KIND)
+    if len(values) == 1:
+        values = values * 2
+    if len(values) != 2 or not all(isinstance(value, datetime) for value in values):
+        raise InvalidCursorError("無效的 sync token")
+    return values[0], values[1]
+
+
+async def record_tombstones(db: AsyncSession, owner_id: int, condition) -> None:
+    """
+    以單一 INSERT ... SELECT 為符合條件的酒款寫入 tombstone
+
+    須在同一交易內、刪除酒款之前呼叫。
+    """
+    now = datetime.utcnow()
+    await db.execute(
+        insert(WineItemTombstone).from_select(
+            ["wine_item_id", "cellar_id", "owner_id", "deleted_at"],
+            select(WineItem.id, WineItem.cellar_id, literal(owner_id), literal(now)).where(condition),
+        )
+    )
+
+
+async def get_changes(
+    db: AsyncSession, user_id: int, since: Optional[tuple[datetime, datetime]], columns: list
+) -> dict:
+    """
+    查詢 since 之後的變更（db 須為主庫 session）
+
+    Args:
+        since: 上次 sync token 的 (高水位, 發出時間)；None 表示完整同步
+        columns: 要查詢的 WineItem 欄位
+
+    Returns:
+        {"rows": 變更（或全部）的酒款資料列, "deleted_ids": 已刪除的酒款 ID,
+         "full_sync": 是否為完整快照, "sync_token": 下次同步用的 token}
+    """
+    now = datetime.utcnow()
+    full_sync = since is None or since[1] < now - TOMBSTONE_RETENTION
+    watermark = SYNC_EPOCH if full_sync else since[0]
+
+    query = (
+        select(*columns, WineItem.updated_at.label("sync_updated_at"))
+        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
+        .where(WineCellar.owner_id == user_id)
+        .order_by(WineItem.id)
+    )
+    deleted_ids: list[int] = []
+    if not full_sync:
+        changed_after = watermark - SYNC_OVERLAP
+        query = query.where(WineItem.updated_at > changed_after)
+        tombstones = (await db.execute(
+            select(WineItemTombstone.wine_item_id, WineItemTombstone.deleted_at)
+            .where(WineItemTombstone.owner_id == user_id, WineItemTombstone.deleted_at > changed_after)
+        )).all()
+        deleted_ids = sorted({tombstone.wine_item_id for tombstone in tombstones})
+        watermark = max([watermark, *(tombstone.deleted_at for tombstone in tombstones)])
+
+    rows = (await db.execute(query)).all()
+    watermark = max([watermark, *(row.sync_updated_at for row in rows if row.sync_updated_at)])
+
+    return {
+        "rows": rows,
+        "deleted_ids": deleted_ids,
+        "full_sync": full_sync,
+        "sync_token": encode_sync_token(watermark, now),
+    }
+
+
+def purge_tombstones(db: Session, now: Optional[datetime] = None) -> int:
+    """刪除超過保留期限的 tombstone，回傳刪除筆數"""
+    cutoff = (now or datetime.utcnow()) - TOMBSTONE_RETENTION
+    result = db.execute(delete(WineItemTombstone).where(WineItemTombstone.deleted_at < cutoff))
+    db.commit()
+    return result.rowcount
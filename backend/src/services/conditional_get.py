@@ -0,0 +1,110 @@
+"""
+條件式 GET（ETag / Last-Modified）服務模組
+
+以單一索引查詢取得使用者（或單一酒窖）酒款的版本資訊：
+酒窖數、酒款數、酒款與酒窖的最大 updated_at。任何新增 / 修改 / 刪除都會改變其中一項，
+因此可作為 weak ETag；請求帶相同 If-None-Match 時直接回 304，不載入也不序列化資料列。
+
+注意：以 bulk UPDATE 修改酒款時必須一併更新 updated_at，否則 ETag 不會改變。
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.wine_cellar import WineCellar
+from src.models.wine_item import WineItem
+
+
+@dataclass(frozen=True)
+class CollectionVersion:
+    """酒窖 / 酒款集合的版本資訊"""
+    cellar_count: int
+    item_count: int
+    last_modified: Optional[datetime]
+
+    def etag(self, *variant: object) -> str:
+        """
+        產生 weak ETag
+
+        variant 為會影響回應內容的其他因素（查詢參數、日期等），一併納入雜湊。
+        """
+        raw = "|".join(str(part) for part in (
+            self.cellar_count,
+            self.item_count,
+            self.last_modified.isoformat() if self.last_modified else "",
+            *variant,
+        ))
+        return f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+async def get_collection_version(
+    db: AsyncSession, user_id: int, cellar_id: Optional[int] = None
+) -> CollectionVersion:
+    """
+    查詢使用者（或指定酒窖）的版本資訊（單一查詢，走 ix_wine_items_cellar_updated_at）
+    """
+    query = (
+        select(
+            func.count(distinct(WineCellar.id)),
+            func.count(WineItem.id),
+            func.max(WineItem.updated_at),
+            func.max(WineCellar.updated_at),
+        )
+        .select_from(WineCellar)
+        .outerjoin(WineItem, WineItem.cellar_id == WineCellar.id)
+        .where(WineCellar.owner_id == user_id)
+    )
+    if cellar_id is not None:
+        query = query.where(WineCellar.id == cellar_id)
+
+    cellar_count, item_count, items_modified, cellars_modified = (await db.execute(query)).one()
+    timestamps = [ts for ts in (items_modified, cellars_modified) if ts is not None]
+    return CollectionVersion(
+        cellar_count=cellar_count,
+        item_count=item_count,
+        last_modified=max(timestamps) if timestamps else None,
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 比對（weak comparison，支援多個值與 *）"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def evaluate_conditional_get(
+    request: Request, response: Response, version: CollectionVersion, *variant: object
+) -> Optional[Response]:
+    """
+    設定 ETag / Last-Modified；If-None-Match 相符時回傳 304 Response
+
+    variant 以外一律包含查詢字串與今天日期（is_optimal_now 等欄位會隨日期改變）。
+
+    Returns:
+        Response | None: 304 回應（呼叫端應直接回傳），或 None 表示需產生完整回應
+    """
+    etag = version.etag(request.url.query, date.today().isoformat(), *variant)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            version.last_modified.replace(tzinfo=timezone.utc), usegmt=True
+        )
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
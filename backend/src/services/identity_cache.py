@@ -0,0 +1,121 @@
+"""
+身份快取服務模組
+
+將已驗證的 LIFF access token 對應到 (line_user_id, users.id)，
+避免每個 API 請求都呼叫 LINE profile API 並查詢 User。
+
+- Key 使用 token 的 SHA-256 雜湊，記憶體中不保留原始 token
+- TTL 到期自動失效，超過容量時淘汰最久未使用的項目（LRU）
+- 提供命中/未命中統計與明確失效（單一 token 或整個使用者）
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from src.config import settings
+
+
+class CachedIdentity(NamedTuple):
+    """快取中的已驗證身份"""
+    line_user_id: str
+    user_id: int
+
+
+class IdentityCache:
+    """有容量上限的 TTL + LRU 身份快取（執行緒安全）"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[CachedIdentity, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def hash_token(access_token: str) -> str:
+        """計算 token 雜湊（作為快取 key）"""
+        return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+    def get(self, access_token: str) -> Optional[CachedIdentity]:
+        """取得快取身份，不存在或已過期時回傳 None"""
+        key = self.hash_token(access_token)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            identity, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return identity
+
+    def set(self, access_token: str, line_user_id: str, user_id: int, ttl_seconds: Optional[float] = None) -> None:
+        """寫入快取，超過容量時淘汰最久未使用的項目"""
+        if self.max_entries <= 0:
+            return
+        key = self.hash_token(access_token)
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = self._clock() + ttl
+        with self._lock:
+            self._entries[key] = (CachedIdentity(line_user_id, user_id), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, access_token: str) -> bool:
+        """使單一 token 失效，回傳是否有項目被移除"""
+        key = self.hash_token(access_token)
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def invalidate_user(self, user_id: int) -> int:
+        """使某使用者的所有 token 失效（例如帳號刪除或登出），回傳移除數量"""
+        with self._lock:
+            keys = [k for k, (identity, _) in self._entries.items() if identity.user_id == user_id]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """清空快取與統計"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """快取統計資料"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 全域快取實例
+identity_cache = IdentityCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
@@ -5,18 +5,23 @@
 """
 
 import logging
+from functools import wraps
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
-from src.database import SessionLocal
+from src.config import settings as app_settings
+from src.database import SessionLocal, open_read_session
 from src.models.notification_settings import NotificationSettings
 from src.models.wine_item import WineItem
 from src.models.wine_cellar import WineCellar
+from src.services.change_feed import purge_tombstones
 from src.services.line_bot import send_expiry_notification, send_space_warning
+from src.utils.query_stats import report_query_stats, track_queries
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +32,22 @@ TAIWAN_TZ = ZoneInfo("Asia/Taipei")
 scheduler = BackgroundScheduler(timezone=TAIWAN_TZ)
 
 
+def _track_job_queries(job):
+    """記錄排程工作的 SQL 數量，疑似 N+1 時寫入警告 log"""
+    @wraps(job)
+    def wrapper(*args, **kwargs):
+        with track_queries(f"scheduler:{job.__name__}") as stats:
+            try:
+                return job(*args, **kwargs)
+            finally:
+                report_query_stats(
+                    stats,
+                    repeat_threshold=app_settings.QUERY_REPEAT_WARNING_THRESHOLD,
+                    count_threshold=app_settings.QUERY_COUNT_WARNING_THRESHOLD,
+                )
+    return wrapper
+
+
 def start_scheduler():
     """
     啟動排程器並註冊所有定時任務
@@ -54,6 +75,15 @@ def start_scheduler():
             replace_existing=True
         )
 
+        # 註冊每日任務：清除超過保留期限的酒款刪除記錄（增量同步用）
+        scheduler.add_job(
+            purge_wine_item_tombstones,
+            trigger=CronTrigger(hour=4, minute=30),
+            id="purge_wine_item_tombstones",
+            name="清除過期的酒款刪除記錄",
+            replace_existing=True
+        )
+
         scheduler.start()
         logger.info("排程器已啟動，已註冊定時任務")
 
@@ -79,6 +109,7 @@ def stop_scheduler():
         raise
 
 
+@_track_job_queries
 def check_drinking_period():
     """
     檢查所有使用者的適飲期提醒並在用戶設定時間發送通知
@@ -87,54 +118,55 @@ def check_drinking_period():
     時間：每小時的 0 分檢查，當「當前小時」符合用戶「設定小時」時發送。
     """
     logger.info("開始執行：適飲期提醒檢查")
-    db = SessionLocal()
+    db = open_read_session()  # 唯讀掃描，可走副本
 
     try:
         # 查詢所有啟用適飲期提醒的通知設定
-        settings_list = db.query(NotificationSettings).filter(
+        # joinedload user：避免迴圈中每位使用者各查一次 users（N+1）
+        settings_list = db.query(NotificationSettings).options(
+            joinedload(NotificationSettings.user)
+        ).filter(
             NotificationSettings.expiry_warning_enabled == True
         ).all()
 
         logger.info(f"找到 {len(settings_list)} 位使用者啟用適飲期提醒")
 
-        for settings in settings_list:
-            try:
-                now = datetime.now(TAIWAN_TZ)
-                today = now.date()
-                
-                # 檢查是否為該用戶的通知時間 (僅比對小時)
-                user_notification_time = settings.notification_time
-                if now.hour != user_notification_time.hour:
-                    continue
-                
-                # 查詢該使用者的所有酒款
-                # 條件: 有設定 optimal_drinking_end 的酒款
-                
-                from src.models.wine_item import WineItem
-                from src.models.wine_cellar import WineCellar
-                
-                items = db.query(WineItem).join(
-                    WineCellar, WineItem.cellar_id == WineCellar.id
-                ).filter(
-                    WineCellar.owner_id == settings.user_id,  # 修正欄位名稱
-                    WineItem.optimal_drinking_end.isnot(None)
-                ).all()
+        # 只處理「當前小時」符合用戶設定小時者
+        now = datetime.now(TAIWAN_TZ)
+        today = now.date()
+        due_settings = [ns for ns in settings_list if ns.notification_time.hour == now.hour]
+        if not due_settings:
+            logger.info("完成：適飲期提醒檢查（本小時無需通知的使用者）")
+            return
+
+        # 一次查出所有待通知使用者 7 天內到期的酒款（走 ix_wine_items_optimal_drinking_end 部分索引），
+        # 不在迴圈內逐使用者查詢
+        rows = db.query(WineCellar.owner_id, WineItem).join(
+            WineCellar, WineItem.cellar_id == WineCellar.id
+        ).filter(
+            WineCellar.owner_id.in_([ns.user_id for ns in due_settings]),
+            WineItem.optimal_drinking_end.isnot(None),
+            WineItem.optimal_drinking_end <= today + timedelta(days=7)
+        ).all()
+
+        items_by_owner: dict[int, list] = {}
+        for owner_id, item in rows:
+            items_by_owner.setdefault(owner_id, []).append(item)
 
+        for settings in due_settings:
+            try:
                 # 篩選邏輯：
                 # 1. 已經過期 (optimal_drinking_end < today)
                 # 2. 即將過期 (within 7 days)
-                
-                notify_items = []
-                for item in items:
-                    days_remaining = (item.optimal_drinking_end - today).days
-                    
-                    if days_remaining <= 7: # 剩餘 7 天內或已過期
-                        notify_items.append({
-                            "name": item.name,
-                            "expiry_date": item.optimal_drinking_end.isoformat(),
-                            "days_remaining": days_remaining,
-                            "type": "wine"  # 簡化為固定值
-                        })
+                notify_items = [
+                    {
+                        "name": item.name,
+                        "expiry_date": item.optimal_drinking_end.isoformat(),
+                        "days_remaining": (item.optimal_drinking_end - today).days,
+                        "type": "wine"  # 簡化為固定值
+                    }
+                    for item in items_by_owner.get(settings.user_id, [])
+                ]
 
                 if notify_items:
                     # 發送通知
@@ -154,6 +186,7 @@ def check_drinking_period():
         db.close()
 
 
+@_track_job_queries
 def check_space_usage():
     """
     檢查所有使用者的酒窖空間使用率並發送警告
@@ -161,47 +194,47 @@ def check_space_usage():
     遍歷所有啟用空間提醒的使用者，檢查其酒窖空間使用率。
     """
     logger.info("開始執行：檢查酒窖空間使用率")
-    db = SessionLocal()
+    db = open_read_session()  # 唯讀掃描，可走副本
 
     try:
         # 查詢所有啟用空間提醒的通知設定
-        settings_list = db.query(NotificationSettings).filter(
+        settings_list = db.query(NotificationSettings).options(
+            joinedload(NotificationSettings.user)
+        ).filter(
             NotificationSettings.space_warning_enabled == True
         ).all()
 
         logger.info(f"找到 {len(settings_list)} 位使用者啟用空間提醒")
 
-        for settings in settings_list:
+        # 只處理「當前小時」符合用戶設定小時者
+        now = datetime.now(TAIWAN_TZ)
+        due_settings = [ns for ns in settings_list if ns.notification_time.hour == now.hour]
+        if not due_settings:
+            logger.info("完成：檢查酒窖空間使用率（本小時無需通知的使用者）")
+            return
+
+        # 一次查出所有待通知使用者有設定容量的酒窖及其酒款總數量（單一 GROUP BY，不逐酒窖查詢）
+        rows = db.query(
+            WineCellar,
+            func.coalesce(func.sum(WineItem.quantity), 0),
+        ).outerjoin(
+            WineItem, WineItem.cellar_id == WineCellar.id
+        ).filter(
+            WineCellar.owner_id.in_([ns.user_id for ns in due_settings]),
+            WineCellar.capacity > 0,
+        ).group_by(WineCellar.id).all()
+
+        cellars_by_owner: dict[int, list] = {}
+        for wine_cellar, used_slots in rows:
+            cellars_by_owner.setdefault(wine_cellar.owner_id, []).append((wine_cellar, used_slots))
+
+        for settings in due_settings:
             try:
-                now = datetime.now(TAIWAN_TZ)
-                
-                # 檢查是否為該用戶的通知時間 (僅比對小時)
-                user_notification_time = settings.notification_time
-                if now.hour != user_notification_time.hour:
-                    continue
-
-                # 查詢該使用者的所有酒窖
-                from src.models.wine_cellar import WineCellar
-                wine_cellars = db.query(WineCellar).filter(
-                    WineCellar.owner_id == settings.user_id
-                ).all()
-
-                for wine_cellar in wine_cellars:
+                for wine_cellar, used_slots in cellars_by_owner.get(settings.user_id, []):
                     # 計算酒窖空間使用率
                     # 簡化計算：使用酒款數量 vs 酒窖容量
-                    
-                    # 如果酒窖沒有設定容量，跳過
-                    if not wine_cellar.capacity or wine_cellar.capacity == 0:
-                        continue
-                    
-                    # 計算該酒窖的酒款總數量
-                    used_slots = db.query(func.sum(WineItem.quantity)).filter(
-                        WineItem.cellar_id == wine_cellar.id
-                    ).scalar() or 0
-                    
-                    # 計算使用率
                     usage_percentage = (used_slots / wine_cellar.capacity) * 100
-                    
+
                     # 如果超過門檻，發送警告
                     if usage_percentage >= settings.space_warning_threshold:
                         logger.info(
@@ -223,6 +256,19 @@ def check_space_usage():
         db.close()
 
 
+@_track_job_queries
+def purge_wine_item_tombstones():
+    """清除超過保留期限的酒款刪除記錄（之前的 sync token 會改為完整同步）"""
+    db = SessionLocal()
+    try:
+        deleted = purge_tombstones(db)
+        logger.info(f"完成：清除 {deleted} 筆過期的酒款刪除記錄")
+    except Exception as e:
+        logger.error(f"清除酒款刪除記錄時發生錯誤: {e}")
+    finally:
+        db.close()
+
+
 def schedule_bottle_opened_reminder(wine_item, user_id):
     """
     為單一酒款設置開瓶後提醒任務
@@ -0,0 +1,68 @@
+"""
+後端 Session Token 服務模組
+
+LIFF access token 經 LINE API 驗證一次後，換發以 SECRET_KEY 簽署的短效 JWT。
+之後的 API 請求只需在本地驗證簽章與效期（純 CPU 運算），
+不必呼叫 LINE API，也不必查詢資料庫（users.id 已包含在 claims 中）。
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+from src.config import settings
+
+SESSION_TOKEN_ALGORITHM = "HS256"
+SESSION_TOKEN_ISSUER = "ai-wine-cellar"
+SESSION_TOKEN_TYPE = "session"
+
+
+def create_session_token(user_id: int) -> tuple[str, datetime]:
+    """
+    簽發 session token
+
+    Args:
+        user_id: 資料庫 User.id
+
+    Returns:
+        (token, 到期時間)
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=settings.SESSION_TOKEN_TTL_SECONDS)
+    payload = {
+        "sub": str(user_id),
+        "typ": SESSION_TOKEN_TYPE,
+        "iss": SESSION_TOKEN_ISSUER,
+        "iat": now,
+        "exp": expires_at,
+    }
+    token = jwt.encode(payload, settings.SECRET_KEY, algorithm=SESSION_TOKEN_ALGORITHM)
+    return token, expires_at
+
+
+def looks_like_session_token(token: str) -> bool:
+    """是否為 JWT 格式（header.payload.signature）— 用於快速分流，不做驗證"""
+    return token.count(".") == 2
+
+
+def verify_session_token(token: str) -> int:
+    """
+    驗證 session token 並回傳 User.id
+
+    Raises:
+        jwt.ExpiredSignatureError: token 已過期
+        jwt.InvalidTokenError: 簽章、簽發者或格式不正確
+    """
+    payload = jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[SESSION_TOKEN_ALGORITHM],
+        issuer=SESSION_TOKEN_ISSUER,
+        options={"require": ["exp", "sub", "iss"]},
+    )
+    if payload.get("typ") != SESSION_TOKEN_TYPE:
+        raise jwt.InvalidTokenError("Not a session token")
+    try:
+        return int(payload["sub"])
+    except (TypeError, ValueError) as e:
+        raise jwt.InvalidTokenError("Invalid subject") from e
@@ -0,0 +1,55 @@
+"""
+Single-flight 服務模組
+
+合併同一 key 的並行呼叫：第一個呼叫者啟動執行，所有呼叫者等待並共用同一結果
+（包含例外）；呼叫者被取消只影響自己，不影響其他等待者。用於 LIFF token 驗證與使用者建立，避免同一使用者同時打開
+LIFF 時重複呼叫 LINE API 或重複建立 User / 預設酒窖。
+
+僅在單一 process 內有效；跨 worker 的重複由資料庫唯一約束把關。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """以 key 合併並行中的 async 呼叫"""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.executions = 0  # 實際執行次數
+        self.shared = 0  # 共用他人結果的次數
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        執行 fn(*args, **kwargs)；若同 key 已有進行中的呼叫，則等待其結果
+
+        Args:
+            key: 合併用的 key
+            fn: async 函式
+
+        Returns:
+            fn 的回傳值（進行中呼叫失敗時拋出相同例外）
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            # fn 在獨立的 task 中執行：第一個呼叫者（例如用戶端斷線）被取消時不會連帶取消共用的呼叫
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # shield：任一等待者被取消時不影響執行中的呼叫與其他等待者
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 標記例外已被讀取，避免所有等待者都已取消時出現 "exception was never retrieved"
+            task.exception()
+
+    def in_flight(self) -> int:
+        """目前進行中的呼叫數"""
+        return len(self._calls)
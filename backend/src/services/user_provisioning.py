@@ -0,0 +1,168 @@
+"""
+使用者佈建服務模組
+
+在單一 transaction 內解析或建立 User 與其預設酒窖：
+- PostgreSQL：一條 CTE 語句先查既有使用者，不存在時才 INSERT ... ON CONFLICT ... RETURNING
+  （一次往返、一次 commit）
+- SQLite（測試用）：同一 transaction 內依序執行等效語句，只 commit 一次
+
+也處理舊資料：早期版本曾以 access token 作為 line_user_id 建立使用者，
+找到時改寫為真正的 LINE User ID。
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import mark_user_write
+from src.models.user import User
+from src.models.wine_cellar import WineCellar
+
+logger = logging.getLogger(__name__)
+
+# 新用戶的預設酒窖
+DEFAULT_CELLAR_NAME = "我的酒窖"
+DEFAULT_CELLAR_DESCRIPTION = "自動建立的預設酒窖"
+DEFAULT_CELLAR_CAPACITY = 50
+
+# 先查既有使用者：已存在時 legacy / inserted 的條件皆不成立，不會執行 INSERT，
+# 也就不會消耗 users.id 序列值（只有並行建立同一用戶時 ON CONFLICT 才會用掉一個）。
+# 結果依 priority 明確排序，不依賴 UNION ALL 的列順序。
+_PG_PROVISION_SQL = text("""
+WITH existing AS (
+    SELECT id FROM users WHERE line_user_id = :line_user_id
+), legacy AS (
+    UPDATE users
+    SET line_user_id = :line_user_id, display_name = :display_name, updated_at = :now
+    WHERE line_user_id = :legacy_line_user_id
+      AND NOT EXISTS (SELECT 1 FROM existing)
+    RETURNING id
+), inserted AS (
+    INSERT INTO users (line_user_id, display_name, storage_mode, created_at, updated_at)
+    SELECT :line_user_id, :display_name, 'simple', :now, :now
+    WHERE NOT EXISTS (SELECT 1 FROM existing)
+      AND NOT EXISTS (SELECT 1 FROM legacy)
+    ON CONFLICT (line_user_id) DO NOTHING
+    RETURNING id
+), default_cellar AS (
+    INSERT INTO wine_cellars (owner_id, name, description, capacity, created_at, updated_at)
+    SELECT id, :cellar_name, :cellar_description, :cellar_capacity, :now, :now FROM inserted
+    RETURNING id
+)
+SELECT id, source FROM (
+    SELECT id, 'existing' AS source, 1 AS priority FROM existing
+    UNION ALL
+    SELECT id, 'legacy' AS source, 2 AS priority FROM legacy
+    UNION ALL
+    SELECT id, 'created' AS source, 3 AS priority FROM inserted
+) AS resolved
+ORDER BY priority
+LIMIT 1
+""")
+
+
+async def get_or_create_user_id(
+    db: AsyncSession,
+    line_user_id: str,
+    display_name: str,
+    legacy_line_user_id: str,
+) -> int:
+    """
+    解析或建立使用者（含預設酒窖），整個流程只 commit 一次
+
+    Args:
+        db: 資料庫 session
+        line_user_id: 真正的 LINE User ID
+        display_name: LINE 顯示名稱
+        legacy_line_user_id: 舊版以 access token 當 line_user_id 的值
+
+    Returns:
+        int: 資料庫中的 User.id
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        user_id, source = await _provision_postgresql(db, line_user_id, display_name, legacy_line_user_id)
+    else:
+        user_id, source = await _provision_sqlite(db, line_user_id, display_name, legacy_line_user_id)
+
+    if source != "existing":
+        # 使用者請求的 context 尚未建立，直接記錄寫入，讓接下來的讀取走主庫
+        mark_user_write(user_id)
+
+    if source == "created":
+        logger.info(f"創建新用戶並建立預設酒窖: line_user_id={line_user_id}, id={user_id}")
+    elif source == "legacy":
+        logger.info(f"更新舊用戶的 line_user_id: {user_id}")
+    return user_id
+
+
+async def _provision_postgresql(db: AsyncSession, line_user_id: str, display_name: str, legacy_line_user_id: str):
+    """PostgreSQL：單一 CTE 語句完成查找/舊資料改寫/建立用戶與酒窖"""
+    result = await db.execute(_PG_PROVISION_SQL, {
+        "line_user_id": line_user_id,
+        "display_name": display_name,
+        "legacy_line_user_id": legacy_line_user_id,
+        "now": datetime.utcnow(),
+        "cellar_name": DEFAULT_CELLAR_NAME,
+        "cellar_description": DEFAULT_CELLAR_DESCRIPTION,
+        "cellar_capacity": DEFAULT_CELLAR_CAPACITY,
+    })
+    row = result.first()
+    await db.commit()
+
+    if row is None:
+        # 並行 transaction 剛好搶先建立同一用戶：ON CONFLICT 跳過，但本語句的快照看不到該列
+        user_id = (await db.execute(select(User.id).where(User.line_user_id == line_user_id))).scalar_one()
+        return user_id, "existing"
+    return row.id, row.source
+
+
+async def _provision_sqlite(db: AsyncSession, line_user_id: str, display_name: str, legacy_line_user_id: str):
+    """SQLite：同一 transaction 內的等效語句（INSERT ... ON CONFLICT DO NOTHING RETURNING）"""
+    now = datetime.utcnow()
+
+    user_id = (await db.execute(select(User.id).where(User.line_user_id == line_user_id))).scalar()
+    if user_id is not None:
+        return user_id, "existing"
+
+    user_id = (await db.execute(
+        update(User)
+        .where(User.line_user_id == legacy_line_user_id)
+        .values(line_user_id=line_user_id, display_name=display_name, updated_at=now)
+        .returning(User.id)
+    )).scalar()
+    if user_id is not None:
+        await db.commit()
+        return user_id, "legacy"
+
+    user_id = (await db.execute(
+        sqlite_insert(User)
+        .values(
+            line_user_id=line_user_id,
+            display_name=display_name,
+            storage_mode="simple",
+            created_at=now,
+            updated_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=[User.line_user_id])
+        .returning(User.id)
+    )).scalar()
+    if user_id is None:
+        await db.commit()
+        user_id = (await db.execute(select(User.id).where(User.line_user_id == line_user_id))).scalar_one()
+        return user_id, "existing"
+
+    await db.execute(
+        WineCellar.__table__.insert().values(
+            owner_id=user_id,
+            name=DEFAULT_CELLAR_NAME,
+            description=DEFAULT_CELLAR_DESCRIPTION,
+            capacity=DEFAULT_CELLAR_CAPACITY,
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    await db.commit()
+    return user_id, "created"
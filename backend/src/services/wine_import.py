@@ -0,0 +1,223 @@
+"""
+酒款批次匯入服務模組
+
+從 CSV / JSON / NDJSON 檔案匯入酒款（例如從其他酒窖 App 移轉）：
+- 解析與驗證為同步 CPU 工作，於 thread 執行以免阻塞 event loop；錯誤的資料列記錄行號與原因後略過
+- 單次匯入限制資料列數（IMPORT_MAX_ROWS）與總瓶數（IMPORT_MAX_BOTTLES，quantity 會拆分為多筆記錄）
+- 每 IMPORT_BATCH_SIZE 筆以 multi-row INSERT ... RETURNING 寫入主記錄，
+  再以一次 executemany 寫入依 quantity 拆分的其餘瓶數（split_from_id 指向主記錄）
+- 全部在呼叫端的同一個交易內，由呼叫端 commit / rollback
+
+GET /wine-cellars/{id}/export 匯出的 CSV / NDJSON 可直接匯入（多出的欄位會被忽略）。
+"""
+
+import asyncio
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import IO, Callable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.wine_item import WineItem
+from src.schemas.wine_item import WineItemImportRow
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_ROWS = 10_000
+IMPORT_MAX_BOTTLES = 20_000
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+_EXTENSION_FORMATS = {".csv": "csv", ".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+_CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+class ImportFormatError(ValueError):
+    """檔案無法解析（非逐列錯誤，整個匯入中止）"""
+
+
+class ImportLimitError(ValueError):
+    """超過單次匯入的資料列數或瓶數上限（整個匯入中止）"""
+
+
+@dataclass
+class ImportReport:
+    """匯入結果"""
+    imported: int = 0   # 成功匯入的資料列
+    bottles: int = 0    # 建立的酒款記錄（一瓶一筆）
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, row: int, messages: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": messages})
+
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """依副檔名或 Content-Type 判斷檔案格式"""
+    name = (filename or "").lower()
+    for extension, fmt in _EXTENSION_FORMATS.items():
+        if name.endswith(extension):
+            return fmt
+    return _CONTENT_TYPE_FORMATS.get((content_type or "").split(";")[0].strip().lower())
+
+
+def _iter_csv(file: IO[bytes]) -> Iterator[tuple[int, object]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for record in reader:
+            # 空白欄位視為未提供，套用預設值
+            yield reader.line_num, {
+                key.strip(): value.strip()
+                for key, value in record.items()
+                if key and isinstance(value, str) and value.strip()
+            }
+    except UnicodeDecodeError as e:
+        raise ImportFormatError("CSV 檔案需為 UTF-8 編碼") from e
+    finally:
+        text.detach()
+
+
+def _iter_ndjson(file: IO[bytes]) -> Iterator[tuple[int, object]]:
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def _iter_json(file: IO[bytes]) -> Iterator[tuple[int, object]]:
+    try:
+        payload = json.load(file)
+    except ValueError as e:
+        raise ImportFormatError("JSON 格式錯誤") from e
+    if isinstance(payload, dict):
+        payload = payload.get("items")
+    if not isinstance(payload, list):
+        raise ImportFormatError("JSON 需為酒款陣列，或含 items 陣列的物件")
+    yield from enumerate(payload, start=1)
+
+
+def iter_import_records(file: IO[bytes], fmt: str) -> Iterator[tuple[int, object]]:
+    """
+    逐筆讀取匯入檔案
+
+    Yields:
+        (行號, 原始資料)：CSV / NDJSON 為檔案行號，JSON 陣列為第幾筆（從 1 起算）
+
+    Raises:
+        ImportFormatError: 檔案無法解析
+        ImportLimitError: 超過 IMPORT_MAX_ROWS
+    """
+    readers = {"csv": _iter_csv, "ndjson": _iter_ndjson, "json": _iter_json}
+    for count, (row, record) in enumerate(readers[fmt](file), start=1):
+        if count > IMPORT_MAX_ROWS:
+            raise ImportLimitError(f"超過單次匯入上限 {IMPORT_MAX_ROWS} 筆")
+        yield row, record
+
+
+def validate_import_record(record: object) -> tuple[Optional[WineItemImportRow], list[str]]:
+    """驗證單筆資料，回傳 (資料, 錯誤訊息)"""
+    if not isinstance(record, dict):
+        return None, ["每筆資料必須是 JSON 物件"]
+    try:
+        return WineItemImportRow.model_validate(record), []
+    except ValidationError as e:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        ]
+
+
+async def insert_wine_items(db: AsyncSession, cellar_id: int, batch: list[tuple[dict, int]]) -> list[int]:
+    """
+    批次寫入酒款（新增酒款與匯入共用）
+
+    不建立 ORM 物件：主記錄以一次 INSERT ... RETURNING、拆分記錄以一次 executemany 寫入，
+    瓶數多寡只影響參數數量，不增加 unit of work 的負擔。
+
+    Args:
+        batch: (欄位資料, 瓶數) 清單；每筆建立一筆主記錄，瓶數 > 1 時其餘各建立一筆拆分記錄
+
+    Returns:
+        主記錄 ID（與 batch 順序相同）
+    """
+    primaries = [{**item_data, "cellar_id": cellar_id} for item_data, _ in batch]
+    # insertmanyvalues：多列 INSERT ... RETURNING，依參數順序回傳 id
+    primary_ids = (await db.execute(
+        insert(WineItem).returning(WineItem.id, sort_by_parameter_order=True), primaries
+    )).scalars().all()
+
+    clones = [
+        {**primary, "split_from_id": primary_id}
+        for primary, primary_id, (_, quantity) in zip(primaries, primary_ids, batch)
+        for _ in range(quantity - 1)
+    ]
+    if clones:
+        await db.execute(insert(WineItem), clones)
+    return primary_ids
+
+
+async def _flush_batch(db: AsyncSession, cellar_id: int, batch: list[tuple[dict, int]], report: ImportReport) -> None:
+    await insert_wine_items(db, cellar_id, batch)
+    report.imported += len(batch)
+    report.bottles += sum(quantity for _, quantity in batch)
+
+
+def parse_import_file(
+    file: IO[bytes], fmt: str, prepare: Callable[[dict], tuple[dict, int]]
+) -> tuple[ImportReport, list[tuple[dict, int]]]:
+    """
+    解析並驗證匯入檔案（同步，於 thread 執行）
+
+    Returns:
+        (驗證失敗的資料列報告, 通過驗證的 (欄位資料, 瓶數) 清單)
+
+    Raises:
+        ImportFormatError: 檔案無法解析
+        ImportLimitError: 超過資料列數或瓶數上限
+    """
+    report = ImportReport()
+    items: list[tuple[dict, int]] = []
+    bottles = 0
+
+    for row, record in iter_import_records(file, fmt):
+        data, errors = validate_import_record(record)
+        if errors:
+            report.add_error(row, errors)
+            continue
+        item_data, quantity = prepare(data.model_dump(exclude={"cellar_id"}))
+        bottles += quantity
+        if bottles > IMPORT_MAX_BOTTLES:
+            raise ImportLimitError(f"超過單次匯入上限 {IMPORT_MAX_BOTTLES} 瓶")
+        items.append((item_data, quantity))
+    return report, items
+
+
+async def import_wine_items(
+    db: AsyncSession,
+    cellar_id: int,
+    file: IO[bytes],
+    fmt: str,
+    prepare: Callable[[dict], tuple[dict, int]],
+) -> ImportReport:
+    """
+    匯入檔案中的酒款（不 commit）
+
+    Args:
+        prepare: 將驗證後的資料轉為 (欄位資料, 瓶數)，與 POST /wine-items 共用處理邏輯
+    """
+    report, items = await asyncio.to_thread(parse_import_file, file, fmt, prepare)
+    for start in range(0, len(items), IMPORT_BATCH_SIZE):
+        await _flush_batch(db, cellar_id, items[start:start + IMPORT_BATCH_SIZE], report)
+    return report
@@ -0,0 +1,92 @@
+"""
+酒款全文搜尋服務模組
+
+搜尋 name / brand / region / country / notes / review / flavor_tags，依相關度排序：
+- PostgreSQL：tsvector 運算式 GIN 索引做前綴比對並以 ts_rank_cd 計分；
+  酒名 + 品牌另以 pg_trgm 索引做子字串比對（中文名稱沒有空白分詞時也找得到），
+  以 similarity() 加分
+- SQLite（本機開發 / 測試）：FTS5 external content 表，以 bm25() 計分
+
+索引由 alembic/versions/0006_wine_items_search.py 建立（SQLite 另見 src/models/wine_item.py）。
+下方運算式須與 migration 中的索引運算式一致，否則 PostgreSQL 不會使用索引。
+"""
+
+import re
+
+from sqlalchemy import Select, column, func, literal_column, or_, table
+
+from src.models.wine_item import SEARCH_FTS_TABLE, WineItem
+
+# 關鍵字只保留文字與數字，避免 tsquery / FTS5 查詢語法注入
+_SEARCH_TERM = re.compile(r"\w+")
+MAX_SEARCH_TERMS = 8
+
+# bm25 欄位權重（順序同 SEARCH_COLUMNS）：酒名、品牌 > 產區、國家 > 備註、評論、風味標籤
+_FTS_WEIGHTS = "10.0, 10.0, 4.0, 4.0, 1.0, 1.0, 2.0"
+
+_SPACE = literal_column("' '")
+_EMPTY = literal_column("''")
+_SIMPLE = literal_column("'simple'")
+
+
+def search_terms(q: str) -> list[str]:
+    """切出搜尋關鍵字（小寫，最多 MAX_SEARCH_TERMS 個）"""
+    return _SEARCH_TERM.findall(q.lower())[:MAX_SEARCH_TERMS]
+
+
+def _joined(*columns):
+    """coalesce(a, '') || ' ' || coalesce(b, '') ...（常數以字面值輸出，才能對應索引運算式）"""
+    expr = func.coalesce(columns[0], _EMPTY)
+    for col in columns[1:]:
+        expr = expr.op("||")(_SPACE).op("||")(func.coalesce(col, _EMPTY))
+    return expr
+
+
+def _weighted(weight: str, *columns):
+    return func.setweight(func.to_tsvector(_SIMPLE, _joined(*columns)), literal_column(f"'{weight}'"))
+
+
+def search_vector():
+    """wine_items_search_tsv_idx 的運算式"""
+    return (
+        _weighted("A", WineItem.name, WineItem.brand)
+        .op("||")(_weighted("B", WineItem.region, WineItem.country))
+        .op("||")(_weighted("C", WineItem.notes, WineItem.review, WineItem.flavor_tags))
+    )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_search(query: Select, dialect: str, q: str, terms: list[str]) -> Select:
+    """
+    為 select（以 WineItem 為主）加上搜尋條件，並依相關度（高到低）、id（新到舊）排序
+
+    Args:
+        query: 已含權限條件的查詢
+        dialect: 資料庫 dialect 名稱（postgresql / sqlite）
+        q: 原始搜尋字串（子字串比對用）
+        terms: search_terms(q) 的結果，不可為空
+    """
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(_SIMPLE, " & ".join(f"{term}:*" for term in terms))
+        vector = search_vector()
+        name_brand = _joined(WineItem.name, WineItem.brand)
+        rank = func.ts_rank_cd(vector, tsquery) + func.similarity(name_brand, q)
+        return query.where(
+            or_(
+                vector.op("@@")(tsquery),
+                name_brand.ilike(f"%{_escape_like(q.strip())}%", escape="\\"),
+            )
+        ).order_by(rank.desc(), WineItem.id.desc())
+
+    # SQLite FTS5：每個關鍵字做前綴比對（AND）；bm25 越小越相關
+    fts = table(SEARCH_FTS_TABLE, column("rowid"))
+    match = " ".join(f'"{term}"*' for term in terms)
+    rank = literal_column(f"bm25({SEARCH_FTS_TABLE}, {_FTS_WEIGHTS})")
+    return (
+        query.join(fts, fts.c.rowid == WineItem.id)
+        .where(literal_column(SEARCH_FTS_TABLE).op("MATCH")(match))
+        .order_by(rank, WineItem.id.desc())
+    )
@@ -0,0 +1,251 @@
+"""
+酒款統計服務模組
+
+- get_facet_counts()：各篩選面向（facet）的 active 瓶數
+  PostgreSQL 以單一 GROUPING SETS 查詢完成；其他資料庫（SQLite）以單一 GROUP BY
+  取得各 facet 值組合的瓶數（精簡投影），再於 Python 走訪一次彙總。
+  每個 facet 的數量套用「其他」facet 的篩選條件、不套用自身的條件，
+  例如已選 wine_type=紅酒 時，wine_type facet 仍會列出切換為白酒時的瓶數。
+- compute_cellar_stats()：酒窖統計，以單一 GROUP BY 查詢取代載入所有酒款後的 Python 迴圈
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Integer, and_, case, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.wine_cellar import WineCellar
+from src.models.wine_item import WineItem
+
+FACET_NAMES = (
+    "wine_type",
+    "country",
+    "region",
+    "vintage_decade",
+    "bottle_status",
+    "disposition",
+    "rating_bucket",
+)
+
+# 評分（1-10）分組：(標籤, 下限, 上限)
+RATING_BUCKETS = (("1-2", 1, 2), ("3-4", 3, 4), ("5-6", 5, 6), ("7-8", 7, 8), ("9-10", 9, 10))
+
+
+@dataclass(frozen=True)
+class FacetFilters:
+    """目前套用的 facet 篩選條件（None 表示不篩選）"""
+    wine_type: Optional[str] = None
+    country: Optional[str] = None
+    region: Optional[str] = None
+    vintage_decade: Optional[int] = None
+    bottle_status: Optional[str] = None
+    disposition: Optional[str] = None
+    rating_bucket: Optional[str] = None
+
+    def applied(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in FACET_NAMES if getattr(self, name) is not None}
+
+
+def _int(value: int):
+    """整數常數以字面值輸出：GROUPING SETS 與 SELECT 的運算式須逐字相同，bind 參數會使兩者不一致"""
+    return literal_column(str(int(value)), Integer)
+
+
+def _facet_expressions() -> dict:
+    """各 facet 的 SQL 運算式"""
+    return {
+        "wine_type": WineItem.wine_type,
+        "country": WineItem.country,
+        "region": WineItem.region,
+        "vintage_decade": WineItem.vintage // _int(10) * _int(10),
+        "bottle_status": WineItem.bottle_status,
+        "disposition": WineItem.disposition,
+        "rating_bucket": case(
+            *[
+                (WineItem.rating.between(_int(lower), _int(upper)), literal_column(f"'{label}'"))
+                for label, lower, upper in RATING_BUCKETS
+            ]
+        ),
+    }
+
+
+def _facet_condition(name: str, value: Any):
+    """facet 篩選條件（年代與評分以範圍比較，可使用欄位索引）"""
+    if name == "vintage_decade":
+        return and_(WineItem.vintage >= value, WineItem.vintage < value + 10)
+    if name == "rating_bucket":
+        lower, upper = next((lo, hi) for label, lo, hi in RATING_BUCKETS if label == value)
+        return WineItem.rating.between(lower, upper)
+    return getattr(WineItem, name) == value
+
+
+def _bottles():
+    return func.coalesce(WineItem.quantity, 1)
+
+
+def _base_query(*columns, user_id: int, cellar_id: Optional[int]):
+    """使用者（或單一酒窖）的 active 酒款"""
+    query = (
+        select(*columns)
+        .select_from(WineItem)
+        .join(WineCellar, WineItem.cellar_id == WineCellar.id)
+        .where(
+            WineCellar.owner_id == user_id,
+            or_(WineItem.status == "active", WineItem.status.is_(None)),
+        )
+    )
+    if cellar_id is not None:
+        query = query.where(WineItem.cellar_id == cellar_id)
+    return query
+
+
+async def _grouping_sets_counts(
+    db: AsyncSession, user_id: int, cellar_id: Optional[int], filters: FacetFilters
+) -> dict[str, Counter]:
+    """PostgreSQL：單一 GROUPING SETS 查詢，每個 facet 的瓶數以排除自身條件的 SUM(CASE) 計算"""
+    expressions = _facet_expressions()
+    conditions = {name: _facet_condition(name, value) for name, value in filters.applied().items()}
+
+    measures = []
+    for name in FACET_NAMES:
+        others = [condition for other, condition in conditions.items() if other != name]
+        measure = func.sum(case((and_(*others), _bottles()), else_=0)) if others else func.sum(_bottles())
+        measures.append(measure.label(f"count_{name}"))
+
+    query = _base_query(
+        *[expr.label(name) for name, expr in expressions.items()],
+        *[func.grouping(expr).label(f"grouping_{name}") for name, expr in expressions.items()],
+        *measures,
+        user_id=user_id,
+        cellar_id=cellar_id,
+    ).group_by(func.grouping_sets(*expressions.values()))
+
+    counts: dict[str, Counter] = defaultdict(Counter)
+    for row in (await db.execute(query)).mappings():
+        # 每列只屬於一個 grouping set：GROUPING() = 0 的 facet
+        name = next(name for name in FACET_NAMES if row[f"grouping_{name}"] == 0)
+        counts[name][row[name]] += int(row[f"count_{name}"] or 0)
+    return counts
+
+
+async def _projection_counts(
+    db: AsyncSession, user_id: int, cellar_id: Optional[int], filters: FacetFilters
+) -> dict[str, Counter]:
+    """其他資料庫：GROUP BY 所有 facet 取得精簡投影，走訪一次彙總"""
+    expressions = _facet_expressions()
+    applied = filters.applied()
+    query = _base_query(
+        *[expr.label(name) for name, expr in expressions.items()],
+        func.sum(_bottles()).label("bottles"),
+        user_id=user_id,
+        cellar_id=cellar_id,
+    ).group_by(*expressions.values())
+
+    counts: dict[str, Counter] = defaultdict(Counter)
+    for row in (await db.execute(query)).mappings():
+        failed = [name for name, value in applied.items() if row[name] != value]
+        # 全部符合：計入每個 facet；只有一個不符：只計入該 facet（不套用自身條件）
+        if len(failed) > 1:
+            continue
+        for name in failed or FACET_NAMES:
+            counts[name][row[name]] += int(row["bottles"] or 0)
+    return counts
+
+
+async def get_facet_counts(
+    db: AsyncSession, user_id: int, filters: FacetFilters, cellar_id: Optional[int] = None
+) -> dict:
+    """
+    計算各 facet 值的 active 瓶數
+
+    Returns:
+        {"total": 符合所有條件的瓶數, "facets": {facet: [{"value", "count"}, ...]}}
+        各 facet 依瓶數由多到少排序
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        counts = await _grouping_sets_counts(db, user_id, cellar_id, filters)
+    else:
+        counts = await _projection_counts(db, user_id, cellar_id, filters)
+
+    facets = {
+        name: [
+            {"value": value, "count": count}
+            for value, count in sorted(
+                counts[name].items(), key=lambda kv: (-kv[1], kv[0] is None, str(kv[0]))
+            )
+            if count
+        ]
+        for name in FACET_NAMES
+    }
+    # wine_type facet 已套用其他所有條件，再篩選 wine_type 本身即為總數
+    total = sum(
+        facet["count"] for facet in facets["wine_type"]
+        if filters.wine_type is None or facet["value"] == filters.wine_type
+    )
+    return {"total": total, "facets": facets}
+
+
+async def compute_cellar_stats(db: AsyncSession, cellar: WineCellar) -> dict:
+    """
+    計算酒窖統計數據
+
+    以 (status, bottle_status, wine_type, country) 分組彙總，回傳列數只與組合數有關，
+    不需載入酒款。
+    """
+    bottles = _bottles()
+    query = (
+        select(
+            WineItem.status,
+            WineItem.bottle_status,
+            WineItem.wine_type,
+            WineItem.country,
+            func.count().label("items"),
+            func.sum(bottles).label("bottles"),
+            func.sum(func.coalesce(WineItem.purchase_price, 0) * bottles).label("value"),
+            func.sum(func.coalesce(WineItem.space_units, 1.0) * bottles).label("space"),
+        )
+        .where(WineItem.cellar_id == cellar.id)
+        .group_by(WineItem.status, WineItem.bottle_status, WineItem.wine_type, WineItem.country)
+    )
+
+    wine_count = total_bottles = 0
+    total_value = used_capacity = 0.0
+    bottle_stats = {'unopened': 0, 'opened': 0}
+    status_stats: Counter = Counter()
+    wine_type_stats: dict[str, dict] = {}
+    country_stats: Counter = Counter()
+
+    for row in (await db.execute(query)).all():
+        status_stats[row.status or 'active'] += row.items
+        if row.status != 'active':
+            continue
+
+        value = float(row.value or 0)
+        wine_count += row.items
+        total_bottles += int(row.bottles)
+        total_value += value
+        used_capacity += float(row.space or 0)
+        if row.bottle_status in bottle_stats:
+            bottle_stats[row.bottle_status] += row.items
+
+        type_stats = wine_type_stats.setdefault(row.wine_type or "其他", {"count": 0, "value": 0})
+        type_stats["count"] += int(row.bottles)
+        type_stats["value"] += value
+        country_stats[row.country or "未知"] += int(row.bottles)
+
+    return {
+        "wine_count": wine_count,
+        "total_bottles": total_bottles,
+        "total_value": total_value,
+        "used_capacity": used_capacity,
+        "available_capacity": (cellar.capacity or 0) - used_capacity,
+        "capacity_used": used_capacity,
+        "unopened_count": bottle_stats['unopened'],
+        "opened_count": bottle_stats['opened'],
+        "bottle_stats": bottle_stats,
+        "status_stats": dict(status_stats),
+        "wine_type_stats": wine_type_stats,
+        "country_stats": dict(country_stats),
+    }
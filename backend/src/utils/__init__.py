@@ -9,4 +9,9 @@
 
 __all__ = [
     # "validators",
+    "fast_json",
+    "pagination",
+    "pool_metrics",
+    "query_stats",
+    "sql",
 ]
@@ -0,0 +1,38 @@
+"""
+高速 JSON 序列化工具
+
+使用 orjson 直接將 dict / list 編碼為 bytes（原生支援 date / datetime），
+搭配 FastJSONResponse 回傳時 FastAPI 不會再以 response_model 驗證一次。
+未安裝 orjson 時退回標準庫 json，輸出格式相同。
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 為選用加速
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """將內容編碼為 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """以 dumps() 輸出的 JSONResponse（內容需為已轉換好的 dict / list）"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
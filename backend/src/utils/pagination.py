@@ -0,0 +1,110 @@
+"""
+Keyset（cursor）分頁工具
+
+cursor 是排序鍵值的 base64url JSON，對用戶端為不透明字串；
+下一頁以「排序鍵 < 上一頁最後一筆」取得，不需 OFFSET，頁數再深查詢成本也不變。
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Sequence
+
+from sqlalchemy import and_, literal, or_, tuple_
+
+
+class InvalidCursorError(ValueError):
+    """cursor 格式錯誤或已被竄改"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(sort: str, values: list[Any]) -> str:
+    """將排序名稱與最後一筆的排序鍵值編碼為 cursor"""
+    payload = {"s": sort, "k": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _matches_column(value: Any, column) -> bool:
+    """鍵值是否符合欄位的 Python 型別（NULL 僅限可為空的欄位）"""
+    if value is None:
+        return bool(column.nullable)
+    python_type = column.type.python_type
+    if isinstance(value, bool):
+        return python_type is bool
+    if python_type is float:
+        return isinstance(value, (int, float))
+    if python_type is date:
+        return isinstance(value, date) and not isinstance(value, datetime)
+    return isinstance(value, python_type)
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence = ()) -> list[Any]:
+    """
+    解碼 cursor，回傳排序鍵值
+
+    Args:
+        columns: 各鍵值對應的排序欄位；提供時檢查欄位數與型別，
+            避免竄改過的 cursor 把錯誤型別的值帶進查詢（在資料庫端才失敗而變成 500）
+
+    Raises:
+        InvalidCursorError: 格式錯誤、鍵值不符合排序欄位，或 cursor 不是以相同排序產生
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(v) for v in payload["k"]]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("無效的 cursor") from e
+
+    if payload.get("s") != sort:
+        raise InvalidCursorError("cursor 與目前的排序方式不符")
+    if columns:
+        if len(values) != len(columns):
+            raise InvalidCursorError("cursor 欄位數不符")
+        if not all(_matches_column(value, column) for value, column in zip(values, columns)):
+            raise InvalidCursorError("cursor 鍵值型別不符")
+    return values
+
+
+def keyset_order(column, tiebreaker, descending: bool) -> tuple:
+    """
+    (column, tiebreaker) 排序的 ORDER BY
+
+    空值視為最大值（與 PostgreSQL B-tree 預設相同）：遞增時排在最後、遞減時排在最前，
+    兩個方向都能以 (…, column, tiebreaker) 索引正向 / 反向掃描；SQLite 以明確的 NULLS 子句對齊。
+    """
+    if descending:
+        return column.desc().nulls_first(), tiebreaker.desc()
+    return column.asc().nulls_last(), tiebreaker.asc()
+
+
+def keyset_after(column, tiebreaker, descending: bool, last_value: Any, last_tiebreaker: Any):
+    """keyset_order 排序下，位於上一頁最後一筆 (last_value, last_tiebreaker) 之後的條件"""
+    if last_value is None:
+        after_null = tiebreaker < last_tiebreaker if descending else tiebreaker > last_tiebreaker
+        if descending:
+            return or_(and_(column.is_(None), after_null), column.isnot(None))
+        return and_(column.is_(None), after_null)
+
+    key = tuple_(column, tiebreaker)
+    last = tuple_(literal(last_value, column.type), literal(last_tiebreaker, tiebreaker.type))
+    if descending:
+        return key < last
+    return or_(key > last, column.is_(None))
@@ -0,0 +1,213 @@
+"""
+資料庫連線池監控工具
+
+記錄每個 engine 連線池的使用狀況，供內部 metrics 端點輸出，用來依實際數據調整連線池大小：
+- 計數：checkout / checkin / 新建連線 / 取得連線逾時
+- 即時值：連線池大小、使用中連線、閒置連線、使用中的溢出連線（含歷史高峰）
+- 取得連線的等待時間直方圖（毫秒）
+
+等待時間與逾時需要攔截 QueuePool._do_get()，因此 engine 需使用本模組的
+InstrumentedQueuePool / InstrumentedAsyncAdaptedQueuePool；其餘計數透過 pool events 取得。
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 等待時間直方圖上界（毫秒），最後一格為 +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """單一連線池的監控數據（thread-safe）"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._pool = None
+        self.reset()
+
+    def reset(self) -> None:
+        """清除所有計數（測試用）"""
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.timeouts = 0
+            self.peak_checked_out = 0
+            self.peak_overflow = 0
+            self._bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self._wait_count = 0
+            self._wait_sum_ms = 0.0
+            self._wait_max_ms = 0.0
+
+    def bind(self, pool) -> None:
+        """綁定目前的 pool 物件（engine.dispose() 重建 pool 時會重新綁定）"""
+        self._pool = pool
+
+    def record_wait(self, wait_ms: float) -> None:
+        """記錄一次取得連線的等待時間"""
+        index = bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)
+        with self._lock:
+            self._bucket_counts[index] += 1
+            self._wait_count += 1
+            self._wait_sum_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self) -> None:
+        checked_out, overflow = self._gauges()
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def _gauges(self) -> tuple[int, int]:
+        """(使用中連線數, 使用中的溢出連線數)"""
+        pool = self._pool
+        if pool is None or not hasattr(pool, "checkedout"):
+            return 0, 0
+        overflow = pool.overflow() if hasattr(pool, "overflow") else 0
+        return pool.checkedout(), max(0, overflow)
+
+    def snapshot(self) -> dict[str, Any]:
+        """輸出目前數據（直方圖為累積計數，格式同 Prometheus histogram）"""
+        pool = self._pool
+        checked_out, overflow = self._gauges()
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for upper, count in zip(WAIT_BUCKETS_MS, self._bucket_counts):
+                cumulative += count
+                buckets[str(upper)] = cumulative
+            buckets["+Inf"] = cumulative + self._bucket_counts[-1]
+
+            return {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "config": {
+                    "pool_size": pool.size() if hasattr(pool, "size") else None,
+                    "max_overflow": getattr(pool, "_max_overflow", None),
+                    "pool_timeout": getattr(pool, "_timeout", None),
+                    "pool_recycle": getattr(pool, "_recycle", None),
+                },
+                "gauges": {
+                    "checked_out": checked_out,
+                    "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else 0,
+                    "overflow_in_use": overflow,
+                    "peak_checked_out": self.peak_checked_out,
+                    "peak_overflow": self.peak_overflow,
+                },
+                "counters": {
+                    "checkouts": self.checkouts,
+                    "checkins": self.checkins,
+                    "connects": self.connects,
+                    "timeouts": self.timeouts,
+                },
+                "wait_ms": {
+                    "count": self._wait_count,
+                    "sum": round(self._wait_sum_ms, 3),
+                    "max": round(self._wait_max_ms, 3),
+                    "buckets": buckets,
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    """攔截 _do_get() 以量測取得連線的等待時間與逾時"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait((time.perf_counter() - started) * 1000)
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.bind(new_pool)
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """同步 engine 使用的 QueuePool"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """非同步 engine 使用的 AsyncAdaptedQueuePool"""
+
+
+# 全域註冊表：名稱 → PoolMetrics
+_registry: dict[str, PoolMetrics] = {}
+_registry_lock = threading.Lock()
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """
+    為 engine（同步 Engine 或 AsyncEngine）的連線池掛上監控
+
+    Args:
+        engine: SQLAlchemy Engine 或 AsyncEngine
+        name: 在 metrics 輸出中的名稱（例如 "primary"、"primary_async"）
+
+    Returns:
+        PoolMetrics: 此連線池的監控數據
+    """
+    sync_engine: Engine = getattr(engine, "sync_engine", engine)
+    metrics = PoolMetrics(name)
+    metrics.bind(sync_engine.pool)
+    if isinstance(sync_engine.pool, _InstrumentedPoolMixin):
+        sync_engine.pool.metrics = metrics
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.record_checkin()
+
+    with _registry_lock:
+        _registry[name] = metrics
+    return metrics
+
+
+def get_pool_metrics(name: str) -> Optional[PoolMetrics]:
+    """取得指定名稱的連線池監控數據"""
+    return _registry.get(name)
+
+
+def pool_metrics_snapshot() -> dict[str, dict[str, Any]]:
+    """所有已監控連線池的數據"""
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: metrics.snapshot() for name, metrics in items}
@@ -0,0 +1,216 @@
+"""
+SQL 查詢統計工具
+
+以 SQLAlchemy cursor events 記錄每個請求（或排程工作）的：
+- 執行的 SQL 數量
+- 資料庫耗時總和（毫秒）
+- 重複出現的 statement shape（去除參數後的 SQL），用來偵測 N+1 查詢
+
+統計物件存放在 ContextVar，由 QueryStatsMiddleware 於每個請求開始時建立；
+asyncio.to_thread / threadpool 會複製 context，因此同一請求內的查詢都會累計到同一物件。
+另提供 capture_queries() / assert_max_queries() 供測試檢查端點的查詢數上限。
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 去除參數用的正規表示式
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """將 SQL 正規化為 shape：參數、字串與數字常數以 ? 取代，IN 清單收斂為 (?...)"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _BIND_PARAM.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAM_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """單一請求 / 工作的查詢統計（thread-safe）"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """出現次數達 threshold 以上的 statement shape（依次數由多到少）"""
+        with self._lock:
+            return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def describe(self) -> str:
+        """人類可讀的摘要（用於 log 與測試失敗訊息）"""
+        lines = [f"{self.count} queries, {self.total_ms:.1f} ms"]
+        with self._lock:
+            lines.extend(f"  {n}x {shape}" for shape, n in self.shapes.most_common())
+        return "\n".join(lines)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# 不綁定 context 的收集器（測試用：TestClient 在另一個執行緒執行 app）
+_global_collectors: list[QueryStats] = []
+_global_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """取得目前請求的查詢統計（不在追蹤範圍內時為 None）"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[QueryStats]:
+    """在目前 context 追蹤查詢，離開時還原"""
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """記錄期間內所有執行緒的查詢（測試用）"""
+    stats = QueryStats("capture")
+    with _global_lock:
+        _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _global_lock:
+            _global_collectors.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(max_count: int) -> Iterator[QueryStats]:
+    """
+    斷言區塊內執行的 SQL 不超過 max_count 筆
+
+    用法：
+        with assert_max_queries(3):
+            client.get("/api/v1/wine-cellars/1")
+    """
+    with capture_queries() as stats:
+        yield stats
+    assert stats.count <= max_count, (
+        f"預期最多 {max_count} 筆查詢，實際執行 {stats.describe()}"
+    )
+
+
+def report_query_stats(stats: QueryStats, repeat_threshold: int, count_threshold: int) -> list[tuple[str, int]]:
+    """
+    檢查查詢統計，疑似 N+1 或查詢過多時寫入警告 log
+
+    Returns:
+        重複次數達門檻的 statement shape
+    """
+    repeated = stats.repeated(repeat_threshold)
+    for shape, n in repeated:
+        logger.warning(f"疑似 N+1 查詢 [{stats.label}]: 相同 SQL 執行 {n} 次: {shape[:300]}")
+    if stats.count >= count_threshold:
+        logger.warning(
+            f"查詢數過多 [{stats.label}]: {stats.count} 筆 SQL，DB 耗時 {stats.total_ms:.1f} ms"
+        )
+    return repeated
+
+
+class RouteQueryMetrics:
+    """各路由累計的查詢數據，供內部 metrics 端點輸出（thread-safe）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def record(self, route: str, stats: QueryStats, n_plus_one: bool) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(
+                route,
+                {"requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0, "n_plus_one_requests": 0},
+            )
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["db_ms"] += stats.total_ms
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["n_plus_one_requests"] += int(n_plus_one)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                route: {
+                    **entry,
+                    "db_ms": round(entry["db_ms"], 3),
+                    "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                }
+                for route, entry in sorted(self._routes.items())
+            }
+
+
+route_query_metrics = RouteQueryMetrics()
+
+
+# ============ SQLAlchemy events ============
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None and not _global_collectors:
+        return
+
+    started = getattr(context, "_query_stats_started", None)
+    elapsed_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    for collector in list(_global_collectors):
+        collector.record(statement, elapsed_ms)
+
+
+_installed = False
+
+
+def install_query_stats() -> None:
+    """
+    在 Engine 類別上註冊 cursor events（所有 engine 皆適用，含 async engine 底層的 sync engine）
+
+    重複呼叫無副作用。
+    """
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
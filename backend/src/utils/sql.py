@@ -0,0 +1,41 @@
+"""
+跨資料庫的 SQL 輔助建構
+
+PostgreSQL 與 SQLite（測試 / 本機開發）語法不同的聚合函式，以 @compiles 依方言輸出。
+"""
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import String
+
+
+class id_list_agg(FunctionElement):
+    """
+    將群組內的 ID 聚合為「由小到大、逗號分隔」的字串
+
+    PostgreSQL: string_agg(id::text, ',' ORDER BY id)
+    SQLite: group_concat(id)（順序不保證）
+    以 parse_id_list() 轉回排序後的 list[int]。
+    """
+
+    type = String()
+    name = "id_list_agg"
+    inherit_cache = True
+
+
+@compiles(id_list_agg, "postgresql")
+def _id_list_agg_postgresql(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"string_agg(CAST({column} AS TEXT), ',' ORDER BY {column})"
+
+
+@compiles(id_list_agg)
+def _id_list_agg_default(element, compiler, **kw):
+    return f"group_concat({compiler.process(element.clauses, **kw)})"
+
+
+def parse_id_list(value: str | None) -> list[int]:
+    """id_list_agg 的結果轉為排序後的 list[int]"""
+    if not value:
+        return []
+    return sorted(int(part) for part in value.split(","))
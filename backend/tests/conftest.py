@@ -3,32 +3,44 @@ pytest 配置文件
 提供測試用的 fixtures 和配置
 """
 
+import os
+import tempfile
+
 import pytest
+import pytest_asyncio
 import asyncio
 from typing import Generator, AsyncGenerator
 from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from src.main import app
-from src.database import Base, get_db
+from src.database import Base, get_async_db, get_db, get_read_db
 from src.models.user import User
 from src.models.wine_cellar import WineCellar
-from src.routes.dependencies import get_current_user_id
+from src.routes.dependencies import get_async_read_db, get_current_user_id
+from src.utils import query_stats
 
 
-# 測試用的 SQLite 記憶體資料庫
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# 測試用的 SQLite 暫存檔資料庫
+# 同步 engine（pysqlite）與非同步 engine（aiosqlite）需共用同一份資料，因此不能使用 :memory:
+_TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="wine-cellar-test-"), "test.sqlite3")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{_TEST_DB_PATH}"
+SQLALCHEMY_ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{_TEST_DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 
+# NullPool：每個 session 用完即關閉連線，drop_all 時不會被殘留連線鎖住
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, poolclass=NullPool)
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 
 def override_get_db():
@@ -40,6 +52,12 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """測試用的非同步資料庫 session"""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 def override_get_current_user_id():
     """測試用的使用者 ID - 模擬已登入使用者"""
     return 1
@@ -89,6 +107,13 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_db_session(db_session) -> AsyncGenerator:
+    """與 db_session 共用同一份測試資料的 AsyncSession"""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def client(db_session) -> Generator[TestClient, None, None]:
     """
@@ -96,6 +121,9 @@ def client(db_session) -> Generator[TestClient, None, None]:
     使用測試資料庫和模擬的認證
     """
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     app.dependency_overrides[get_current_user_id] = override_get_current_user_id
     
     with TestClient(app) as test_client:
@@ -104,13 +132,16 @@ def client(db_session) -> Generator[TestClient, None, None]:
     app.dependency_overrides.clear()
 
 
-@pytest.fixture(scope="function")
+@pytest_asyncio.fixture(scope="function")
 async def async_client(db_session) -> AsyncGenerator[AsyncClient, None]:
     """
     非同步測試 client
     用於測試需要非同步操作的 API
     """
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     app.dependency_overrides[get_current_user_id] = override_get_current_user_id
     
     async with AsyncClient(
@@ -122,6 +153,18 @@ async def async_client(db_session) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def assert_max_queries():
+    """
+    斷言區塊內執行的 SQL 數量上限（防止 N+1 回歸）
+
+    用法：
+        with assert_max_queries(3):
+            client.get("/api/v1/wine-cellars/1")
+    """
+    return query_stats.assert_max_queries
+
+
 @pytest.fixture
 def sample_wine_data():
     """範例酒款資料"""
@@ -0,0 +1,98 @@
+"""
+回應壓縮 middleware 測試
+"""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.middleware.compression import CompressionMiddleware, select_encoding
+from src.models.wine_item import WineItem
+
+LARGE = {"items": [{"id": i, "name": f"Cuvée {i}", "notes": "櫻桃與皮革"} for i in range(200)]}
+
+
+def _app() -> TestClient:
+    async def large(request):
+        return JSONResponse(LARGE, headers={"ETag": '"v1"'})
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def image(request):
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    async def stream(request):
+        async def lines():
+            for i in range(3):
+                yield f'{{"line": {i}}}\n'.encode()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app = Starlette(routes=[
+        Route("/large", large), Route("/small", small), Route("/image", image), Route("/stream", stream),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=512, gzip_level=6)
+    return TestClient(app)
+
+
+def test_select_encoding_honours_quality_values():
+    assert select_encoding("gzip, deflate, br", brotli_available=True) == "br"
+    assert select_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert select_encoding("br;q=0.5, gzip;q=0.8", brotli_available=True) == "gzip"
+    assert select_encoding("gzip;q=0, identity", brotli_available=False) is None
+    assert select_encoding("*", brotli_available=False) == "gzip"
+    assert select_encoding("", brotli_available=True) is None
+
+
+def test_large_json_is_gzipped_and_small_is_not():
+    client = _app()
+
+    large = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in large.headers["vary"].lower()
+    assert large.headers["etag"] == 'W/"v1"'
+    assert int(large.headers["content-length"]) < len(JSONResponse(LARGE).body) / 3
+    assert large.json() == LARGE
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"v1"'
+
+    head = client.head("/large", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in head.headers
+
+    # 可協商的回應不論是否壓縮都帶 Vary，共用快取才不會混用不同編碼的內容
+    for response in (small, identity, head):
+        assert response.headers["vary"].lower() == "accept-encoding"
+
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+    assert "vary" not in image.headers
+
+
+def test_streaming_response_is_compressed_incrementally():
+    client = _app()
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == b'{"line": 0}\n{"line": 1}\n{"line": 2}\n'
+
+
+@pytest.mark.asyncio
+async def test_wine_list_is_compressed(async_client, db_session):
+    db_session.add_all([WineItem(cellar_id=1, name=f"Wine {i}", wine_type="紅酒") for i in range(20)])
+    db_session.commit()
+
+    response = await async_client.get("/api/v1/wine-items", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
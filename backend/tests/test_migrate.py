@@ -0,0 +1,66 @@
+"""
+src.migrate 測試
+
+確認遷移後會寫入 schema 指紋、再次執行為 no-op，且舊版 create_all 資料庫能被納入 alembic 管理。
+"""
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+from src.database import Base
+from src.migrate import BASELINE_TABLES, migrate, schema_fingerprint, schema_is_current, stored_fingerprint
+
+
+def _engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'migrate.sqlite3'}", poolclass=NullPool)
+
+
+def test_fingerprint_is_stable_sha256():
+    assert schema_fingerprint() == schema_fingerprint()
+    assert len(schema_fingerprint()) == 64
+
+
+def test_migrate_fresh_database_then_fast_path(tmp_path):
+    engine = _engine(tmp_path)
+    assert not schema_is_current(engine)
+
+    assert migrate(engine) is True
+    assert stored_fingerprint(engine) == schema_fingerprint()
+    assert schema_is_current(engine)
+
+    # 第二次執行只比對指紋，不再遷移
+    assert migrate(engine) is False
+    engine.dispose()
+
+
+def test_stale_fingerprint_triggers_migration(tmp_path):
+    engine = _engine(tmp_path)
+    migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE schema_state SET fingerprint = 'stale' WHERE id = 1"))
+
+    assert not schema_is_current(engine)
+    assert migrate(engine) is True
+    assert schema_is_current(engine)
+    engine.dispose()
+
+
+def test_legacy_create_all_database_is_adopted(tmp_path):
+    engine = _engine(tmp_path)
+    Base.metadata.create_all(bind=engine, tables=[Base.metadata.tables[name] for name in BASELINE_TABLES])
+    with engine.begin() as conn:
+        # 舊版資料庫沒有 rating 欄位，也沒有之後才加入的排序索引
+        conn.execute(text("DROP INDEX ix_wine_items_cellar_rating_id"))
+        conn.execute(text("ALTER TABLE wine_items DROP COLUMN rating"))
+        conn.execute(text("INSERT INTO users (id, line_user_id, display_name, storage_mode, created_at, updated_at) "
+                          "VALUES (1, 'U_legacy', 'Legacy', 'simple', '2024-01-01', '2024-01-01')"))
+
+    assert migrate(engine) is True
+
+    inspector = inspect(engine)
+    assert "rating" in {col["name"] for col in inspector.get_columns("wine_items")}
+    assert "schema_state" in inspector.get_table_names()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM users")).scalar() == 1
+    assert schema_is_current(engine)
+    engine.dispose()
@@ -0,0 +1,56 @@
+"""
+Alembic migration 測試
+
+確認 migration chain 可完整升級/還原，且升級後的 schema 與 models 一致。
+"""
+
+from argparse import Namespace
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from src.database import Base
+from src.migrate import include_object
+from src.models import recipe, user_recipe  # noqa: F401
+
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+
+
+def _config(url: str) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.cmd_opts = Namespace(x=[f"url={url}"])
+    return config
+
+
+def test_upgrade_head_matches_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrations.sqlite3'}"
+    command.upgrade(_config(url), "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        diff = compare_metadata(
+            MigrationContext.configure(conn, opts={"include_object": include_object}), Base.metadata
+        )
+        index_names = {ix["name"] for ix in inspect(conn).get_indexes("wine_items")}
+        table_names = set(inspect(conn).get_table_names())
+    engine.dispose()
+
+    assert diff == []
+    assert {"ix_wine_items_cellar_status", "ix_wine_items_split_from_id"} <= index_names
+    assert "wine_items_search_fts" in table_names
+
+
+def test_downgrade_to_base(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrations.sqlite3'}"
+    config = _config(url)
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+
+    engine = create_engine(url)
+    tables = set(inspect(engine).get_table_names())
+    engine.dispose()
+    assert tables == {"alembic_version"}
@@ -0,0 +1,77 @@
+"""
+連線池監控測試
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.config import settings
+from src.utils.pool_metrics import InstrumentedQueuePool, get_pool_metrics, instrument_engine
+
+
+@pytest.fixture
+def small_pool_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite3'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    metrics = instrument_engine(engine, "test_small_pool")
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_counts_checkouts_overflow_and_timeouts(small_pool_engine):
+    engine, metrics = small_pool_engine
+
+    first = engine.connect()
+    second = engine.connect()  # 溢出連線
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["gauges"]["checked_out"] == 2
+    assert snapshot["gauges"]["overflow_in_use"] == 1
+    assert snapshot["counters"]["timeouts"] == 1
+    assert snapshot["wait_ms"]["count"] == 3
+    assert snapshot["wait_ms"]["max"] >= 50
+    assert snapshot["wait_ms"]["buckets"]["+Inf"] == 3
+
+    first.close()
+    second.close()
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["checkouts"] == 2
+    assert snapshot["counters"]["checkins"] == 2
+    assert snapshot["gauges"]["peak_overflow"] == 1
+
+
+def test_metrics_survive_engine_dispose(small_pool_engine):
+    engine, metrics = small_pool_engine
+    engine.dispose()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert engine.pool.metrics is metrics
+    assert metrics.snapshot()["wait_ms"]["count"] == 1
+
+
+def test_db_pool_endpoint_requires_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-secret")
+
+    assert client.get("/internal/metrics/db-pool").status_code == 401
+
+    response = client.get("/internal/metrics/db-pool", headers={"X-Metrics-Token": "metrics-secret"})
+    assert response.status_code == 200
+    assert "primary" in response.json()["pools"]
+    assert get_pool_metrics("primary") is not None
+
+
+def test_db_pool_endpoint_hidden_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    monkeypatch.setattr(settings, "DEBUG", False)
+
+    assert client.get("/internal/metrics/db-pool").status_code == 404
@@ -0,0 +1,91 @@
+"""
+每個請求的 SQL 查詢統計與 N+1 防護測試
+"""
+
+from datetime import datetime, time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.models.notification_settings import NotificationSettings
+from src.models.user import User
+from src.models.wine_cellar import WineCellar
+from src.models.wine_item import WineItem
+from src.services import scheduler
+from src.utils.query_stats import statement_shape, track_queries
+
+
+def test_statement_shape_strips_parameters():
+    assert statement_shape(
+        "SELECT * FROM wine_items WHERE id = ? AND name = 'Barolo'  AND vintage > 2010"
+    ) == "SELECT * FROM wine_items WHERE id = ? AND name = ? AND vintage > ?"
+    assert statement_shape("SELECT * FROM users WHERE id IN (%(id_1)s, %(id_2)s, %(id_3)s)") == (
+        "SELECT * FROM users WHERE id IN (?...)"
+    )
+
+
+def test_track_queries_counts_repeated_shapes(db_session):
+    with track_queries("test") as stats:
+        for item_id in range(6):
+            db_session.get(WineItem, item_id + 100)
+        db_session.get(User, 1)
+
+    assert stats.count == 7
+    [(shape, n)] = stats.repeated(5)
+    assert n == 6 and "FROM wine_items" in shape
+
+
+@pytest.mark.asyncio
+async def test_debug_mode_reports_query_headers(async_client, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", True)
+
+    response = await async_client.get("/api/v1/wine-cellars/1/stats")
+
+    assert response.status_code == 200
+    assert int(response.headers["x-db-query-count"]) >= 1
+    assert "x-db-time-ms" in response.headers
+    assert response.headers["x-db-repeated-queries"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_query_headers_hidden_outside_debug(async_client, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", False)
+
+    response = await async_client.get("/api/v1/wine-cellars/1/stats")
+
+    assert "x-db-query-count" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_cellar_stats_query_count_does_not_grow_with_items(async_client, db_session, assert_max_queries):
+    db_session.add_all(WineItem(cellar_id=1, name=f"Wine {i}", wine_type="紅酒") for i in range(20))
+    db_session.commit()
+
+    with assert_max_queries(3) as stats:
+        response = await async_client.get("/api/v1/wine-cellars/1/stats")
+
+    assert response.status_code == 200
+    assert stats.repeated(2) == []
+
+
+def test_scheduler_space_check_is_not_n_plus_one(db_session, monkeypatch, assert_max_queries):
+    hour = datetime.now(scheduler.TAIWAN_TZ).hour
+    for user_id in range(2, 12):
+        db_session.add(User(id=user_id, line_user_id=f"U{user_id}", display_name=f"User {user_id}"))
+        db_session.add(NotificationSettings(user_id=user_id, notification_time=time(hour, 0)))
+        for n in range(2):
+            cellar = WineCellar(owner_id=user_id, name=f"Cellar {user_id}-{n}", capacity=1)
+            db_session.add(cellar)
+            db_session.flush()
+            db_session.add(WineItem(cellar_id=cellar.id, name="Full", wine_type="紅酒", quantity=1))
+    db_session.commit()
+
+    sent = []
+    monkeypatch.setattr(scheduler, "open_read_session", sessionmaker(bind=db_session.get_bind()))
+    monkeypatch.setattr(scheduler, "send_space_warning", lambda line_user_id, usage: sent.append(line_user_id))
+
+    with assert_max_queries(2):
+        scheduler.check_space_usage()
+
+    assert len(sent) == 20
@@ -0,0 +1,101 @@
+"""
+唯讀副本路由測試
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import database
+from src.database import Base, current_user_id, has_recent_write, open_async_read_session, open_read_session
+from src.models.user import User
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """以暫存 SQLite 模擬可用的唯讀副本"""
+    path = tmp_path / "replica.sqlite3"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=sync_engine))
+    monkeypatch.setattr(database, "AsyncReplicaSessionLocal", async_sessionmaker(bind=async_engine))
+    monkeypatch.setattr(database, "_replica_down_until", 0.0)
+    monkeypatch.setattr(database, "_recent_writes", {})
+    yield sync_engine, async_engine
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def broken_replica(tmp_path, monkeypatch):
+    """無法連線的副本（目錄不存在）"""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.sqlite3'}"
+    monkeypatch.setattr(database, "AsyncReplicaSessionLocal", async_sessionmaker(bind=create_async_engine(url)))
+    monkeypatch.setattr(
+        database, "ReplicaSessionLocal",
+        sessionmaker(bind=create_engine(url.replace("+aiosqlite", ""))),
+    )
+    monkeypatch.setattr(database, "_replica_down_until", 0.0)
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_when_user_has_not_written(replica):
+    _, async_engine = replica
+
+    db = await open_async_read_session(user_id=7)
+    try:
+        assert db.bind is async_engine
+    finally:
+        await db.close()
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_stick_to_primary_after_user_commits_a_write(replica):
+    sync_engine, async_engine = replica
+    token = current_user_id.set(7)
+    try:
+        with sessionmaker(bind=sync_engine)() as db:
+            db.add(User(line_user_id="U_writer", display_name="Writer"))
+            db.commit()
+    finally:
+        current_user_id.reset(token)
+
+    assert has_recent_write(7)
+    assert not has_recent_write(8)
+    db = await open_async_read_session(user_id=7)
+    try:
+        assert db.bind is database.async_engine
+    finally:
+        await db.close()
+    await async_engine.dispose()
+
+
+def test_commit_without_writes_does_not_pin_user_to_primary(replica):
+    sync_engine, _ = replica
+    token = current_user_id.set(9)
+    try:
+        with sessionmaker(bind=sync_engine)() as db:
+            db.query(User).all()
+            db.commit()
+    finally:
+        current_user_id.reset(token)
+
+    assert not has_recent_write(9)
+
+
+@pytest.mark.asyncio
+async def test_unavailable_replica_falls_back_to_primary(broken_replica):
+    db = await open_async_read_session(user_id=7)
+    try:
+        assert db.bind is database.async_engine
+    finally:
+        await db.close()
+    assert not database._replica_available()
+
+    sync_db = open_read_session()
+    try:
+        assert sync_db.get_bind() is database.engine
+    finally:
+        sync_db.close()
@@ -0,0 +1,656 @@
+"""
+酒款與酒窖 API 測試（AsyncSession 路由）
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models.wine_item import WineItem
+from src.routes.wine_items import _build_wine_item_response
+from src.services import wine_import
+from src.services.change_feed import SYNC_OVERLAP, SYNC_TOKEN_KIND, decode_sync_token, encode_sync_token
+from src.schemas.wine_item import WineItemResponse, WineItemSummary
+from src.utils.pagination import encode_cursor
+
+
+@pytest.mark.asyncio
+async def test_create_wine_item_splits_quantity_into_bottles(async_client, async_db_session):
+    response = await async_client.post("/api/v1/wine-items", json={
+        "cellar_id": 1,
+        "name": "Château Margaux",
+        "wine_type": "紅酒",
+        "quantity": 3,
+        "purchase_date": "2024-01-15",
+    })
+
+    assert response.status_code == 201
+    count = (await async_db_session.execute(
+        select(func.count()).select_from(WineItem).where(WineItem.name == "Château Margaux")
+    )).scalar()
+    assert count == 3
+
+    listed = await async_client.get("/api/v1/wine-items")
+    assert listed.status_code == 200
+    assert len(listed.json()) == 3
+
+
+@pytest.mark.asyncio
+async def test_create_wine_item_bulk_inserts_split_bottles(async_client, async_db_session, assert_max_queries):
+    # 擁有權檢查 + 主記錄 INSERT ... RETURNING + 拆分記錄 executemany + 讀回主記錄，與瓶數無關
+    with assert_max_queries(5):
+        response = await async_client.post("/api/v1/wine-items", json={
+            "cellar_id": 1, "name": "Case Purchase", "wine_type": "紅酒", "quantity": 120,
+        })
+
+    assert response.status_code == 201
+    primary_id = response.json()["id"]
+    assert response.json()["quantity"] == 1
+    rows = (await async_db_session.execute(
+        select(WineItem.split_from_id, func.count()).group_by(WineItem.split_from_id)
+    )).all()
+    assert sorted(rows, key=lambda row: row[0] is not None) == [(None, 1), (primary_id, 119)]
+
+
+@pytest.mark.asyncio
+async def test_update_wine_item_accepts_date_strings(async_client):
+    created = await async_client.post("/api/v1/wine-items", json={"cellar_id": 1, "name": "Riesling", "wine_type": "白酒"})
+    item_id = created.json()["id"]
+
+    response = await async_client.put(
+        f"/api/v1/wine-items/{item_id}", json={"optimal_drinking_end": "2030-12-31"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["optimal_drinking_end"] == "2030-12-31"
+
+
+@pytest.mark.asyncio
+async def test_other_users_wine_item_is_not_found(async_client, db_session):
+    other = WineItem(cellar_id=999, name="Not Mine", wine_type="紅酒")
+    db_session.add(other)
+    db_session.commit()
+
+    response = await async_client.get(f"/api/v1/wine-items/{other.id}")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_cellar_stats_and_delete_cascade_to_items(async_client, async_db_session):
+    await async_client.post("/api/v1/wine-items", json={"cellar_id": 1, "name": "Barolo", "wine_type": "紅酒", "quantity": 2})
+
+    stats = await async_client.get("/api/v1/wine-cellars/1/stats")
+    assert stats.status_code == 200
+    assert stats.json()["total_bottles"] == 2
+
+    deleted = await async_client.delete("/api/v1/wine-cellars/1")
+    assert deleted.status_code == 204
+    remaining = (await async_db_session.execute(select(func.count()).select_from(WineItem))).scalar()
+    assert remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_list_wine_items_keyset_pagination(async_client, db_session):
+    db_session.add_all(WineItem(cellar_id=1, name=f"Wine {i}", wine_type="紅酒") for i in range(5))
+    db_session.commit()
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await async_client.get("/api/v1/wine-items", params=params)).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert cursor is None
+    assert seen == sorted(seen, reverse=True) and len(set(seen)) == 5
+
+    legacy = await async_client.get("/api/v1/wine-items")
+    assert isinstance(legacy.json(), list) and len(legacy.json()) == 5
+
+
+@pytest.mark.asyncio
+async def test_list_wine_items_rejects_invalid_cursor(async_client):
+    response = await async_client.get("/api/v1/wine-items", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+    # 格式正確但鍵值型別與排序欄位不符（竄改過的 cursor）
+    for sort, key in (
+        ("id_desc", ["5"]),
+        ("id_desc", [None]),
+        ("vintage_desc", [2015, "5"]),
+        ("vintage_desc", ["2015", 5]),
+        ("created_at_asc", [{"d": "2024-01-01"}, 5]),
+        ("optimal_drinking_end_asc", [True, 5]),
+    ):
+        response = await async_client.get(
+            "/api/v1/wine-items", params={"sort": sort, "cursor": encode_cursor(sort, key)}
+        )
+        assert response.status_code == 400, (sort, key)
+
+    # 可為空的排序欄位，NULL 為合法鍵值
+    response = await async_client.get(
+        "/api/v1/wine-items", params={"sort": "vintage_desc", "cursor": encode_cursor("vintage_desc", [None, 5])}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_summary_view_prunes_columns(async_client, db_session, assert_max_queries):
+    db_session.add(WineItem(cellar_id=1, name="Sancerre", wine_type="白酒", notes="x" * 5000, purchase_price=800, quantity=2))
+    db_session.commit()
+
+    # ETag 版本查詢 + 酒款查詢
+    with assert_max_queries(2) as stats:
+        response = await async_client.get("/api/v1/wine-items", params={"view": "summary"})
+
+    [item] = response.json()
+    assert set(item) == set(WineItemSummary.model_fields)
+    assert item["total_value"] == 1600
+    assert "notes" not in " ".join(stats.shapes)
+
+
+@pytest.mark.asyncio
+async def test_fields_parameter_returns_requested_fields_only(async_client, db_session):
+    item = WineItem(cellar_id=1, name="Chablis", wine_type="白酒", vintage=2020)
+    db_session.add(item)
+    db_session.commit()
+
+    listed = await async_client.get("/api/v1/wine-items", params={"fields": "name,vintage", "limit": 10})
+    single = await async_client.get(f"/api/v1/wine-items/{item.id}", params={"fields": "name,is_optimal_now"})
+    unknown = await async_client.get(f"/api/v1/wine-items/{item.id}", params={"fields": "name,secret"})
+
+    assert listed.json()["items"] == [{"id": item.id, "name": "Chablis", "vintage": 2020}]
+    assert single.json() == {"id": item.id, "name": "Chablis", "is_optimal_now": False}
+    assert unknown.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_returns_304_until_items_change(async_client, assert_max_queries):
+    await async_client.post("/api/v1/wine-items", json={"cellar_id": 1, "name": "Rioja", "wine_type": "紅酒"})
+
+    for path in ("/api/v1/wine-items", "/api/v1/wine-cellars/1/stats"):
+        first = await async_client.get(path)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"') and "last-modified" in first.headers
+
+        with assert_max_queries(1):
+            cached = await async_client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b""
+
+    await async_client.post("/api/v1/wine-items", json={"cellar_id": 1, "name": "Priorat", "wine_type": "紅酒"})
+
+    changed = await async_client.get("/api/v1/wine-items", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_etag_varies_with_query_parameters(async_client):
+    full = await async_client.get("/api/v1/wine-items")
+    summary = await async_client.get("/api/v1/wine-items", params={"view": "summary"},
+                                     headers={"If-None-Match": full.headers["etag"]})
+
+    assert summary.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_fast_list_serialization_matches_response_model(async_client, db_session):
+    item = WineItem(
+        cellar_id=1, name="Pommard", wine_type="紅酒", vintage=2018, rating=4.0, purchase_price=1200.5,
+        quantity=2, purchase_date=date(2024, 5, 1), optimal_drinking_end=date(2099, 1, 1),
+    )
+    db_session.add(item)
+    db_session.commit()
+
+    [listed] = (await async_client.get("/api/v1/wine-items")).json()
+    expected = _build_wine_item_response(db_session.get(WineItem, item.id)).model_dump(mode="json")
+
+    assert listed == expected
+
+
+@pytest.mark.asyncio
+async def test_wine_item_groups_collapse_lots(async_client, assert_max_queries):
+    case_of_six = (await async_client.post("/api/v1/wine-items", json={
+        "cellar_id": 1, "name": "Chianti", "wine_type": "紅酒", "quantity": 6, "purchase_price": 500,
+    })).json()
+    single = (await async_client.post("/api/v1/wine-items", json={"cellar_id": 1, "name": "Soave", "wine_type": "白酒"})).json()
+    await async_client.post(f"/api/v1/wine-items/{case_of_six['id']}/open")
+
+    # ETag 版本查詢 + GROUP BY
+    with assert_max_queries(2):
+        response = await async_client.get("/api/v1/wine-items/groups")
+
+    assert response.status_code == 200
+    groups = {g["lot_id"]: g for g in response.json()}
+    assert set(groups) == {case_of_six["id"], single["id"]}
+    lot = groups[case_of_six["id"]]
+    assert (lot["count"], lot["opened_count"], lot["unopened_count"]) == (6, 1, 5)
+    assert lot["total_value"] == 3000
+    assert len(lot["member_ids"]) == 6 and lot["member_ids"][0] == case_of_six["id"]
+
+    # 已喝完的酒款預設不計入 lot（與 GET /wine-items 預設 status=active 一致）
+    consumed_id = lot["member_ids"][-1]
+    await async_client.post(f"/api/v1/wine-items/{consumed_id}/change-status", params={"new_status": "consumed"})
+    groups = {g["lot_id"]: g for g in (await async_client.get("/api/v1/wine-items/groups")).json()}
+    lot = groups[case_of_six["id"]]
+    assert (lot["count"], lot["opened_count"], lot["unopened_count"]) == (5, 1, 4)
+    assert lot["total_value"] == 2500
+    assert consumed_id not in lot["member_ids"]
+
+    everything = (await async_client.get("/api/v1/wine-items/groups", params={"status": "all"})).json()
+    assert {g["lot_id"]: g["count"] for g in everything}[case_of_six["id"]] == 6
+
+
+@pytest.mark.asyncio
+async def test_search_wine_items_ranks_and_paginates(async_client, db_session):
+    db_session.add_all([
+        WineItem(cellar_id=1, name="Château Margaux", brand="Margaux", wine_type="紅酒", region="Bordeaux"),
+        WineItem(cellar_id=1, name="Pavillon Rouge", brand="Château Margaux", wine_type="紅酒"),
+        WineItem(cellar_id=1, name="Chablis", wine_type="白酒", notes="適合搭配 margaux 之後的生蠔"),
+        WineItem(cellar_id=1, name="Barolo", wine_type="紅酒", region="Piemonte"),
+        WineItem(cellar_id=999, name="Margaux of someone else", wine_type="紅酒"),
+    ])
+    db_session.commit()
+
+    first = await async_client.get("/api/v1/wine-items/search", params={"q": "margaux", "limit": 2})
+    assert first.status_code == 200
+    page = first.json()
+    # 酒名 / 品牌命中的排在只有備註命中之前；其他使用者的酒款不會出現
+    assert [item["name"] for item in page["items"]] == ["Château Margaux", "Pavillon Rouge"]
+    assert set(page["items"][0]) == set(WineItemSummary.model_fields)
+
+    second = await async_client.get(
+        "/api/v1/wine-items/search", params={"q": "margaux", "limit": 2, "cursor": page["next_cursor"]}
+    )
+    assert [item["name"] for item in second.json()["items"]] == ["Chablis"]
+    assert second.json()["next_cursor"] is None
+
+    # 前綴比對、去除重音符號、多個關鍵字皆須符合
+    prefix = await async_client.get("/api/v1/wine-items/search", params={"q": "chateau marg"})
+    assert [item["name"] for item in prefix.json()["items"]] == ["Château Margaux", "Pavillon Rouge"]
+
+
+@pytest.mark.asyncio
+async def test_search_wine_items_tracks_updates_and_rejects_bad_cursor(async_client, db_session):
+    item = WineItem(cellar_id=1, name="Barolo", wine_type="紅酒")
+    db_session.add(item)
+    db_session.commit()
+
+    item.review = "玫瑰與焦油 nebbiolo"
+    db_session.commit()
+    found = await async_client.get("/api/v1/wine-items/search", params={"q": "nebbiolo"})
+    assert [row["id"] for row in found.json()["items"]] == [item.id]
+
+    db_session.delete(item)
+    db_session.commit()
+    gone = await async_client.get("/api/v1/wine-items/search", params={"q": "nebbiolo"})
+    assert gone.json() == {"items": [], "next_cursor": None}
+
+    bad = await async_client.get("/api/v1/wine-items/search", params={"q": "barolo", "cursor": "nope"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_facet_counts_exclude_own_filter(async_client, db_session, assert_max_queries):
+    db_session.add_all([
+        WineItem(cellar_id=1, name="Margaux", wine_type="紅酒", country="法國", vintage=2015, rating=9, quantity=2),
+        WineItem(cellar_id=1, name="Barolo", wine_type="紅酒", country="義大利", vintage=2010, rating=7),
+        WineItem(cellar_id=1, name="Chablis", wine_type="白酒", country="法國", vintage=2019, bottle_status="opened"),
+        WineItem(cellar_id=1, name="Sold", wine_type="紅酒", country="法國", status="sold"),
+        WineItem(cellar_id=999, name="Not Mine", wine_type="紅酒", country="法國"),
+    ])
+    db_session.commit()
+
+    with assert_max_queries(2):
+        response = await async_client.get("/api/v1/wine-items/facets", params={"country": "法國"})
+
+    assert response.status_code == 200
+    body = response.json()
+    facets = body["facets"]
+    assert body["total"] == 3
+    # country 不套用自身條件：仍列出義大利；其他 facet 只計算法國
+    assert facets["country"] == [{"value": "法國", "count": 3}, {"value": "義大利", "count": 1}]
+    assert facets["wine_type"] == [{"value": "紅酒", "count": 2}, {"value": "白酒", "count": 1}]
+    assert facets["vintage_decade"] == [{"value": 2010, "count": 3}]
+    assert facets["rating_bucket"] == [{"value": "9-10", "count": 2}, {"value": None, "count": 1}]
+    assert facets["bottle_status"] == [{"value": "unopened", "count": 2}, {"value": "opened", "count": 1}]
+
+    filtered = (await async_client.get(
+        "/api/v1/wine-items/facets", params={"country": "法國", "wine_type": "紅酒"}
+    )).json()
+    assert filtered["total"] == 2
+    assert filtered["facets"]["country"] == [{"value": "法國", "count": 2}, {"value": "義大利", "count": 1}]
+
+
+@pytest.mark.asyncio
+async def test_list_wine_items_sorts_and_filters_server_side(async_client, db_session):
+    today = date.today()
+    db_session.add_all([
+        WineItem(cellar_id=1, name="A", wine_type="紅酒", vintage=2015, purchase_price=1200, abv=13.5),
+        WineItem(cellar_id=1, name="B", wine_type="紅酒", vintage=2010, purchase_price=3000, abv=14.0,
+                 optimal_drinking_start=date(2020, 1, 1), optimal_drinking_end=date(today.year + 5, 1, 1)),
+        WineItem(cellar_id=1, name="C", wine_type="紅酒", vintage=None, purchase_price=800, abv=12.0),
+        WineItem(cellar_id=1, name="D", wine_type="紅酒", vintage=2018, purchase_price=2500, abv=13.0),
+        WineItem(cellar_id=1, name="Sold", wine_type="紅酒", vintage=2012, status="sold"),
+    ])
+    db_session.commit()
+
+    async def names(**params):
+        response = await async_client.get("/api/v1/wine-items", params={"view": "summary", **params})
+        assert response.status_code == 200
+        return [item["name"] for item in response.json()]
+
+    # status 篩選生效；空值在遞增時排最後、遞減時排最前
+    assert await names(sort="vintage_asc") == ["B", "A", "D", "C"]
+    assert await names(sort="vintage_desc") == ["C", "D", "A", "B"]
+    assert await names(sort="vintage_asc", status="all") == ["B", "Sold", "A", "D", "C"]
+    assert await names(sort="purchase_price_desc", min_price=1000, max_price=2500) == ["D", "A"]
+    assert await names(sort="vintage_asc", min_vintage=2011, min_abv=13.2) == ["A"]
+    assert await names(is_optimal_now="true") == ["B"]
+    assert len(await names(is_optimal_now="false")) == 3
+
+    # keyset 分頁跨越空值，逐頁結果與一次查詢相同
+    pages, cursor, first_cursor = [], None, None
+    while True:
+        params = {"sort": "vintage_desc", "limit": 1, "view": "summary"}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await async_client.get("/api/v1/wine-items", params=params)).json()
+        pages += [item["name"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        first_cursor = first_cursor or cursor
+        if not cursor:
+            break
+    assert pages == ["C", "D", "A", "B"]
+
+    # cursor 只能搭配產生它的排序方式
+    mismatched = await async_client.get(
+        "/api/v1/wine-items", params={"sort": "rating_desc", "cursor": first_cursor}
+    )
+    assert mismatched.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_change_feed_returns_only_changes_and_deletions(async_client, db_session):
+    keep = WineItem(cellar_id=1, name="Keep", wine_type="紅酒")
+    edit = WineItem(cellar_id=1, name="Edit", wine_type="紅酒")
+    drop = WineItem(cellar_id=1, name="Drop", wine_type="紅酒")
+    db_session.add_all([keep, edit, drop])
+    db_session.commit()
+    all_ids = sorted([keep.id, edit.id, drop.id])
+
+    full = (await async_client.get("/api/v1/wine-items/changes", params={"view": "summary"})).json()
+    assert full["full_sync"] is True
+    assert [item["name"] for item in full["items"]] == ["Keep", "Edit", "Drop"]
+
+    # 模擬酒款在兩小時前寫入、上次同步在一小時前：只有之後的修改與刪除會出現
+    for item in (keep, edit, drop):
+        item.updated_at = datetime.utcnow() - timedelta(hours=2)
+    db_session.commit()
+    since = encode_sync_token(datetime.utcnow() - timedelta(hours=1))
+
+    await async_client.put(f"/api/v1/wine-items/{edit.id}", json={"notes": "開瓶前醒酒一小時"})
+    assert (await async_client.delete(f"/api/v1/wine-items/{drop.id}")).status_code == 204
+
+    delta = (await async_client.get("/api/v1/wine-items/changes", params={"since": since})).json()
+    assert delta["full_sync"] is False
+    assert [item["id"] for item in delta["items"]] == [edit.id]
+    assert delta["items"][0]["notes"] == "開瓶前醒酒一小時"
+    assert delta["deleted_ids"] == [drop.id]
+
+    # 刪除酒窖時所有酒款都寫入 tombstone
+    assert (await async_client.delete("/api/v1/wine-cellars/1")).status_code == 204
+    after = (await async_client.get("/api/v1/wine-items/changes", params={"since": since})).json()
+    assert after["deleted_ids"] == all_ids
+    assert after["items"] == []
+
+    bad = await async_client.get("/api/v1/wine-items/changes", params={"since": "garbage"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_change_feed_catches_rows_committed_after_their_timestamp(async_client, db_session):
+    stamped = datetime.utcnow() - timedelta(minutes=1)
+    db_session.add(WineItem(cellar_id=1, name="Seen", wine_type="紅酒", updated_at=stamped))
+    db_session.commit()
+
+    first = (await async_client.get("/api/v1/wine-items/changes")).json()
+    watermark, _ = decode_sync_token(first["sync_token"])
+    assert watermark == stamped  # 高水位取自資料，而非伺服器時鐘
+
+    # 長交易：updated_at 在 token 發出前寫入，交易在之後才提交
+    late = WineItem(cellar_id=1, name="Late Commit", wine_type="白酒",
+                    updated_at=stamped - SYNC_OVERLAP + timedelta(seconds=30))
+    db_session.add(late)
+    db_session.commit()
+
+    delta = (await async_client.get("/api/v1/wine-items/changes", params={"since": first["sync_token"]})).json()
+    assert delta["full_sync"] is False
+    assert "Late Commit" in [item["name"] for item in delta["items"]]
+    assert decode_sync_token(delta["sync_token"])[0] == stamped
+
+    # 舊格式（單一時間）的 token 仍可使用
+    legacy = (await async_client.get(
+        "/api/v1/wine-items/changes", params={"since": encode_cursor(SYNC_TOKEN_KIND, [stamped])}
+    )).json()
+    assert legacy["full_sync"] is False
+
+
+@pytest.mark.asyncio
+async def test_export_cellar_streams_ndjson_and_csv(async_client, db_session):
+    db_session.add_all([
+        WineItem(cellar_id=1, name=f"Wine {i}", wine_type="紅酒", vintage=2000 + i, notes="櫻桃, 皮革")
+        for i in range(3)
+    ])
+    db_session.add(WineItem(cellar_id=999, name="Not Mine", wine_type="紅酒"))
+    db_session.commit()
+
+    ndjson = await async_client.get("/api/v1/wine-cellars/1/export")
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert ndjson.headers["content-disposition"] == 'attachment; filename="cellar-1.ndjson"'
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [line["vintage"] for line in lines] == [2000, 2001, 2002]
+    assert set(lines[0]) == set(WineItemResponse.model_fields)
+
+    exported = await async_client.get("/api/v1/wine-cellars/1/export", params={"format": "csv"})
+    assert exported.content.startswith("\ufeff".encode())
+    rows = list(csv.DictReader(io.StringIO(exported.content.decode("utf-8-sig"))))
+    assert [row["name"] for row in rows] == ["Wine 0", "Wine 1", "Wine 2"]
+    assert rows[0]["notes"] == "櫻桃, 皮革"
+    assert rows[0]["brand"] == ""
+
+    assert (await async_client.get("/api/v1/wine-cellars/999/export")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_import_wine_items_reports_row_errors(async_client, async_db_session):
+    content = (
+        "\ufeffname,wine_type,vintage,quantity,purchase_date,brand\n"
+        "Barolo,紅酒,2016,2,2024-03-01,\n"
+        "Missing Type,,2018,1,,\n"
+        "Chablis,白酒,abc,1,,\n"
+        "Sancerre,白酒,2021,1,,Vacheron\n"
+    ).encode()
+    response = await async_client.post(
+        "/api/v1/wine-items/import",
+        data={"cellar_id": "1"},
+        files={"file": ("bottles.csv", content, "text/csv")},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["bottles"], result["failed"]) == (2, 3, 2)
+    assert [error["row"] for error in result["errors"]] == [3, 4]
+    assert result["errors"][0]["errors"][0].startswith("wine_type")
+
+    items = (await async_db_session.execute(select(WineItem).order_by(WineItem.id))).scalars().all()
+    barolo, sancerre, barolo_clone = items
+    assert [item.name for item in items] == ["Barolo", "Sancerre", "Barolo"]
+    assert all(item.quantity == 1 and item.cellar_id == 1 for item in items)
+    assert barolo_clone.split_from_id == barolo.id
+    assert barolo.purchase_date == date(2024, 3, 1)
+    assert barolo.acidity == 3 and barolo.brand is None
+    assert sancerre.brand == "Vacheron"
+
+    # 匯出的 CSV 可直接匯入
+    exported = await async_client.get("/api/v1/wine-cellars/1/export", params={"format": "csv"})
+    again = await async_client.post(
+        "/api/v1/wine-items/import",
+        data={"cellar_id": "1"},
+        files={"file": ("cellar-1.csv", exported.content, "text/csv")},
+    )
+    assert again.json()["imported"] == 3 and again.json()["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_import_wine_items_rejects_too_many_bottles(async_client, async_db_session, monkeypatch):
+    monkeypatch.setattr(wine_import, "IMPORT_MAX_BOTTLES", 5)
+    content = b"name,wine_type,quantity\nBarolo,\xe7\xb4\x85\xe9\x85\x92,3\nRioja,\xe7\xb4\x85\xe9\x85\x92,3\n"
+
+    response = await async_client.post(
+        "/api/v1/wine-items/import",
+        data={"cellar_id": "1"},
+        files={"file": ("bottles.csv", content, "text/csv")},
+    )
+
+    assert response.status_code == 413
+    count = (await async_db_session.execute(select(func.count()).select_from(WineItem))).scalar()
+    assert count == 0
+
+
+@pytest.mark.asyncio
+async def test_import_wine_items_json_formats(async_client, async_db_session):
+    ndjson = b'{"name": "Rioja", "wine_type": "\xe7\xb4\x85\xe9\x85\x92"}\n\nnot json\n[1]\n'
+    response = await async_client.post(
+        "/api/v1/wine-items/import",
+        data={"cellar_id": "1", "format": "ndjson"},
+        files={"file": ("export.txt", ndjson, "text/plain")},
+    )
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+    assert [error["row"] for error in response.json()["errors"]] == [3, 4]
+
+    # 檔案無法解析時整批不寫入
+    broken = await async_client.post(
+        "/api/v1/wine-items/import",
+        data={"cellar_id": "1"},
+        files={"file": ("bottles.json", b'[{"name": "Cava", "wine_type": "', "application/json")},
+    )
+    assert broken.status_code == 400
+
+    wrapped = await async_client.post(
+        "/api/v1/wine-items/import",
+        data={"cellar_id": "1"},
+        files={"file": ("bottles.json", json.dumps({"items": [{"name": "Cava", "wine_type": "氣泡酒", "quantity": 0}]}).encode(), "application/json")},
+    )
+    assert wrapped.json()["failed"] == 1
+
+    unknown = await async_client.post(
+        "/api/v1/wine-items/import", data={"cellar_id": "1"}, files={"file": ("bottles.xlsx", b"", "application/octet-stream")},
+    )
+    assert unknown.status_code == 400
+    forbidden = await async_client.post(
+        "/api/v1/wine-items/import", data={"cellar_id": "999"}, files={"file": ("bottles.csv", b"name\n", "text/csv")},
+    )
+    assert forbidden.status_code == 404
+
+    names = (await async_db_session.execute(select(WineItem.name))).scalars().all()
+    assert names == ["Rioja"]
+
+
+@pytest.mark.asyncio
+async def test_batch_operations_apply_set_based_updates(async_client, db_session, assert_max_queries):
+    items = [WineItem(cellar_id=1, name=f"Tasting {i}", wine_type=wine_type) for i, wine_type in
+             enumerate(["紅酒", "紅酒", "白酒", "威士忌"])]
+    other = WineItem(cellar_id=999, name="Not Mine", wine_type="紅酒")
+    db_session.add_all([*items, other])
+    db_session.commit()
+    ids = [item.id for item in items]
+    before = {item.id: item.updated_at for item in items}
+
+    with assert_max_queries(4):
+        opened = await async_client.post("/api/v1/wine-items/batch", json={"operation": "open", "item_ids": ids})
+    assert opened.status_code == 200
+    assert opened.json() == {"operation": "open", "item_ids": ids}
+
+    db_session.expire_all()
+    reloaded = {item.id: item for item in db_session.query(WineItem).filter(WineItem.id.in_(ids))}
+    assert all(item.bottle_status == "opened" and item.opened_at for item in reloaded.values())
+    assert all(item.updated_at > before[item.id] for item in reloaded.values())
+    today = date.today()
+    assert [reloaded[i].optimal_drinking_end - today for i in ids] == [
+        timedelta(days=5), timedelta(days=5), timedelta(days=4), timedelta(days=730)
+    ]
+
+    finished = await async_client.post("/api/v1/wine-items/batch", json={
+        "operation": "update-remaining", "item_ids": ids[:2], "value": "empty",
+    })
+    assert finished.status_code == 200
+    db_session.expire_all()
+    assert [db_session.get(WineItem, i).status for i in ids] == ["consumed", "consumed", "active", "active"]
+
+    # 任一酒款無權限時整批不套用
+    forbidden = await async_client.post("/api/v1/wine-items/batch", json={
+        "operation": "disposition", "item_ids": [ids[2], other.id], "value": "gift",
+    })
+    assert forbidden.status_code == 404
+    invalid = await async_client.post("/api/v1/wine-items/batch", json={
+        "operation": "change-status", "item_ids": ids, "value": "lost",
+    })
+    assert invalid.status_code == 400
+    db_session.expire_all()
+    assert db_session.get(WineItem, ids[2]).disposition == "personal"
+
+    since = encode_sync_token(datetime.utcnow() - timedelta(minutes=1))
+    deleted = await async_client.post("/api/v1/wine-items/batch", json={"operation": "delete", "item_ids": ids[:3]})
+    assert deleted.status_code == 200
+    remaining = (await async_client.get("/api/v1/wine-items")).json()
+    assert [item["id"] for item in remaining] == [ids[3]]
+    changes = (await async_client.get("/api/v1/wine-items/changes", params={"since": since})).json()
+    assert sorted(changes["deleted_ids"]) == ids[:3]
+
+
+@pytest.mark.asyncio
+async def test_split_and_tasting_note_sync_use_set_based_statements(async_client, db_session, assert_max_queries):
+    case = WineItem(cellar_id=1, name="Case of Six", wine_type="紅酒", quantity=6, space_units=6.0,
+                    notes="原木箱", purchase_date=date(2024, 5, 1))
+    db_session.add(case)
+    db_session.commit()
+
+    with assert_max_queries(5):
+        response = await async_client.post(f"/api/v1/wine-items/{case.id}/split", json={"split_count": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["original_remaining"] == 1
+    new_items = body["new_items"]
+    assert len(new_items) == 5 and len({item["id"] for item in new_items}) == 5
+    assert all(item["quantity"] == 1 and item["space_units"] == 1.0 for item in new_items)
+    assert all(item["notes"] == "原木箱" and item["purchase_date"] == "2024-05-01" for item in new_items)
+    assert {item["status"] for item in new_items} == {"active"}
+
+    db_session.expire_all()
+    lot = db_session.query(WineItem).filter(WineItem.name == "Case of Six").order_by(WineItem.id).all()
+    assert [item.split_from_id for item in lot] == [None] + [case.id] * 5
+    assert lot[0].quantity == 1
+
+    # 從拆分記錄同步品飲筆記：主記錄與其他拆分記錄一次更新
+    with assert_max_queries(6):
+        updated = await async_client.put(
+            f"/api/v1/wine-items/{lot[2].id}",
+            params={"sync_tasting_notes": True},
+            json={"rating": 9, "aroma": "黑醋栗", "notes": "只改這瓶"},
+        )
+    assert updated.status_code == 200
+
+    db_session.expire_all()
+    lot = db_session.query(WineItem).filter(WineItem.name == "Case of Six").order_by(WineItem.id).all()
+    assert [(item.rating, item.aroma) for item in lot] == [(9, "黑醋栗")] * 6
+    assert [item.notes for item in lot].count("只改這瓶") == 1
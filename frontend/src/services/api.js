@@ -214,7 +214,7 @@ export const archiveWineItem = (itemId) => {
  * @returns {Promise<void>}
  */
 export const deleteWineItems = (itemIds) => {
-  return apiClient.post('/wine-items/batch-delete', { item_ids: itemIds });
+  return apiClient.post('/wine-items/batch', { operation: 'delete', item_ids: itemIds });
 };
 
 /**